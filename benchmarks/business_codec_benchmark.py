@@ -0,0 +1,147 @@
+"""
+Compares the business cache codec against jsonpickle (the previous cache encoding).
+
+usage: python benchmarks/business_codec_benchmark.py [--corpus-size 1000] [--repeat 5]
+"""
+import argparse
+import random
+import string
+from timeit import repeat
+
+import jsonpickle
+
+from recommender.business.business_codec import (
+    decode_displayable_business,
+    encode_displayable_business,
+)
+from recommender.data.business.address import Address
+from recommender.data.business.displayable_business import DisplayableBusiness
+from recommender.data.recommendation.displayable_category import DisplayableCategory
+from recommender.data.recommendation.location import Location
+from recommender.data.recommendation.price import PriceCategory
+
+CATEGORIES = [
+    ("pizza", "Pizza"),
+    ("sushi", "Sushi Bars"),
+    ("mexican", "Mexican"),
+    ("newamerican", "American (New)"),
+    ("coffee", "Coffee & Tea"),
+    ("bars", "Bars"),
+    ("thai", "Thai"),
+    ("vegan", "Vegan"),
+]
+CITIES = [
+    ("San Francisco", "CA", "941"),
+    ("Oakland", "CA", "946"),
+    ("Seattle", "WA", "981"),
+    ("Chicago", "IL", "606"),
+]
+
+
+def generate_business(rng: random.Random) -> DisplayableBusiness:
+    """
+    Shaped like the businesses returned by the Yelp business details endpoint
+    """
+    name = " ".join(
+        word.capitalize()
+        for word in (
+            "".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9)))
+            for _ in range(rng.randint(1, 4))
+        )
+    )
+    city, region, zip_prefix = rng.choice(CITIES)
+    business_id = "-".join(name.lower().split(" ") + city.lower().split(" "))
+    return DisplayableBusiness(
+        id=business_id,
+        name=name,
+        url=f"https://www.yelp.com/biz/{business_id}?adjust_creative=abcdefghijklmnopqrstuv"
+        f"&utm_campaign=yelp_api_v3&utm_medium=api_v3_business_lookup&utm_source=abcdefghijklmnopqrstuv",
+        image_urls=[
+            f"https://s3-media{rng.randint(1, 4)}.fl.yelpcdn.com/bphoto/"
+            f"{''.join(rng.choices(string.ascii_letters + string.digits, k=22))}/o.jpg"
+            for _ in range(3)
+        ],
+        price=rng.choice(list(PriceCategory)),
+        rating=rng.randint(2, 10) / 2,
+        rating_count=rng.randint(1, 5000),
+        delivery=False,
+        pickup=False,
+        categories=[
+            DisplayableCategory(id=category_id, label=label)
+            for category_id, label in rng.sample(CATEGORIES, rng.randint(1, 3))
+        ],
+        coordinates=Location(
+            lat=37.7 + rng.random() / 10, long=-122.5 + rng.random() / 10
+        ),
+        address=Address(
+            country="US",
+            region=region,
+            city=city,
+            address_line=f"{rng.randint(1, 9999)} {rng.choice(['Mission', 'Valencia', 'Market'])} St",
+            zip_code=f"{zip_prefix}{rng.randint(10, 99)}",
+        ),
+    )
+
+
+def benchmark(
+    name: str, encode, decode, corpus: [DisplayableBusiness], repeat_count: int
+):
+    encoded_corpus = [encode(business) for business in corpus]
+    payload_bytes = sum(len(encoded) for encoded in encoded_corpus)
+
+    encode_seconds = min(
+        repeat(
+            lambda: [encode(business) for business in corpus],
+            number=1,
+            repeat=repeat_count,
+        )
+    )
+    decode_seconds = min(
+        repeat(
+            lambda: [decode(encoded) for encoded in encoded_corpus],
+            number=1,
+            repeat=repeat_count,
+        )
+    )
+    print(
+        f"{name:<12} avg payload: {payload_bytes / len(corpus):8.1f} B"
+        f"  encode: {encode_seconds / len(corpus) * 1e6:8.2f} us"
+        f"  decode: {decode_seconds / len(corpus) * 1e6:8.2f} us"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--corpus-size", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    corpus = [generate_business(rng) for _ in range(args.corpus_size)]
+
+    for business in corpus:
+        assert (
+            decode_displayable_business(encode_displayable_business(business))
+            == business
+        )
+
+    print(f"{len(corpus)} businesses, best of {args.repeat}")
+    benchmark(
+        "jsonpickle",
+        lambda business: jsonpickle.encode(business).encode("utf-8"),
+        jsonpickle.decode,
+        corpus,
+        args.repeat,
+    )
+    benchmark(
+        "codec v1",
+        encode_displayable_business,
+        decode_displayable_business,
+        corpus,
+        args.repeat,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Compares ranking candidates against a search term one pair at a time (full sort) with the batched top-k ranking
+used by CandidateRanker. If fuzzywuzzy (the previous scorer) is installed, it is included as well.
+
+usage: python benchmarks/candidate_ranking_benchmark.py [--repeat 20]
+"""
+import argparse
+import random
+import string
+from timeit import repeat
+
+from rapidfuzz import fuzz
+
+try:
+    from fuzzywuzzy import fuzz as fuzzywuzzy_fuzz
+except ImportError:
+    fuzzywuzzy_fuzz = None
+
+from recommender.data.recommendation.filterable_business import RecommendableBusiness
+from recommender.data.recommendation.price import PriceCategory
+from recommender.recommend.candidate_ranker import CandidateRanker
+
+POOL_SIZES = [20, 200, 2000]
+TOP_K = 20
+SEARCH_TERM = "Thai Noodle House"
+WORDS = [
+    "thai",
+    "noodle",
+    "house",
+    "pizza",
+    "sushi",
+    "taqueria",
+    "cafe",
+    "grill",
+    "kitchen",
+    "bar",
+]
+
+
+def generate_candidates(rng: random.Random, count: int) -> [RecommendableBusiness]:
+    return [
+        RecommendableBusiness(
+            id="".join(rng.choices(string.ascii_lowercase, k=22)),
+            name=" ".join(
+                word.capitalize() for word in rng.sample(WORDS, rng.randint(1, 4))
+            ),
+            url="https://www.yelp.com/biz/business",
+            rating=4.5,
+            price_category=PriceCategory.MID_LOW,
+            distance=rng.random() * 5000,
+        )
+        for _ in range(count)
+    ]
+
+
+def rank_pairwise(
+    search_term: str, candidates: [RecommendableBusiness], scorer=fuzz
+) -> [RecommendableBusiness]:
+    """
+    previous implementation: score each pair in python and sort every candidate
+    """
+    return sorted(
+        candidates,
+        key=lambda business: scorer.partial_ratio(search_term, business.name),
+        reverse=True,
+    )[:TOP_K]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    ranker = CandidateRanker()
+    print(f"top {TOP_K} for {SEARCH_TERM!r}, best of {args.repeat}")
+    for pool_size in POOL_SIZES:
+        candidates = generate_candidates(rng, pool_size)
+        pairwise_seconds = min(
+            repeat(
+                lambda: rank_pairwise(SEARCH_TERM, candidates),
+                number=1,
+                repeat=args.repeat,
+            )
+        )
+        batched_seconds = min(
+            repeat(
+                lambda: ranker.rank("session", SEARCH_TERM, candidates, TOP_K),
+                number=1,
+                repeat=args.repeat,
+            )
+        )
+        result = (
+            f"{pool_size:>5} candidates  pairwise: {pairwise_seconds * 1e3:8.3f} ms"
+            f"  batched: {batched_seconds * 1e3:8.3f} ms"
+        )
+        if fuzzywuzzy_fuzz is not None:
+            fuzzywuzzy_seconds = min(
+                repeat(
+                    lambda: rank_pairwise(SEARCH_TERM, candidates, fuzzywuzzy_fuzz),
+                    number=1,
+                    repeat=args.repeat,
+                )
+            )
+            result += f"  fuzzywuzzy pairwise: {fuzzywuzzy_seconds * 1e3:8.3f} ms"
+        print(result)
+
+
+if __name__ == "__main__":
+    main()
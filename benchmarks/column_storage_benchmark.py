@@ -0,0 +1,216 @@
+"""
+Compares loading search sessions (their search request and recommendations) and election results stored as pickles,
+like before migration 0003, against the JSON column types of recommender.data.json_column_types, on a file backed
+sqlite database. Both layouts hold the same values, so only the column storage differs.
+
+Needs REDIS_URL (recommender.db_config connects on import).
+
+usage: python benchmarks/column_storage_benchmark.py [--sessions 200] [--recommendations 30] [--candidates 20]
+"""
+import argparse
+import os
+import random
+import tempfile
+from time import perf_counter
+
+from sqlalchemy import (
+    JSON,
+    Column,
+    Float,
+    MetaData,
+    PickleType,
+    String,
+    Table,
+    create_engine,
+    func,
+    select,
+)
+
+from benchmarks.instant_runoff_benchmark import generate_rankings
+from recommender.data.json_column_types import (
+    ElectionResultJson,
+    PriceCategoryListJson,
+    RecommendableBusinessJson,
+)
+from recommender.data.rcv.election_result import ElectionResult
+from recommender.data.recommendation.filterable_business import RecommendableBusiness
+from recommender.data.recommendation.price import PriceCategory
+from recommender.rcv.instant_runoff import (
+    GroupedBallotTally,
+    group_ballots,
+    run_instant_runoff,
+)
+
+REPETITIONS = 5
+
+
+def create_tables(
+    metadata: MetaData,
+    business_type,
+    price_categories_type,
+    list_type,
+    election_result_type,
+):
+    return (
+        Table(
+            "search_request",
+            metadata,
+            Column("session_id", String(36), primary_key=True),
+            Column("price_categories", price_categories_type),
+            Column("categories", list_type),
+            Column("attributes", list_type),
+        ),
+        Table(
+            "recommendation",
+            metadata,
+            Column("session_id", String(36), primary_key=True),
+            Column("business_id", String(100), primary_key=True),
+            Column("distance", Float),
+            Column("business_data_for_recommendation", business_type),
+        ),
+        Table(
+            "election",
+            metadata,
+            Column("id", String(36), primary_key=True),
+            Column("election_result", election_result_type),
+        ),
+    )
+
+
+def create_business(rng: random.Random, index: int) -> RecommendableBusiness:
+    return RecommendableBusiness(
+        id=f"business-{index}",
+        name=f"Business {index}",
+        url=f"https://www.yelp.com/biz/business-{index}",
+        rating=rng.choice([3.5, 4.0, 4.5]),
+        price_category=rng.choice(list(PriceCategory)),
+        distance=rng.uniform(0, 5000),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--recommendations", type=int, default=30)
+    parser.add_argument("--candidates", type=int, default=20)
+    parser.add_argument("--ballots", type=int, default=1000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    session_ids = [f"session-{index}" for index in range(args.sessions)]
+    search_requests = [
+        {
+            "session_id": session_id,
+            "price_categories": [PriceCategory.LOW, PriceCategory.MID_LOW],
+            "categories": ["pizza", "italian"],
+            "attributes": ["hot_and_new"],
+        }
+        for session_id in session_ids
+    ]
+    recommendations = [
+        {
+            "session_id": session_id,
+            "business_id": business.id,
+            "distance": business.distance,
+            "business_data_for_recommendation": business,
+        }
+        for session_id in session_ids
+        for business in [
+            create_business(rng, index) for index in range(args.recommendations)
+        ]
+    ]
+    candidate_ids = [f"business-{index}" for index in range(args.candidates)]
+    election_result = ElectionResult(
+        run_instant_runoff(
+            GroupedBallotTally(
+                group_ballots(generate_rankings(rng, args.candidates, args.ballots))
+            ),
+            candidate_ids,
+            random.Random(0),
+        )
+    )
+    election_ids = [f"election-{index}" for index in range(args.sessions)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        for name, column_types in [
+            ("pickle", (PickleType, PickleType, PickleType, PickleType)),
+            (
+                "json",
+                (
+                    RecommendableBusinessJson,
+                    PriceCategoryListJson,
+                    JSON,
+                    ElectionResultJson,
+                ),
+            ),
+        ]:
+            engine = create_engine(f"sqlite:///{os.path.join(directory, f'{name}.db')}")
+            search_request, recommendation, election = create_tables(
+                MetaData(), *column_types
+            )
+            search_request.metadata.create_all(engine)
+            with engine.begin() as connection:
+                connection.execute(search_request.insert(), search_requests)
+                connection.execute(recommendation.insert(), recommendations)
+                connection.execute(
+                    election.insert(),
+                    [
+                        {"id": election_id, "election_result": election_result}
+                        for election_id in election_ids
+                    ],
+                )
+
+            with engine.connect() as connection:
+                start_time = perf_counter()
+                for _ in range(REPETITIONS):
+                    for session_id in session_ids:
+                        connection.execute(
+                            select(search_request).where(
+                                search_request.c.session_id == session_id
+                            )
+                        ).one()
+                        connection.execute(
+                            select(recommendation).where(
+                                recommendation.c.session_id == session_id
+                            )
+                        ).all()
+                session_time = (perf_counter() - start_time) / (
+                    REPETITIONS * len(session_ids)
+                )
+
+                start_time = perf_counter()
+                for _ in range(REPETITIONS):
+                    for election_id in election_ids:
+                        connection.execute(
+                            select(election.c.election_result).where(
+                                election.c.id == election_id
+                            )
+                        ).scalar()
+                election_time = (perf_counter() - start_time) / (
+                    REPETITIONS * len(election_ids)
+                )
+
+                recommendation_size = connection.execute(
+                    select(
+                        func.sum(
+                            func.length(
+                                recommendation.c.business_data_for_recommendation
+                            )
+                        )
+                    )
+                ).scalar() / len(recommendations)
+                election_result_size = (
+                    connection.execute(select(func.length(election.c.election_result)))
+                    .scalars()
+                    .first()
+                )
+            engine.dispose()
+
+            print(
+                f"{name:>6}: session {session_time * 1e3:6.3f} ms, election result {election_time * 1e3:6.3f} ms,"
+                f" {recommendation_size:.0f} bytes per recommendation, {election_result_size} bytes per result"
+            )
+
+
+if __name__ == "__main__":
+    main()
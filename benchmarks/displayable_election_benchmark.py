@@ -0,0 +1,128 @@
+"""
+Compares assembling a DisplayableElection with lazy loads (one query per candidate and nominator) against the eager
+read model used by RCVManager.get_displayable_election_by_id, on a file backed sqlite database. Business names are
+resolved by a stand-in for the business cache, so only the database work is measured.
+
+Needs REDIS_URL (recommender.db_config connects on import).
+
+usage: python benchmarks/displayable_election_benchmark.py [--candidates 50] [--voters 200] [--repeat 50]
+"""
+import argparse
+import os
+import tempfile
+from time import perf_counter
+from types import SimpleNamespace
+from typing import Callable, List
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Query, sessionmaker
+
+from recommender.data.auth.user import BasicUser
+from recommender.data.rcv.candidate import Candidate
+from recommender.data.rcv.election import Election, with_candidates_and_nominators
+from recommender.data.rcv.election_status import ElectionStatus
+from recommender.data.rcv.ranking import Ranking
+from recommender.db_config import DbBase
+
+ELECTION_ID = "election"
+
+
+class NamedBusinessManager:
+    def get_displayable_businesses(
+        self, business_ids: List[str]
+    ) -> List[SimpleNamespace]:
+        return [
+            SimpleNamespace(id=business_id, name=business_id)
+            for business_id in business_ids
+        ]
+
+
+def create_election(db_session, number_of_candidates: int, number_of_voters: int):
+    users = [
+        BasicUser(id=f"user-{index}", nickname=f"User {index}", type="BasicUser")
+        for index in range(number_of_voters)
+    ]
+    db_session.add_all(users)
+    db_session.add(
+        Election(
+            id=ELECTION_ID,
+            active_id="abcdef",
+            election_status=ElectionStatus.VOTING,
+            election_creator_id=users[0].id,
+        )
+    )
+    candidate_ids = [f"business-{index}" for index in range(number_of_candidates)]
+    db_session.add_all(
+        Candidate(
+            election_id=ELECTION_ID,
+            business_id=business_id,
+            distance=0,
+            nominator_id=users[index % len(users)].id,
+        )
+        for index, business_id in enumerate(candidate_ids)
+    )
+    db_session.add_all(
+        Ranking(
+            election_id=ELECTION_ID, user_id=user.id, business_id=business_id, rank=rank
+        )
+        for user in users
+        for rank, business_id in enumerate(candidate_ids)
+    )
+    db_session.commit()
+
+
+def assemble_election(db_session, query_modifier: Callable[[Query], Query]):
+    election = Election.get_election_by_id(db_session, ELECTION_ID, query_modifier)
+    voters = [voter.nickname for voter in election.voters]
+    businesses = NamedBusinessManager().get_displayable_businesses(
+        [candidate.business_id for candidate in election.candidates]
+    )
+    candidates = [
+        (business.name, candidate.nominator.nickname)
+        for candidate, business in zip(election.candidates, businesses)
+    ]
+    return voters, candidates
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--candidates", type=int, default=50)
+    parser.add_argument("--voters", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'benchmark.db')}")
+        DbBase.metadata.create_all(engine)
+        DbSession = sessionmaker(bind=engine)
+        db_session = DbSession()
+        create_election(db_session, args.candidates, args.voters)
+        db_session.close()
+
+        statements = []
+        event.listen(
+            engine,
+            "before_cursor_execute",
+            lambda *arguments: statements.append(arguments[2]),
+        )
+        for name, query_modifier in [
+            ("lazy", lambda query: query),
+            ("eager", with_candidates_and_nominators),
+        ]:
+            statements.clear()
+            start_time = perf_counter()
+            for _ in range(args.repeat):
+                # a new session per request, like the routes
+                db_session = DbSession()
+                assemble_election(db_session, query_modifier)
+                db_session.close()
+            elapsed_time = (perf_counter() - start_time) / args.repeat
+            print(
+                f"{name:>5}: {elapsed_time * 1e3:7.2f} ms,"
+                f" {len(statements) // args.repeat} queries per election"
+            )
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
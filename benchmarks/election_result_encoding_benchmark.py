@@ -0,0 +1,77 @@
+"""
+Compares the reflective json_encode of an election result with the compact result event encoding, and the size of a
+full result frame with the delta frame after one more ballot.
+
+usage: python benchmarks/election_result_encoding_benchmark.py [--candidates 50] [--ballots 10000]
+"""
+import argparse
+import random
+from time import perf_counter
+
+from benchmarks.instant_runoff_benchmark import generate_rankings
+from recommender.data.rcv.election_result import (
+    DisplayableElectionResult,
+    ElectionResult,
+)
+from recommender.rcv.election_update_stream import (
+    ElectionResultDeltaEvent,
+    ElectionResultEvent,
+)
+from recommender.rcv.instant_runoff import (
+    GroupedBallotTally,
+    group_ballots,
+    run_instant_runoff,
+)
+from recommender.utilities.json_encode_utilities import json_encode
+
+REPETITIONS = 100
+
+
+def calculate_result(rankings, candidate_ids) -> DisplayableElectionResult:
+    rounds = run_instant_runoff(
+        GroupedBallotTally(group_ballots(rankings)), candidate_ids, random.Random(0)
+    )
+    return DisplayableElectionResult.from_election_result(ElectionResult(rounds))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--candidates", type=int, default=50)
+    parser.add_argument("--ballots", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    candidate_ids = [f"business-{index}" for index in range(args.candidates)]
+    rankings = generate_rankings(rng, args.candidates, args.ballots + 1)
+    previous_result = calculate_result(rankings[:-1], candidate_ids)
+    result = calculate_result(rankings, candidate_ids)
+
+    start_time = perf_counter()
+    for _ in range(REPETITIONS):
+        json_encode(result)
+    reflective_time = (perf_counter() - start_time) / REPETITIONS
+    start_time = perf_counter()
+    for _ in range(REPETITIONS):
+        result_event = ElectionResultEvent(result)
+        result_event.convention_event_body
+    compact_time = (perf_counter() - start_time) / REPETITIONS
+
+    delta_event = ElectionResultDeltaEvent(
+        ElectionResultEvent(previous_result).data, result_event.data
+    )
+    print(f"{len(result.rounds)} rounds of {args.candidates} candidates")
+    print(
+        f"json_encode: {reflective_time * 1e3:.2f} ms, {len(json_encode(result))} bytes"
+    )
+    print(
+        f"result event: {compact_time * 1e3:.2f} ms, {len(result_event.convention_event_body)} bytes"
+    )
+    print(
+        f"delta event: {len(delta_event.convention_event_body)} bytes,"
+        f" {len(delta_event.data['changedRounds'])} changed rounds"
+    )
+
+
+if __name__ == "__main__":
+    main()
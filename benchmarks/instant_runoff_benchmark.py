@@ -0,0 +1,100 @@
+"""
+Compares the previous recursive tabulation (which removes each eliminated candidate from every ballot) with the
+grouped ballot and the numpy ballot matrix instant-runoff tallies.
+
+usage: python benchmarks/instant_runoff_benchmark.py [--candidates 10] [--max-legacy-ballots 100000]
+"""
+import argparse
+import random
+from collections import Counter
+from time import perf_counter
+from typing import List
+
+from recommender.rcv.ballot_matrix import BallotMatrixTally
+from recommender.rcv.instant_runoff import (
+    GroupedBallotTally,
+    group_ballots,
+    run_instant_runoff,
+)
+
+BALLOT_COUNTS = [10_000, 100_000, 1_000_000]
+
+
+def run_legacy_election(rankings: List[List[str]]) -> int:
+    """
+    :return: number of rounds
+    """
+    number_of_rounds = 0
+    while True:
+        number_of_rounds += 1
+        first_vote_counts = Counter({candidate: 0 for candidate in rankings[0]})
+        for ranking in rankings:
+            first_vote_counts[ranking[0]] += 1
+        _, most_votes = max(first_vote_counts.items(), key=lambda x: x[1])
+        if most_votes > len(rankings) / 2 or len(first_vote_counts) <= 2:
+            return number_of_rounds
+        least_voted, _ = min(first_vote_counts.items(), key=lambda x: x[1])
+        for ranking in rankings:
+            ranking.remove(least_voted)
+
+
+def generate_rankings(
+    rng: random.Random, number_of_candidates: int, number_of_ballots: int
+) -> List[List[str]]:
+    """
+    voters mostly agree on a few favorites (like a real dinner party) and rank the rest in any order
+    """
+    candidate_ids = [f"business-{index}" for index in range(number_of_candidates)]
+    popularity = [1 / (index + 1) for index in range(number_of_candidates)]
+    rankings = []
+    for _ in range(number_of_ballots):
+        favorites = rng.choices(candidate_ids, weights=popularity, k=3)
+        ranking = list(dict.fromkeys(favorites))
+        rest = [
+            candidate_id
+            for candidate_id in candidate_ids
+            if candidate_id not in ranking
+        ]
+        rng.shuffle(rest)
+        rankings.append(ranking + rest)
+    return rankings
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--candidates", type=int, default=10)
+    parser.add_argument("--max-legacy-ballots", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    candidate_ids = [f"business-{index}" for index in range(args.candidates)]
+    for number_of_ballots in BALLOT_COUNTS:
+        rankings = generate_rankings(rng, args.candidates, number_of_ballots)
+
+        result = f"{number_of_ballots:>9} ballots"
+        for name, tally_type in [
+            ("grouped", GroupedBallotTally),
+            ("matrix", BallotMatrixTally),
+        ]:
+            start_time = perf_counter()
+            tally = tally_type(group_ballots(rankings))
+            built_time = perf_counter()
+            rounds = run_instant_runoff(tally, candidate_ids, random.Random(args.seed))
+            end_time = perf_counter()
+            result += (
+                f"  {name}: {(end_time - start_time) * 1e3:8.2f} ms"
+                f" (build {(built_time - start_time) * 1e3:.2f} ms,"
+                f" {len(rounds)} rounds {(end_time - built_time) * 1e3:.2f} ms)"
+            )
+
+        if number_of_ballots <= args.max_legacy_ballots:
+            legacy_rankings = [list(ranking) for ranking in rankings]
+            start_time = perf_counter()
+            run_legacy_election(legacy_rankings)
+            result += f"  legacy: {(perf_counter() - start_time) * 1e3:9.2f} ms"
+        print(result)
+
+
+if __name__ == "__main__":
+    main()
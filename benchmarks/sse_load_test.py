@@ -0,0 +1,168 @@
+"""
+Load test of the election update streams: opens N idle subscribers to one election, then publishes timestamped
+messages on its redis channel and reports the fan-out latency (publish until every subscriber received it).
+
+Against a running server (uvicorn --factory recommender.api.asgi:create_app), the subscribers are SSE connections and
+the memory is the server's resident memory growth (pass its pid). Without --url, the subscribers are opened directly
+on an AsyncPubSubMultiplexer in this process, which isolates the cost of one idle subscriber.
+
+usage: python benchmarks/sse_load_test.py [--subscribers 5000] [--messages 20]
+    [--url http://localhost:8000 --election-id <id> [--server-pid <pid>]]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tracemalloc
+from time import perf_counter, time
+from typing import AsyncIterator, Callable, List, Optional
+
+import httpx
+from redis.asyncio import Redis
+
+from recommender.utilities.async_pubsub_multiplexer import AsyncPubSubMultiplexer
+
+MESSAGE_PREFIX = "data: "
+
+
+def read_resident_memory_in_bytes(pid: int) -> int:
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+    raise ValueError(f"No resident memory reported for {pid}")
+
+
+async def consume(
+    messages: AsyncIterator[bytes],
+    number_of_messages: int,
+    latencies: List[float],
+    ready: asyncio.Event,
+):
+    ready.set()
+    received = 0
+    async for chunk in messages:
+        for line in chunk.decode("utf-8").splitlines():
+            if line.startswith(MESSAGE_PREFIX):
+                latencies.append(time() - float(line[len(MESSAGE_PREFIX) :]))
+                received += 1
+        if received >= number_of_messages:
+            return
+
+
+async def stream_over_http(client: httpx.AsyncClient, url: str) -> AsyncIterator[bytes]:
+    async with client.stream("GET", url) as response:
+        response.raise_for_status()
+        async for chunk in response.aiter_bytes():
+            yield chunk
+
+
+async def run_load_test(
+    redis_connection: Redis,
+    channel: str,
+    open_subscription: Callable[[], AsyncIterator[bytes]],
+    number_of_subscribers: int,
+    number_of_messages: int,
+    measure_memory: Callable[[], int],
+):
+    memory_before = measure_memory()
+    latencies: List[float] = []
+    readiness = [asyncio.Event() for _ in range(number_of_subscribers)]
+    start = perf_counter()
+    consumers = [
+        asyncio.create_task(
+            consume(open_subscription(), number_of_messages, latencies, ready)
+        )
+        for ready in readiness
+    ]
+    for ready in readiness:
+        await ready.wait()
+    # let the last subscriptions (and connections) register before publishing
+    await asyncio.sleep(1)
+    memory_per_subscriber = (measure_memory() - memory_before) / number_of_subscribers
+    print(
+        f"{number_of_subscribers} subscribers opened in {perf_counter() - start:.2f}s, "
+        f"{memory_per_subscriber / 1024:.1f} KiB each"
+    )
+    # tracing every allocation would slow down the fan out
+    tracemalloc.stop()
+
+    fan_out_times = []
+    for _ in range(number_of_messages):
+        expected = len(latencies) + number_of_subscribers
+        published_at = perf_counter()
+        await redis_connection.publish(channel, f"{MESSAGE_PREFIX}{time()}\n\n")
+        while len(latencies) < expected:
+            await asyncio.sleep(0.001)
+        fan_out_times.append(perf_counter() - published_at)
+    await asyncio.gather(*consumers)
+
+    latencies.sort()
+    print(
+        f"latency p50 {statistics.median(latencies) * 1000:.1f}ms, "
+        f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.1f}ms, "
+        f"fan out to every subscriber {statistics.median(fan_out_times) * 1000:.1f}ms (median)"
+    )
+
+
+async def main(
+    number_of_subscribers: int,
+    number_of_messages: int,
+    url: Optional[str],
+    election_id: Optional[str],
+    server_pid: Optional[int],
+):
+    redis_connection = Redis.from_url(
+        os.environ.get("REDIS_URL", "redis://localhost:6379/0")
+    )
+    channel = f"election:{election_id or 'load-test'}"
+    if url is None:
+        multiplexer = AsyncPubSubMultiplexer("election:*", redis_connection)
+        tracemalloc.start()
+        try:
+            await run_load_test(
+                redis_connection,
+                channel,
+                lambda: multiplexer.subscribe(channel),
+                number_of_subscribers,
+                number_of_messages,
+                lambda: tracemalloc.get_traced_memory()[0],
+            )
+        finally:
+            await multiplexer.close()
+    else:
+        async with httpx.AsyncClient(
+            timeout=None, limits=httpx.Limits(max_connections=None)
+        ) as client:
+            await run_load_test(
+                redis_connection,
+                channel,
+                lambda: stream_over_http(client, f"{url}/rcv/{election_id}/updates"),
+                number_of_subscribers,
+                number_of_messages,
+                (lambda: 0)
+                if server_pid is None
+                else lambda: read_resident_memory_in_bytes(server_pid),
+            )
+    await redis_connection.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--subscribers", type=int, default=5000)
+    parser.add_argument("--messages", type=int, default=20)
+    parser.add_argument("--url", help="base url of a running server")
+    parser.add_argument("--election-id", help="existing election (required with --url)")
+    parser.add_argument("--server-pid", type=int)
+    arguments = parser.parse_args()
+    if arguments.url is not None and arguments.election_id is None:
+        parser.error("--election-id is required with --url")
+    asyncio.run(
+        main(
+            arguments.subscribers,
+            arguments.messages,
+            arguments.url,
+            arguments.election_id,
+            arguments.server_pid,
+        )
+    )
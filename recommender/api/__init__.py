@@ -12,8 +12,8 @@ from recommender.api.utils.json_content_type import (
     generate_json_response,
     json_content_type,
 )
-from recommender.db_config import DbBase, engine
 from recommender.env_config import PROD
+from recommender.migrations import upgrade_database
 
 
 def start_api(test_config=None):
@@ -60,8 +60,8 @@ def start_api(test_config=None):
         # load the test config if passed in
         app.config.from_mapping(test_config)
 
-    # init tables (after everything has been imported by the services)
-    DbBase.metadata.create_all(engine)
+    # migrate the tables to the latest revision
+    upgrade_database()
 
     @app.errorhandler(recommender.api.utils.http_exception.HttpException)
     def handle_http_exception(
@@ -0,0 +1,108 @@
+"""
+ASGI entry point.
+
+The election update streams are served by asyncio, so an open tab holds a suspended coroutine instead of a worker
+thread. Every other route is served by the flask app, which is mounted behind the streams.
+
+usage: uvicorn --factory recommender.api.asgi:create_app
+"""
+import os
+from typing import AsyncGenerator, Final, List, Optional
+
+from redis.asyncio import Redis
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware.wsgi import WSGIMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Mount, Route
+
+from recommender.api import start_api
+from recommender.api.utils.http_exception import HttpException
+from recommender.api.utils.server_sent_event import HEARTBEAT_COMMENT
+from recommender.db_config import DbSession
+from recommender.rcv.election_event_log import FrameFilter
+from recommender.utilities.async_pubsub_multiplexer import AsyncPubSubMultiplexer
+
+# the streams are requested with EventSource, which sends the credentials but never a preflight request
+STREAM_HEADERS: Final = {
+    "Access-Control-Allow-Origin": os.environ["FE_ORIGIN"],
+    "Access-Control-Allow-Credentials": "true",
+    "Cache-Control": "no-cache",
+    # nginx (and heroku's router) would otherwise buffer the stream
+    "X-Accel-Buffering": "no",
+}
+
+
+def create_app() -> Starlette:
+    flask_app = start_api()
+    # imported after the app is created, like the blueprints
+    from recommender.api.rcv_route import rcv_manager
+
+    election_update_multiplexer = AsyncPubSubMultiplexer(
+        "election:*", Redis.from_url(os.environ["REDIS_URL"])
+    )
+
+    def get_election_update_channel(election_id: str) -> str:
+        db_session = DbSession()
+        try:
+            return rcv_manager.get_election_update_stream(
+                db_session, election_id
+            ).queue_name
+        finally:
+            db_session.close()
+
+    def get_election_update_backlog(
+        election_id: str, last_event_id: Optional[str]
+    ) -> List[bytes]:
+        db_session = DbSession()
+        try:
+            return rcv_manager.get_election_update_backlog(
+                db_session, election_id, last_event_id
+            )
+        finally:
+            db_session.close()
+
+    async def subscribe_to_election_updates(request: Request) -> Response:
+        election_id = request.path_params["election_id"]
+        last_event_id = request.headers.get("Last-Event-ID")
+        try:
+            channel = await run_in_threadpool(get_election_update_channel, election_id)
+        except HttpException as error:
+            return JSONResponse(
+                {"data": None, "message": error.message, "errorCode": error.error_code},
+                status_code=error.status_code,
+                headers=STREAM_HEADERS,
+            )
+
+        async def stream() -> AsyncGenerator[bytes, None]:
+            frame_filter = FrameFilter()
+            # starlette cancels the response when the client disconnects, which ends the subscription
+            async for frame in election_update_multiplexer.subscribe(
+                channel,
+                heartbeat_message=HEARTBEAT_COMMENT,
+                initial_messages=lambda: run_in_threadpool(
+                    get_election_update_backlog, election_id, last_event_id
+                ),
+            ):
+                # the frames published while the backlog loaded can be part of it
+                if frame_filter.is_included(frame):
+                    yield frame
+
+        return StreamingResponse(
+            stream(), media_type="text/event-stream", headers=STREAM_HEADERS
+        )
+
+    app = Starlette(
+        routes=[
+            Route(
+                "/rcv/{election_id}/updates",
+                subscribe_to_election_updates,
+                methods=["GET"],
+            ),
+            Mount("/", app=WSGIMiddleware(flask_app)),
+        ],
+        on_shutdown=[election_update_multiplexer.close],
+    )
+    app.state.election_update_multiplexer = election_update_multiplexer
+    return app
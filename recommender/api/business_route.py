@@ -1,8 +1,11 @@
 from flask import Blueprint, request
 
 from recommender.api import json_content_type
-from recommender.api.global_services import business_manager
+from recommender.api.global_services import auth_route_utils, business_manager
+from recommender.api.utils.auth_route_utils import AuthorizationException
+from recommender.data.auth.user import SerializableBasicUser
 from recommender.data.business.localized_business import LocalizedBusiness
+from recommender.utilities.lru_ttl_cache import CacheStats
 
 business = Blueprint("business", __name__)
 
@@ -11,4 +14,13 @@ business = Blueprint("business", __name__)
 @json_content_type()
 def get_localized_businesses() -> [LocalizedBusiness]:
     business_ids = request.args["ids"].split(",")
-    return [business_manager.get_localized_business(id) for id in business_ids]
+    return business_manager.get_localized_businesses(business_ids)
+
+
+@business.route("/cache-stats", methods=["GET"])
+@auth_route_utils.require_user_route()
+@json_content_type()
+def get_local_cache_stats(user: SerializableBasicUser) -> CacheStats:
+    if not user.is_admin:
+        raise AuthorizationException("business cache stats")
+    return business_manager.local_cache_stats
@@ -24,15 +24,21 @@ from recommender.data.recommendation.recommendation_action import Recommendation
 from recommender.data.recommendation.search_session import SearchSession
 from recommender.data.session_creation_response import SessionCreationResponse
 from recommender.db_config import DbSession
+from recommender.recommend.candidate_pool import CandidatePool
+from recommender.recommend.candidate_ranker import CandidateRanker
 from recommender.recommend.recommendation_manager import RecommendationManager
 from recommender.recommend.recommender import Recommender
+from recommender.recommend.search_cursor import SearchCursor
+from recommender.recommend.seen_business_index import SeenBusinessIndex
 from recommender.session.session_manager import SessionManager
 
 business_search = Blueprint("business_search", __name__)
 
-recommender: Recommender = Recommender(business_manager)
+recommender: Recommender = Recommender(
+    business_manager, SearchCursor(), CandidateRanker()
+)
 recommendation_manager: RecommendationManager = RecommendationManager(
-    business_manager, recommender
+    business_manager, recommender, CandidatePool(), SeenBusinessIndex()
 )
 session_manager: SessionManager = SessionManager(recommendation_manager, rcv_manager)
 
@@ -41,7 +47,7 @@ session_manager: SessionManager = SessionManager(recommendation_manager, rcv_man
 @json_content_type()
 @auth_route_utils.get_user_route
 def new_search_session(
-        user_maybe: Optional[SerializableBasicUser],
+    user_maybe: Optional[SerializableBasicUser],
 ) -> SessionCreationResponse:
     search_request = BusinessSearchRequest.from_dict(
         request.json["businessSearchParameters"]
@@ -59,9 +65,10 @@ def new_search_session(
             dinner_party_active_id=dinner_party_active_id,
             user_maybe=user_maybe,
         )
-        business_recommendation: DisplayableRecommendation = session_manager.get_next_recommendation_for_session(
-            db_session=db_session,
-            session_id=session.id
+        business_recommendation: DisplayableRecommendation = (
+            session_manager.get_next_recommendation_for_session(
+                db_session=db_session, session_id=session.id
+            )
         )
         return SessionCreationResponse(
             session_id=session.id,
@@ -76,7 +83,7 @@ def new_search_session(
 @json_content_type()
 @auth_route_utils.get_user_route
 def get_session(
-        session_id: str, user_maybe: Optional[SerializableBasicUser]
+    session_id: str, user_maybe: Optional[SerializableBasicUser]
 ) -> DisplayableSearchSession:
     db_session = DbSession()
     try:
@@ -91,7 +98,7 @@ def get_session(
 @json_content_type()
 @auth_route_utils.get_user_route
 def apply_recommendation_action(
-        session_id: str, user_maybe: Optional[SerializableBasicUser]
+    session_id: str, user_maybe: Optional[SerializableBasicUser]
 ) -> Optional[DisplayableRecommendation]:
     db_session = DbSession()
     try:
@@ -118,8 +125,7 @@ def apply_recommendation_action(
                 recommendation_action=recommendation_action,
             )
             return session_manager.get_next_recommendation_for_session(
-                db_session=db_session,
-                session_id=session_id
+                db_session=db_session, session_id=session_id
             )
         else:
             session_manager.apply_action_to_maybe(
@@ -133,14 +139,16 @@ def apply_recommendation_action(
         db_session.close()
 
 
-def is_user_authorized(db_session: DbSession, user: Optional[SerializableBasicUser], session_id: str):
+def is_user_authorized(
+    db_session: DbSession, user: Optional[SerializableBasicUser], session_id: str
+):
     partial_session = SearchSession.get_session_by_id(
         db_session,
         session_id,
         lambda x: x.options(load_only(SearchSession.id, SearchSession.created_by_id)),
     )
     if (
-            partial_session.created_by_id is not None
-            and user.id != partial_session.created_by_id
+        partial_session.created_by_id is not None
+        and user.id != partial_session.created_by_id
     ):
         raise AuthorizationException(f"search_session--{session_id}")
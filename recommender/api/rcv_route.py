@@ -8,6 +8,10 @@ from recommender.api.global_services import (
     business_manager,
     user_manager,
 )
+from recommender.api.utils.json_content_type import (
+    generate_data_json_response,
+    generate_preserialized_data_json_response,
+)
 from recommender.data.auth.user import SerializableBasicUser
 from recommender.data.rcv.election import Election
 from recommender.data.rcv.election_metadata_response import ElectionMetadataResponse
@@ -27,7 +31,9 @@ rcv = Blueprint("rcv", __name__)
 def new_rcv(user: SerializableBasicUser) -> ElectionMetadataResponse:
     session = DbSession()
     try:
-        return election_to_metadata_response(rcv_manager.create_election(session, user=user))
+        return election_to_metadata_response(
+            rcv_manager.create_election(session, user=user)
+        )
     finally:
         session.close()
 
@@ -38,7 +44,9 @@ def get_active_election_metadata() -> Optional[ElectionMetadataResponse]:
     session = DbSession()
     try:
         active_id = request.json["electionCode"]
-        election = rcv_manager.get_active_election_by_active_id(session, active_id=active_id)
+        election = rcv_manager.get_active_election_by_active_id(
+            session, active_id=active_id
+        )
         if election is None:
             return None
         return election_to_metadata_response(election)
@@ -55,12 +63,27 @@ def election_to_metadata_response(election: Election) -> ElectionMetadataRespons
 
 
 @rcv.route("/<election_id>", methods=["GET"])
-@json_content_type()
-def get_election(election_id: str) -> Optional[Election]:
+def get_election(election_id: str) -> Response:
     with_voters = request.args.get("withVoters", True)
     db_session = DbSession()
     try:
-        return rcv_manager.get_displayable_election_by_id(db_session, election_id, with_voters)
+        if not with_voters:
+            return generate_data_json_response(
+                rcv_manager.get_displayable_election_by_id(
+                    db_session, election_id, with_voters
+                )
+            )
+        serialized_election = rcv_manager.get_serialized_election(
+            db_session, election_id
+        )
+        if serialized_election is None:
+            return generate_data_json_response(None)
+        response = generate_preserialized_data_json_response(
+            serialized_election.encoded_election
+        )
+        # the election only changes with a new version. Polling clients get a 304 for the version they have
+        response.set_etag(serialized_election.version)
+        return response.make_conditional(request)
     finally:
         db_session.close()
 
@@ -76,18 +99,6 @@ def get_election_results(election_id: str) -> Optional[DisplayableElectionResult
         db_session.close()
 
 
-@rcv.route("/<election_id>/updates", methods=["GET"])
-def subscribe_to_election_updates(election_id: str) -> Response:
-    db_session = DbSession()
-    try:
-        return Response(
-            response=rcv_manager.get_election_update_stream(db_session, election_id).subscribe_to_raw(),
-            mimetype="text/event-stream",
-        )
-    finally:
-        db_session.close()
-
-
 @rcv.route("/add-candidate", methods=["PUT"])
 @auth_route_utils.require_user_route()
 def add_candidate(user: SerializableBasicUser) -> Dict[str, bool]:
@@ -97,7 +108,10 @@ def add_candidate(user: SerializableBasicUser) -> Dict[str, bool]:
     db_session = DbSession()
     try:
         already_added = not rcv_manager.add_candidate(
-            db_session, active_id=election_code, business_id=business_id, user_id=user.id
+            db_session,
+            active_id=election_code,
+            business_id=business_id,
+            user_id=user.id,
         )
         return {"alreadyAdded": already_added}
     finally:
@@ -110,8 +124,8 @@ def update_election_state(user: SerializableBasicUser, election_id: str) -> Resp
     # TODO: Verify auth updating state is the one who created the election
     new_state = request.json["state"]
     if (
-            new_state != ElectionStatus.VOTING.value
-            and new_state != ElectionStatus.COMPLETE.value
+        new_state != ElectionStatus.VOTING.value
+        and new_state != ElectionStatus.COMPLETE.value
     ):
         raise ValueError(f"Invalid input state: {new_state}")
 
@@ -120,10 +134,7 @@ def update_election_state(user: SerializableBasicUser, election_id: str) -> Resp
         if new_state == ElectionStatus.VOTING.value:
             rcv_manager.move_election_to_voting(db_session, election_id)
         elif new_state == ElectionStatus.COMPLETE.value:
-            rcv_manager.mark_election_as_complete(
-                db_session,
-                election_id
-            )
+            rcv_manager.mark_election_as_complete(db_session, election_id)
         return Response(status=200)
     finally:
         db_session.close()
@@ -137,7 +148,9 @@ def vote(election_id: str, user: SerializableBasicUser) -> Response:
 
     db_session = DbSession()
     try:
-        rcv_manager.vote(db_session, user_id=user.id, election_id=election_id, votes=votes)
+        rcv_manager.vote(
+            db_session, user_id=user.id, election_id=election_id, votes=votes
+        )
         return Response(status=201)
     finally:
         db_session.close()
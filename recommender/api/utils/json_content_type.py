@@ -29,6 +29,17 @@ def generate_data_json_response(data: any, **kwargs) -> Response:
     return generate_json_response(data=data, additional_root_params=None, **kwargs)
 
 
+def generate_preserialized_data_json_response(
+    encoded_data: str, status: int = 200
+) -> Response:
+    """
+    :param encoded_data: json_encode of the data, e.g. read from a cache
+    """
+    return Response(
+        f'{{"data": {encoded_data}}}', mimetype="application/json", status=status
+    )
+
+
 def generate_json_response(
     data: Optional[any],
     additional_root_params: Optional[Dict] = None,
@@ -1,9 +1,12 @@
 from dataclasses import dataclass
-from typing import Generic, TypeVar
+from functools import cached_property
+from typing import Final, Generic, TypeVar
 
 from recommender.utilities.json_encode_utilities import json_encode
 
 PAYLOAD_TYPE = TypeVar("PAYLOAD_TYPE")
+# comment line ignored by EventSource. Keeps idle streams open through proxies and detects closed connections
+HEARTBEAT_COMMENT: Final[bytes] = b": heartbeat\n\n"
 
 
 @dataclass
@@ -12,5 +15,25 @@ class ServerSentEvent(Generic[PAYLOAD_TYPE]):
     data: PAYLOAD_TYPE
     type: str
 
-    def to_convention_event_string(self):
-        return f"id: {self.id}\nevent: {self.type}\ndata: {json_encode(self.data)}\n\n"
+    def encode_data(self) -> str:
+        """
+        override with a direct encoding for large payloads, json_encode walks every object reflectively
+        """
+        return json_encode(self.data)
+
+    @cached_property
+    def encoded_data(self) -> str:
+        return self.encode_data()
+
+    @cached_property
+    def convention_event_body(self) -> bytes:
+        """
+        the frame without its id line. An event is serialized once however often it is logged, published or sent
+        """
+        return f"event: {self.type}\ndata: {self.encoded_data}\n\n".encode("utf-8")
+
+    def to_convention_event_frame(self) -> bytes:
+        return b"id: " + self.id.encode("utf-8") + b"\n" + self.convention_event_body
+
+    def to_convention_event_string(self) -> str:
+        return self.to_convention_event_frame().decode("utf-8")
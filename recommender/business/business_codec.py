@@ -0,0 +1,198 @@
+"""
+Compact binary encoding of DisplayableBusiness for the business cache.
+
+Layout (big endian), version 2:
+    header      version: B, price: B, flags: B, rating: d, rating_count: I, lat: d, long: d
+    strings     id, name, url, country, region, city, address_line, zip_code
+    image_urls  count: B, string * count
+    categories  count: B, (id string, label string) * count
+
+strings are a length (H) followed by utf-8 bytes. NULL_STRING_LENGTH encodes None.
+Missing coordinates are encoded as NaN. Version 1 stored the rating as a float32 and is still decoded.
+
+Entries written before the codec existed are jsonpickle strings (they start with "{") and are still decoded. Businesses
+that do not fit the layout (too many images or categories, too long strings) are still written that way.
+"""
+import math
+import struct
+from typing import Dict, Final, List, Optional, Tuple
+
+import jsonpickle
+
+from recommender.data.business.address import Address
+from recommender.data.business.displayable_business import DisplayableBusiness
+from recommender.data.recommendation.displayable_category import DisplayableCategory
+from recommender.data.recommendation.location import Location
+from recommender.data.recommendation.price import PriceCategory
+
+SCHEMA_VERSION: Final[int] = 2
+LEGACY_JSONPICKLE_PREFIX: Final[int] = ord("{")
+
+__HEADERS: Final[Dict[int, struct.Struct]] = {
+    1: struct.Struct(">BBBfIdd"),
+    SCHEMA_VERSION: struct.Struct(">BBBdIdd"),
+}
+__STRING_LENGTH: Final[struct.Struct] = struct.Struct(">H")
+__COUNT: Final[struct.Struct] = struct.Struct(">B")
+
+NULL_STRING_LENGTH: Final[int] = 0xFFFF
+MAX_STRING_LENGTH: Final[int] = NULL_STRING_LENGTH - 1
+MAX_COUNT: Final[int] = 0xFF
+
+__DELIVERY_FLAG: Final[int] = 1
+__PICKUP_FLAG: Final[int] = 1 << 1
+
+# index in the enum declaration is the encoded value. Only ever append to PriceCategory.
+__PRICE_CATEGORIES: Final[List[PriceCategory]] = list(PriceCategory)
+__PRICE_CATEGORY_TO_INDEX: Final = {
+    price_category: index for index, price_category in enumerate(__PRICE_CATEGORIES)
+}
+
+
+def encode_displayable_business(business: DisplayableBusiness) -> bytes:
+    try:
+        return __encode_displayable_business(business)
+    except (ValueError, struct.error):
+        # e.g. more images than a count can hold. Rare enough that the size of the legacy encoding does not matter
+        return jsonpickle.encode(business).encode("utf-8")
+
+
+def __encode_displayable_business(business: DisplayableBusiness) -> bytes:
+    flags = (__DELIVERY_FLAG if business.delivery else 0) | (
+        __PICKUP_FLAG if business.pickup else 0
+    )
+    coordinates = business.coordinates
+    address = business.address
+    parts = [
+        __HEADERS[SCHEMA_VERSION].pack(
+            SCHEMA_VERSION,
+            __PRICE_CATEGORY_TO_INDEX[business.price],
+            flags,
+            business.rating,
+            business.rating_count,
+            __encode_coordinate(None if coordinates is None else coordinates.lat),
+            __encode_coordinate(None if coordinates is None else coordinates.long),
+        )
+    ]
+    for value in (
+        business.id,
+        business.name,
+        business.url,
+        address.country,
+        address.region,
+        address.city,
+        address.address_line,
+        address.zip_code,
+    ):
+        parts.append(__encode_string(value))
+
+    parts.append(__encode_count(business.image_urls))
+    parts.extend(__encode_string(image_url) for image_url in business.image_urls)
+
+    parts.append(__encode_count(business.categories))
+    for category in business.categories:
+        parts.append(__encode_string(category.id))
+        parts.append(__encode_string(category.label))
+    return b"".join(parts)
+
+
+def decode_displayable_business(data: bytes) -> DisplayableBusiness:
+    if len(data) == 0:
+        raise ValueError("Cannot decode an empty business")
+    if data[0] == LEGACY_JSONPICKLE_PREFIX:
+        return jsonpickle.decode(data)
+    header = __HEADERS.get(data[0])
+    if header is None:
+        raise ValueError(f"Unknown business schema version {data[0]}")
+
+    (
+        version,
+        price_index,
+        flags,
+        rating,
+        rating_count,
+        lat,
+        long,
+    ) = header.unpack_from(data, 0)
+    offset = header.size
+    if version == 1:
+        # the float32 rating of version 1 has conversion noise (ratings are in steps of 0.5)
+        rating = round(rating, 2)
+
+    strings = []
+    for _ in range(8):
+        value, offset = __decode_string(data, offset)
+        strings.append(value)
+    id, name, url, country, region, city, address_line, zip_code = strings
+
+    image_url_count, offset = __decode_count(data, offset)
+    image_urls = []
+    for _ in range(image_url_count):
+        image_url, offset = __decode_string(data, offset)
+        image_urls.append(image_url)
+
+    category_count, offset = __decode_count(data, offset)
+    categories = []
+    for _ in range(category_count):
+        category_id, offset = __decode_string(data, offset)
+        label, offset = __decode_string(data, offset)
+        categories.append(DisplayableCategory(id=category_id, label=label))
+
+    return DisplayableBusiness(
+        id=id,
+        name=name,
+        url=url,
+        image_urls=image_urls,
+        price=__PRICE_CATEGORIES[price_index],
+        rating=rating,
+        rating_count=rating_count,
+        delivery=bool(flags & __DELIVERY_FLAG),
+        pickup=bool(flags & __PICKUP_FLAG),
+        categories=categories,
+        coordinates=Location(
+            lat=__decode_coordinate(lat), long=__decode_coordinate(long)
+        ),
+        address=Address(
+            country=country,
+            region=region,
+            city=city,
+            address_line=address_line,
+            zip_code=zip_code,
+        ),
+    )
+
+
+def __encode_string(value: Optional[str]) -> bytes:
+    if value is None:
+        return __STRING_LENGTH.pack(NULL_STRING_LENGTH)
+    encoded_value = value.encode("utf-8")
+    if len(encoded_value) > MAX_STRING_LENGTH:
+        raise ValueError(f"String of {len(encoded_value)} bytes is too long to encode")
+    return __STRING_LENGTH.pack(len(encoded_value)) + encoded_value
+
+
+def __decode_string(data: bytes, offset: int) -> Tuple[Optional[str], int]:
+    (length,) = __STRING_LENGTH.unpack_from(data, offset)
+    offset += __STRING_LENGTH.size
+    if length == NULL_STRING_LENGTH:
+        return None, offset
+    return data[offset : offset + length].decode("utf-8"), offset + length
+
+
+def __encode_count(values: list) -> bytes:
+    if len(values) > MAX_COUNT:
+        raise ValueError(f"Cannot encode more than {MAX_COUNT} values")
+    return __COUNT.pack(len(values))
+
+
+def __decode_count(data: bytes, offset: int) -> Tuple[int, int]:
+    (count,) = __COUNT.unpack_from(data, offset)
+    return count, offset + __COUNT.size
+
+
+def __encode_coordinate(value: Optional[float]) -> float:
+    return math.nan if value is None else value
+
+
+def __decode_coordinate(value: float) -> Optional[float]:
+    return None if math.isnan(value) else value
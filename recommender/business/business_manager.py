@@ -1,5 +1,15 @@
-import jsonpickle
+import json
+from threading import Lock
+from typing import List, Optional
+from uuid import uuid4
 
+from redis.client import PubSubWorkerThread
+
+from recommender.business.business_codec import (
+    decode_displayable_business,
+    encode_displayable_business,
+)
+from recommender.business.normalized_search_request import NormalizedSearchRequest
 from recommender.business.page import Page
 from recommender.business.search_client import SearchClient
 from recommender.data.business.displayable_business import DisplayableBusiness
@@ -9,43 +19,213 @@ from recommender.data.recommendation.business_search_request import (
 )
 from recommender.data.recommendation.filterable_business import RecommendableBusiness
 from recommender.db_config import primary_redis_conn
+from recommender.utilities.lru_ttl_cache import CacheStats, LruTtlCache
+from recommender.utilities.single_flight import SingleFlight
 
 """
 layer of indirection when caching or local storage (or multiple API clients) is implemented
 
 (implement search client temporarily depending on whether we want additional functionality on the business manager)
+
+Businesses are cached in two tiers:
+ - L1: a small in-process LRU cache (hot businesses, e.g. the candidates of an active election)
+ - L2: redis (shared between all processes)
+
+A process that refreshes businesses from the search client announces them, and the other processes drop their L1
+copies, so they read the refreshed businesses from redis instead of waiting for their L1 copies to expire
 """
 
 CACHE_EXPIRATION_IN_DAYS = 1
 CACHE_EXPIRATION_IN_SECONDS = CACHE_EXPIRATION_IN_DAYS * 24 * 60 * 60
 
+# the local cache must expire well before redis so a business refreshed in redis is eventually picked up
+LOCAL_CACHE_MAX_SIZE = 1000
+LOCAL_CACHE_EXPIRATION_IN_SECONDS = 5 * 60
+
+BUSINESS_CACHE_INVALIDATION_CHANNEL = "business-cache-invalidation"
+
+# searches only return businesses that are open now, so search results go stale quickly
+SEARCH_CACHE_EXPIRATION_IN_SECONDS = 5 * 60
+
 
 class BusinessManager(SearchClient):
     __search_client: SearchClient
+    __local_cache: LruTtlCache[str, DisplayableBusiness]
+    __business_search_flight: SingleFlight[List[RecommendableBusiness]]
+    # identifies the refreshes announced by this instance, which it does not have to drop
+    __instance_id: str
+    __invalidation_listener_lock: Lock
+    __invalidation_listener: Optional[PubSubWorkerThread]
 
     def __init__(self, search_client: SearchClient):
         self.__search_client = search_client
+        self.__business_search_flight = SingleFlight()
+        self.__local_cache = LruTtlCache(
+            max_size=LOCAL_CACHE_MAX_SIZE,
+            ttl_in_seconds=LOCAL_CACHE_EXPIRATION_IN_SECONDS,
+        )
+        self.__instance_id = str(uuid4())
+        self.__invalidation_listener_lock = Lock()
+        self.__invalidation_listener = None
+
+    @property
+    def local_cache_stats(self) -> CacheStats:
+        return self.__local_cache.stats
 
     def business_search(
         self, search_params: BusinessSearchRequest, page: Page
     ) -> [RecommendableBusiness]:
         # return iterable instead ?
-        return self.__search_client.business_search(search_params, page)
+        normalized_search_request = NormalizedSearchRequest.from_search_request(
+            search_params, page
+        )
+        search_cache_key = normalized_search_request.to_cache_key()
+        cached_search_result = primary_redis_conn.get(search_cache_key)
+        if cached_search_result is not None:
+            return [
+                RecommendableBusiness.from_dict(business_dict)
+                for business_dict in json.loads(cached_search_result)
+            ]
+
+        def search_and_cache() -> [RecommendableBusiness]:
+            # the first search of the bucket must not decide its results
+            businesses = self.__search_client.business_search(
+                normalized_search_request.to_search_request(),
+                normalized_search_request.to_page(),
+            )
+            primary_redis_conn.set(
+                search_cache_key,
+                json.dumps([business.to_dict() for business in businesses]),
+                ex=SEARCH_CACHE_EXPIRATION_IN_SECONDS,
+            )
+            return businesses
+
+        # concurrent identical searches share a single upstream call
+        return list(
+            self.__business_search_flight.do(search_cache_key, search_and_cache)
+        )
 
     def get_displayable_business(self, business_id: str) -> DisplayableBusiness:
-        business_cache_key = f"business:{business_id}"
+        locally_cached_business = self.__local_cache.get(business_id)
+        if locally_cached_business is not None:
+            return locally_cached_business
+
+        business_cache_key = self.__get_business_cache_key(business_id)
         cached_business_as_string = primary_redis_conn.get(business_cache_key)
         if cached_business_as_string is not None:
-            return jsonpickle.decode(cached_business_as_string)
+            business = decode_displayable_business(cached_business_as_string)
+            self.__set_locally_cached_business(business_id, business)
+            return business
         business = self.__search_client.get_displayable_business(business_id)
         primary_redis_conn.set(
             business_cache_key,
-            jsonpickle.encode(business),
+            encode_displayable_business(business),
             ex=CACHE_EXPIRATION_IN_SECONDS,
         )
+        self.__announce_refreshed_businesses([business_id])
+        self.__set_locally_cached_business(business_id, business)
         return business
 
+    def get_displayable_businesses(self, business_ids: [str]) -> [DisplayableBusiness]:
+        unique_business_ids = list(dict.fromkeys(business_ids))
+        if len(unique_business_ids) == 0:
+            return []
+
+        businesses_by_id = self.__local_cache.get_many(unique_business_ids)
+        uncached_business_ids = [
+            business_id
+            for business_id in unique_business_ids
+            if business_id not in businesses_by_id
+        ]
+        if len(uncached_business_ids) == 0:
+            return [businesses_by_id[business_id] for business_id in business_ids]
+
+        cached_businesses_as_strings = primary_redis_conn.mget(
+            [
+                self.__get_business_cache_key(business_id)
+                for business_id in uncached_business_ids
+            ]
+        )
+        for business_id, cached_business_as_string in zip(
+            uncached_business_ids, cached_businesses_as_strings
+        ):
+            if cached_business_as_string is not None:
+                business = decode_displayable_business(cached_business_as_string)
+                businesses_by_id[business_id] = business
+                self.__set_locally_cached_business(business_id, business)
+
+        missing_business_ids = [
+            business_id
+            for business_id in uncached_business_ids
+            if business_id not in businesses_by_id
+        ]
+        if len(missing_business_ids) > 0:
+            fetched_businesses = self.__search_client.get_displayable_businesses(
+                missing_business_ids
+            )
+            pipeline = primary_redis_conn.pipeline(transaction=False)
+            for business_id, business in zip(missing_business_ids, fetched_businesses):
+                businesses_by_id[business_id] = business
+                self.__set_locally_cached_business(business_id, business)
+                pipeline.set(
+                    self.__get_business_cache_key(business_id),
+                    encode_displayable_business(business),
+                    ex=CACHE_EXPIRATION_IN_SECONDS,
+                )
+            pipeline.execute()
+            self.__announce_refreshed_businesses(missing_business_ids)
+
+        return [businesses_by_id[business_id] for business_id in business_ids]
+
     def get_localized_business(self, business_id: str) -> LocalizedBusiness:
         return LocalizedBusiness(
             business=self.get_displayable_business(business_id), distance=0
         )
+
+    def get_localized_businesses(self, business_ids: [str]) -> [LocalizedBusiness]:
+        return [
+            LocalizedBusiness(business=business, distance=0)
+            for business in self.get_displayable_businesses(business_ids)
+        ]
+
+    def __set_locally_cached_business(
+        self, business_id: str, business: DisplayableBusiness
+    ):
+        # the refreshes announced while the local cache is empty do not matter
+        self.__listen_for_invalidations()
+        self.__local_cache.set(business_id, business)
+
+    def __announce_refreshed_businesses(self, business_ids: [str]):
+        primary_redis_conn.publish(
+            BUSINESS_CACHE_INVALIDATION_CHANNEL,
+            json.dumps({"source": self.__instance_id, "businessIds": business_ids}),
+        )
+
+    def __listen_for_invalidations(self):
+        """
+        starts the listener thread on the first use of the local cache, so instances that never cache locally (e.g.
+        in the workers) do not start one
+        """
+        if self.__invalidation_listener is not None:
+            return
+        with self.__invalidation_listener_lock:
+            if self.__invalidation_listener is not None:
+                return
+
+            def handle_invalidation(message):
+                invalidation = json.loads(message["data"])
+                if invalidation["source"] == self.__instance_id:
+                    return
+                for business_id in invalidation["businessIds"]:
+                    self.__local_cache.invalidate(business_id)
+
+            subscription = primary_redis_conn.pubsub(ignore_subscribe_messages=True)
+            subscription.subscribe(
+                **{BUSINESS_CACHE_INVALIDATION_CHANNEL: handle_invalidation}
+            )
+            self.__invalidation_listener = subscription.run_in_thread(
+                sleep_time=1, daemon=True
+            )
+
+    def __get_business_cache_key(self, business_id: str) -> str:
+        return f"business:{business_id}"
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import json
+import math
+from dataclasses import astuple, dataclass
+from typing import Final, Tuple
+
+from recommender.business.page import Page
+from recommender.data.recommendation.business_search_request import (
+    BusinessSearchRequest,
+)
+from recommender.data.recommendation.location import Location
+from recommender.data.recommendation.price import PriceCategory
+
+# 3 decimal places is ~110 meters of latitude
+COORDINATE_DECIMAL_PLACES: Final[int] = 3
+RADIUS_BUCKET_IN_METERS: Final[int] = 500
+
+
+@dataclass(frozen=True)
+class NormalizedSearchRequest:
+    """
+    Canonical form of a search so that nearly identical searches (same neighbourhood, same filters)
+    share cached results
+    """
+
+    @staticmethod
+    def from_search_request(
+        search_params: BusinessSearchRequest, page: Page
+    ) -> NormalizedSearchRequest:
+        return NormalizedSearchRequest(
+            lat=round(search_params.location.lat, COORDINATE_DECIMAL_PLACES),
+            long=round(search_params.location.long, COORDINATE_DECIMAL_PLACES),
+            radius=math.ceil(search_params.radius / RADIUS_BUCKET_IN_METERS)
+            * RADIUS_BUCKET_IN_METERS,
+            search_term=" ".join(search_params.search_term.lower().split()),
+            price_categories=tuple(
+                sorted(
+                    price_category.name
+                    for price_category in search_params.price_categories
+                )
+            ),
+            categories=tuple(sorted(search_params.categories or [])),
+            attributes=tuple(sorted(search_params.attributes or [])),
+            limit=page.limit,
+            offset=page.offset,
+        )
+
+    lat: float
+    long: float
+    radius: int
+    search_term: str
+    price_categories: Tuple[str, ...]
+    categories: Tuple[str, ...]
+    attributes: Tuple[str, ...]
+    limit: int
+    offset: int
+
+    def to_search_request(self) -> BusinessSearchRequest:
+        """
+        the search that is sent upstream, so the results match every search sharing the cache key
+        """
+        return BusinessSearchRequest(
+            search_term=self.search_term,
+            location=Location(lat=self.lat, long=self.long),
+            price_categories=[
+                PriceCategory.from_name(name) for name in self.price_categories
+            ],
+            categories=list(self.categories),
+            attributes=list(self.attributes),
+            radius=self.radius,
+        )
+
+    def to_page(self) -> Page:
+        return Page(limit=self.limit, offset=self.offset)
+
+    def to_cache_key(self) -> str:
+        return f"business-search:{json.dumps(astuple(self), separators=(',', ':'))}"
@@ -18,3 +18,10 @@ class SearchClient(ABC):
     @abstractmethod
     def get_displayable_business(self, business_id: str) -> DisplayableBusiness:
         pass
+
+    @abstractmethod
+    def get_displayable_businesses(self, business_ids: [str]) -> [DisplayableBusiness]:
+        """
+        :return: the businesses in the same order as business_ids
+        """
+        pass
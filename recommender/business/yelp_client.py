@@ -1,4 +1,5 @@
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import TypeVar, Final, Dict
 
 import requests
@@ -52,11 +53,20 @@ class YelpClient(SearchClient):
         return ", ".join([str(value) for value in values_array])
 
     BASE_URL: Final[str] = "https://api.yelp.com/v3"
+    # maximum offset + limit accepted by the search endpoint
+    MAX_SEARCH_RESULTS: Final[int] = 1000
+    # bounds the number of simultaneous business detail requests sent to Yelp
+    MAX_CONCURRENT_REQUESTS: Final[int] = 8
 
     __headers: Final[Dict[str, str]]
     __yelp_graph_api_client: Client
+    __request_executor: Final[ThreadPoolExecutor]
 
     def __init__(self, api_key: str) -> None:
+        self.__request_executor = ThreadPoolExecutor(
+            max_workers=self.MAX_CONCURRENT_REQUESTS,
+            thread_name_prefix="yelp-client",
+        )
         self.__headers = {
             "Content-type": "application/json",
             "Authorization": f"Bearer {api_key}",
@@ -75,6 +85,9 @@ class YelpClient(SearchClient):
     def business_search(
         self, search_params: BusinessSearchRequest, page: Page
     ) -> [RecommendableBusiness]:
+        if page.offset + page.limit > self.MAX_SEARCH_RESULTS:
+            # Yelp does not return results past MAX_SEARCH_RESULTS
+            return []
         lat = search_params.location.lat
         long = search_params.location.long
 
@@ -87,12 +100,13 @@ class YelpClient(SearchClient):
         result = self.yelp_graph_api_client.execute(
             BUSINESS_SEARCH_QUERY,
             {
-                "term": search_params.search_term,
                 "lat": lat,
                 "long": long,
                 "searchTerm": search_params.search_term,
                 "radius": search_params.radius,
                 "price": price_categories_filter,
+                "limit": page.limit,
+                "offset": page.offset,
             },
         )
         search_result = result["search"]
@@ -131,6 +145,17 @@ class YelpClient(SearchClient):
             delay=500,
         )
 
+    def get_displayable_businesses(self, business_ids: [str]) -> [DisplayableBusiness]:
+        if len(business_ids) <= 1:
+            return [
+                self.get_displayable_business(business_id)
+                for business_id in business_ids
+            ]
+        # map preserves the input order
+        return list(
+            self.__request_executor.map(self.get_displayable_business, business_ids)
+        )
+
     def __get_displayable_business_from_yelp_dict(
         self, business_dict: Dict
     ) -> DisplayableBusiness:
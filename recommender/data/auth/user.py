@@ -1,7 +1,7 @@
 from __future__ import annotations
 
-from collections import Callable
 from dataclasses import dataclass, field
+from typing import Callable
 
 from sqlalchemy import Boolean, CheckConstraint, Column, String
 from sqlalchemy.orm import Query, Session, validates
@@ -1,5 +1,40 @@
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.expression import Insert
+
+# unique_violation, see https://www.postgresql.org/docs/current/errcodes-appendix.html
+POSTGRES_UNIQUE_VIOLATION_CODE = "23505"
 
 
 def is_unique_key_error(error: IntegrityError):
+    if getattr(error.orig, "pgcode", None) == POSTGRES_UNIQUE_VIOLATION_CODE:
+        return True
     return "UNIQUE constraint" in str(error.orig)
+
+
+def upsert(db_session: Session, table) -> Optional[Insert]:
+    """
+    :return: an insert into the table that supports on_conflict_do_update on the database of the session, or None if
+    the database has no such upsert
+    """
+    dialect_name = db_session.get_bind().dialect.name
+    if dialect_name == "postgresql":
+        return postgresql.insert(table)
+    if dialect_name == "sqlite":
+        return sqlite.insert(table)
+    return None
+
+
+def lock_until_end_of_transaction(db_session: Session, key: str):
+    """
+    transactions that lock the same key run one after the other (PostgreSQL advisory lock, released on commit or
+    rollback). Nothing to do on sqlite, where write transactions are already serialized
+    """
+    if db_session.get_bind().dialect.name == "postgresql":
+        db_session.execute(
+            text("SELECT pg_advisory_xact_lock(hashtext(:key))"), {"key": key}
+        )
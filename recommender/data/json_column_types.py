@@ -0,0 +1,129 @@
+"""
+Column types that store structured values as compact JSON instead of pickles, so rows can be read (and filtered) in SQL
+and stay readable when the python classes change. Each type converts between its class and plain JSON values.
+"""
+from datetime import datetime
+from itertools import chain
+from typing import Dict, List, Optional, Union
+
+from sqlalchemy import JSON
+from sqlalchemy.types import TypeDecorator
+
+from recommender.data.rcv.election_result import CandidateRoundResult, ElectionResult
+from recommender.data.rcv.round_action import RoundAction
+from recommender.data.recommendation.filterable_business import RecommendableBusiness
+from recommender.data.recommendation.price import PriceCategory
+
+
+def encode_election_result(election_result: ElectionResult) -> Dict:
+    """
+    the business ids are stored once. Each round lists the [number of rank one votes, round action name] of every
+    candidate in the order of the business ids, or null once the candidate is no longer in the round
+    """
+    # in the order the candidates first appear, usually all of them in the first round
+    business_ids = list(dict.fromkeys(chain.from_iterable(election_result.rounds)))
+    return {
+        "calculatedAt": encode_timestamp(election_result.calculated_at),
+        "businessIds": business_ids,
+        "rounds": [
+            [
+                None
+                if business_id not in round
+                else [
+                    round[business_id].number_of_rank_one_votes,
+                    None
+                    if round[business_id].round_action is None
+                    else round[business_id].round_action.name,
+                ]
+                for business_id in business_ids
+            ]
+            for round in election_result.rounds
+        ],
+    }
+
+
+def decode_election_result(value: Dict) -> ElectionResult:
+    business_ids = value["businessIds"]
+    return ElectionResult(
+        rounds=[
+            {
+                business_id: CandidateRoundResult(
+                    number_of_rank_one_votes=candidate_result[0],
+                    round_action=None
+                    if candidate_result[1] is None
+                    else RoundAction[candidate_result[1]],
+                )
+                for business_id, candidate_result in zip(business_ids, round)
+                if candidate_result is not None
+            }
+            for round in value["rounds"]
+        ],
+        calculated_at=decode_timestamp(value["calculatedAt"]),
+    )
+
+
+def encode_timestamp(timestamp: Union[float, datetime]) -> Union[float, str]:
+    return timestamp.isoformat() if isinstance(timestamp, datetime) else timestamp
+
+
+def decode_timestamp(timestamp: Union[float, str]) -> Union[float, datetime]:
+    return (
+        datetime.fromisoformat(timestamp) if isinstance(timestamp, str) else timestamp
+    )
+
+
+class ElectionResultJson(TypeDecorator):
+    impl = JSON(none_as_null=True)
+    cache_ok = True
+
+    def process_bind_param(
+        self, value: Optional[ElectionResult], dialect
+    ) -> Optional[Dict]:
+        return None if value is None else encode_election_result(value)
+
+    def process_result_value(
+        self, value: Optional[Dict], dialect
+    ) -> Optional[ElectionResult]:
+        return None if value is None else decode_election_result(value)
+
+
+class RecommendableBusinessJson(TypeDecorator):
+    """
+    stores the business in the shape of the Yelp API (see RecommendableBusiness.to_dict)
+    """
+
+    impl = JSON(none_as_null=True)
+    cache_ok = True
+
+    def process_bind_param(
+        self, value: Optional[RecommendableBusiness], dialect
+    ) -> Optional[Dict]:
+        return None if value is None else value.to_dict()
+
+    def process_result_value(
+        self, value: Optional[Dict], dialect
+    ) -> Optional[RecommendableBusiness]:
+        return None if value is None else RecommendableBusiness.from_dict(value)
+
+
+class PriceCategoryListJson(TypeDecorator):
+    """
+    stores the names of the price categories
+    """
+
+    impl = JSON(none_as_null=True)
+    cache_ok = True
+
+    def process_bind_param(
+        self, value: Optional[List[PriceCategory]], dialect
+    ) -> Optional[List[str]]:
+        return (
+            None if value is None else [price_category.name for price_category in value]
+        )
+
+    def process_result_value(
+        self, value: Optional[List[str]], dialect
+    ) -> Optional[List[PriceCategory]]:
+        return (
+            None if value is None else [PriceCategory.from_name(name) for name in value]
+        )
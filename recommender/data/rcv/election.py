@@ -1,13 +1,23 @@
 from __future__ import annotations
 
 from datetime import datetime
-from operator import and_
-from typing import Callable, Dict, List, Optional
-
-from sqlalchemy import Column, DateTime, Enum, ForeignKey, Index, String, func, PickleType, select
-from sqlalchemy.orm import Query, Session, aliased, relationship, object_session
+from itertools import groupby
+from operator import itemgetter
+from typing import Callable, Dict, FrozenSet, Iterator, List, Optional, Tuple
+
+from sqlalchemy import Column, DateTime, Enum, ForeignKey, Index, String, select
+from sqlalchemy.orm import (
+    Query,
+    Session,
+    defer,
+    joinedload,
+    object_session,
+    relationship,
+    selectinload,
+)
 
 from recommender.data.auth.user import BasicUser
+from recommender.data.json_column_types import ElectionResultJson
 from recommender.data.rcv.candidate import Candidate
 from recommender.data.rcv.election_result import ElectionResult
 from recommender.data.rcv.election_status import ElectionStatus
@@ -16,18 +26,40 @@ from recommender.data.serializable import serializable_persistence_object
 from recommender.db_config import DbBase
 
 ACTIVE_ID_LENGTH = 6
+# rows buffered per fetch while streaming ballots
+BALLOT_ROWS_PER_FETCH = 1000
+
+
+def with_candidates_and_nominators(query: Query) -> Query:
+    """
+    query modifier for Election.get_election_by_id that loads the candidates and their nominators in a second query
+    (instead of one lazy load per candidate and nominator). The JSON result is deferred until it is read
+    """
+    return query.options(
+        defer(Election.election_result),
+        selectinload(Election.candidates).joinedload(Candidate.nominator),
+    )
 
 
 @serializable_persistence_object
 class Election(DbBase):
     @staticmethod
     def get_election_by_id(
-            db_session: Session,
-            id: str,
-            query_modifier: Callable[[Query], Query] = lambda x: x,
+        db_session: Session,
+        id: str,
+        query_modifier: Callable[[Query], Query] = lambda x: x,
     ) -> Optional[Election]:
         return query_modifier(db_session.query(Election)).filter_by(id=id).first()
 
+    @staticmethod
+    def get_candidate_ids(db_session: Session, id: str) -> FrozenSet[str]:
+        return frozenset(
+            business_id
+            for business_id, in db_session.query(Candidate.business_id).filter_by(
+                election_id=id
+            )
+        )
+
     @staticmethod
     def get_number_of_candidates(db_session: Session, id: str) -> int:
         return db_session.query(Candidate).filter_by(election_id=id).count()
@@ -40,43 +72,40 @@ class Election(DbBase):
 
     @staticmethod
     def get_active_election_by_active_id(
-            db_session: Session,
-            active_id: str,
-            query_modifier: Callable[[Query], Query] = lambda x: x,
+        db_session: Session,
+        active_id: str,
+        query_modifier: Callable[[Query], Query] = lambda x: x,
     ) -> Optional[Election]:
         return (
             query_modifier(db_session.query(Election))
-                .filter_by(active_id=active_id, election_completed_at=None)
-                .first()
+            .filter_by(active_id=active_id, election_completed_at=None)
+            .first()
         )
 
     @staticmethod
-    def get_rankings_by_user_for_election(
-            db_session: Session, election_id: str
-    ) -> Dict[str, List[str]]:
-        aliased_ranking_table = aliased(Ranking, name="aliased_ranking")
-
-        user_rankings = (
-            db_session.query(func.group_concat(aliased_ranking_table.business_id))
-                .filter(
-                aliased_ranking_table.user_id == Ranking.user_id,
-                aliased_ranking_table.election_id == election_id,
-            )
-                .order_by(aliased_ranking_table.rank.asc())
-                .correlate(Ranking)
-                .as_scalar()
-        )
-        rankings_for_election = (
-            db_session.query(Ranking.user_id, user_rankings)
-                .filter(Ranking.election_id == election_id)
-                .group_by(Ranking.user_id)
-                .all()
+    def iterate_ballots(
+        db_session: Session, election_id: str
+    ) -> Iterator[Tuple[str, List[str]]]:
+        """
+        streams the rankings of the election from a single scan of the ranking_election_ballots index, ordered by voter
+        then rank, and groups the rows of each voter into their ballot
+
+        :return: (user id, business ids by rank) of every voter
+        """
+        rows = (
+            db_session.query(Ranking.user_id, Ranking.business_id)
+            .filter(Ranking.election_id == election_id)
+            .order_by(Ranking.user_id.asc(), Ranking.rank.asc())
+            .yield_per(BALLOT_ROWS_PER_FETCH)
         )
+        for user_id, user_rows in groupby(rows, key=itemgetter(0)):
+            yield user_id, [business_id for _, business_id in user_rows]
 
-        return {
-            user_id: rank_string.split(",")
-            for user_id, rank_string in rankings_for_election
-        }
+    @staticmethod
+    def get_rankings_by_user_for_election(
+        db_session: Session, election_id: str
+    ) -> Dict[str, List[str]]:
+        return dict(Election.iterate_ballots(db_session, election_id))
 
     __tablename__ = "election"
 
@@ -89,17 +118,28 @@ class Election(DbBase):
     election_creator_id: str = Column(
         String(length=36), ForeignKey(BasicUser.id), nullable=False
     )
-    election_result: Optional[ElectionResult] = Column("election_result", PickleType)
+    election_result: Optional[ElectionResult] = Column(
+        "election_result", ElectionResultJson
+    )
 
     election_creator = relationship("BasicUser", uselist=False)
     candidates: List[Candidate] = relationship("Candidate")
 
     @property
     def voters(self) -> [BasicUser]:
-        return [row[0] for row in object_session(self).execute(
-            select(BasicUser). \
-                where(and_(Ranking.election_id == self.id, BasicUser.id == Ranking.user_id)).
-                distinct()
-        ).all()]
+        # every ballot has exactly one first choice, so joining on it selects each voter once without a DISTINCT over
+        # all of the rankings
+        return [
+            row[0]
+            for row in object_session(self)
+            .execute(
+                select(BasicUser).where(
+                    Ranking.election_id == self.id,
+                    Ranking.rank == 0,
+                    BasicUser.id == Ranking.user_id,
+                )
+            )
+            .all()
+        ]
 
     __table_args__ = (Index("active_id", active_id, election_completed_at),)
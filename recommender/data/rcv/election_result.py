@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Dict, Optional, Union
 
 from recommender.data.rcv.round_action import RoundAction
 from recommender.utilities.json_encode_utilities import NoNormalizationDict
@@ -36,3 +36,30 @@ class DisplayableElectionResult:
 
     rounds: [NoNormalizationDict[str, CandidateRoundResult]]
     calculated_at: float
+
+    def to_serializable_dict(self) -> Dict:
+        """
+        the json_encode representation of the result, built directly because results carry every round of every
+        candidate
+        """
+        return {
+            "rounds": [
+                {
+                    business_id: {
+                        "numberOfRankOneVotes": candidate_result.number_of_rank_one_votes,
+                        "roundAction": None
+                        if candidate_result.round_action is None
+                        else candidate_result.round_action.name,
+                    }
+                    for business_id, candidate_result in round.items()
+                }
+                for round in self.rounds
+            ],
+            "calculatedAt": self.__to_serializable_timestamp(self.calculated_at),
+        }
+
+    @staticmethod
+    def __to_serializable_timestamp(
+        timestamp: Union[float, datetime]
+    ) -> Union[float, str]:
+        return str(timestamp) if isinstance(timestamp, datetime) else timestamp
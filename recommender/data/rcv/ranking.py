@@ -1,4 +1,5 @@
 from sqlalchemy import (
+    Boolean,
     String,
     Column,
     ForeignKeyConstraint,
@@ -6,21 +7,78 @@ from sqlalchemy import (
     PrimaryKeyConstraint,
     UniqueConstraint,
     ForeignKey,
+    Index,
+    delete,
+    insert,
+    literal_column,
+    update,
 )
 from sqlalchemy.orm import Session
 
 from recommender.data.auth.user import BasicUser
+from recommender.data.db_utils import lock_until_end_of_transaction, upsert
 from recommender.db_config import DbBase
 
 
 class Ranking(DbBase):
     @staticmethod
-    def delete_users_rankings_for_election(
-        db_session: Session, user_id: str, election_id: str
-    ) -> int:
-        return db_session.query(Ranking).filter_by(
-            user_id=user_id, election_id=election_id
-        ).delete()
+    def replace_users_rankings_for_election(
+        db_session: Session, user_id: str, election_id: str, business_ids: [str]
+    ) -> bool:
+        """
+        replaces the ballot of the user with one upsert. Their current rankings are parked on negative ranks first, so
+        the new ranks never conflict with the ranks they replace (the rank is unique per ballot). Concurrent
+        replacements of the same ballot wait for each other, so the second one sees and parks the first ballot.
+        Databases without an upsert delete the ballot and insert it again instead
+
+        :param business_ids: every candidate of the election, by rank
+        :return: if the user had already voted. Only derived from the upsert on PostgreSQL. Elsewhere it is the number
+        of rankings replaced, which is exact because sqlite serializes write transactions (and the advisory lock is
+        PostgreSQL only)
+        """
+        lock_until_end_of_transaction(db_session, f"ranking:{user_id}:{election_id}")
+        is_users_ballot = (Ranking.user_id == user_id) & (
+            Ranking.election_id == election_id
+        )
+        rankings = [
+            {
+                "user_id": user_id,
+                "election_id": election_id,
+                "business_id": business_id,
+                "rank": rank,
+            }
+            for rank, business_id in enumerate(business_ids)
+        ]
+        ranking_upsert = upsert(db_session, Ranking)
+        if ranking_upsert is None:
+            number_of_deleted_rankings = db_session.execute(
+                delete(Ranking)
+                .where(is_users_ballot)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            db_session.execute(insert(Ranking), rankings)
+            return number_of_deleted_rankings > 0
+
+        number_of_parked_rankings = db_session.execute(
+            update(Ranking)
+            .where(is_users_ballot)
+            .values(rank=-1 - Ranking.rank)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        ranking_upsert = ranking_upsert.values(rankings)
+        ranking_upsert = ranking_upsert.on_conflict_do_update(
+            index_elements=[Ranking.user_id, Ranking.election_id, Ranking.business_id],
+            set_={"rank": ranking_upsert.excluded.rank},
+        )
+        if db_session.get_bind().dialect.name == "postgresql":
+            # xmax is 0 for inserted rows, and set for rows updated on conflict
+            are_inserted = db_session.execute(
+                ranking_upsert.returning(literal_column("xmax = 0", Boolean))
+            ).scalars()
+            return not all(are_inserted)
+        # sqlite has no RETURNING in SQLAlchemy 1.4
+        db_session.execute(ranking_upsert)
+        return number_of_parked_rankings > 0
 
     __tablename__ = "ranking"
 
@@ -36,4 +94,6 @@ class Ranking(DbBase):
             [election_id, business_id],
             ["candidate.election_id", "candidate.business_id"],
         ),
+        # covers Election.iterate_ballots, so the ballots are read in order from the index alone
+        Index("ranking_election_ballots", election_id, user_id, rank, business_id),
     )
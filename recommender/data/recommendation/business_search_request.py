@@ -1,8 +1,9 @@
 from typing import Dict
 
-from sqlalchemy import Column, String, Float, PickleType, ForeignKey
+from sqlalchemy import Column, String, Float, JSON, ForeignKey
 from sqlalchemy.orm import composite
 
+from recommender.data.json_column_types import PriceCategoryListJson
 from recommender.data.serializable import serializable_persistence_object
 from recommender.db_config import DbBase
 from recommender.data.recommendation.location import Location
@@ -40,7 +41,7 @@ class BusinessSearchRequest(DbBase):
     lat: float = Column(Float)
     long: float = Column(Float)
     location: Location = composite(Location, lat, long)
-    price_categories: [PriceCategory] = Column(PickleType)
-    categories: [str] = Column(PickleType)
-    attributes: [str] = Column(PickleType)
+    price_categories: [PriceCategory] = Column(PriceCategoryListJson)
+    categories: [str] = Column(JSON(none_as_null=True))
+    attributes: [str] = Column(JSON(none_as_null=True))
     radius: float = Column(Float)
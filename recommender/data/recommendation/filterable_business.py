@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from typing import Dict
 
 from recommender.data.recommendation.price import PriceCategory
 
@@ -41,3 +42,16 @@ class RecommendableBusiness:
     rating: str
     price_category: PriceCategory
     distance: float
+
+    def to_dict(self) -> Dict:
+        """
+        inverse of from_dict (returns the same shape as the Yelp API)
+        """
+        return {
+            "id": self.id,
+            "name": self.name,
+            "url": self.url,
+            "rating": self.rating,
+            "price": self.price_category.get_yelp_api_return_value(),
+            "distance": self.distance,
+        }
@@ -1,10 +1,11 @@
 from __future__ import annotations
 
-from typing import Optional
+from typing import Dict, Optional
 
-from sqlalchemy import Column, String, Float, ForeignKey, Enum, PickleType
+from sqlalchemy import Column, String, Float, ForeignKey, Enum, Index
 from sqlalchemy.orm import Session
 
+from recommender.data.json_column_types import RecommendableBusinessJson
 from recommender.data.recommendation.filterable_business import RecommendableBusiness
 from recommender.db_config import DbBase
 from recommender.data.recommendation.recommendation_action import RecommendationAction
@@ -21,6 +22,37 @@ class Recommendation(DbBase):
             .first()
         )
 
+    @staticmethod
+    def get_current_recommendation(
+        db_session: Session, session_id: str
+    ) -> Optional[Recommendation]:
+        """
+        :return: the recommendation the user has not acted on yet, if any
+        """
+        return (
+            db_session.query(Recommendation)
+            .filter(
+                Recommendation.session_id == session_id, Recommendation.status.is_(None)
+            )
+            .first()
+        )
+
+    @staticmethod
+    def get_seen_business_names(db_session: Session, session_id: str) -> Dict[str, str]:
+        """
+        :return: business name by business id of the recommendations the user acted on. Only the names are read out
+        of the stored businesses
+        """
+        return dict(
+            db_session.query(
+                Recommendation.business_id,
+                Recommendation.business_data_for_recommendation["name"].as_string(),
+            ).filter(
+                Recommendation.session_id == session_id,
+                Recommendation.status.isnot(None),
+            )
+        )
+
     __tablename__ = "recommendation"
 
     session_id: str = Column(
@@ -37,5 +69,7 @@ class Recommendation(DbBase):
     recommendation (in case the business changes with time)
     """
     business_data_for_recommendation: RecommendableBusiness = Column(
-        PickleType, nullable=False
+        RecommendableBusinessJson, nullable=False
     )
+
+    __table_args__ = (Index("recommendation_session_status", session_id, status),)
@@ -2,8 +2,8 @@ from __future__ import annotations
 
 from typing import Callable, Optional
 
-from sqlalchemy import Column, Enum, ForeignKey, String
-from sqlalchemy.orm import Query, Session, relationship
+from sqlalchemy import Column, Enum, ForeignKey, Index, String
+from sqlalchemy.orm import Query, Session, joinedload, relationship, selectinload
 
 from recommender.data.auth.user import BasicUser
 from recommender.data.rcv.election import Election
@@ -17,14 +17,23 @@ from recommender.data.serializable import serializable_persistence_object
 from recommender.db_config import DbBase
 
 
-def generate_recommendation_join_on_status(
-    status: Optional[RecommendationAction],
-) -> str:
-    if status is None:
-        status_condition = "Recommendation.status.is_(None)"
-    else:
-        status_condition = f"Recommendation.status == '{status.value}'"
-    return f"and_(Recommendation.session_id == SearchSession.id, {status_condition})"
+def with_search_request(query: Query) -> Query:
+    """
+    query modifier for SearchSession.get_session_by_id that loads the search request with the session, but none of
+    the recommendations
+    """
+    return query.options(joinedload(SearchSession.search_request))
+
+
+def with_search_request_and_recommendations(query: Query) -> Query:
+    """
+    query modifier for SearchSession.get_session_by_id that loads the search request with the session and every
+    recommendation in a second query (instead of one lazy load per relationship)
+    """
+    return query.options(
+        joinedload(SearchSession.search_request),
+        selectinload(SearchSession.recommendations),
+    )
 
 
 @serializable_persistence_object
@@ -62,6 +71,8 @@ class SearchSession(DbBase):
     dinner_party: Optional[Election] = relationship("Election", uselist=False)
     created_by: Optional[BasicUser] = relationship("BasicUser", uselist=False)
 
+    __table_args__ = (Index("search_session_dinner_party", dinner_party_id),)
+
     @property
     def is_complete(self) -> bool:
         return self.session_status == SearchSessionStatus.COMPLETE
@@ -70,28 +81,41 @@ class SearchSession(DbBase):
     def is_dinner_party(self) -> bool:
         return self.dinner_party_id is not None
 
-    accepted_recommendations: [Recommendation] = relationship(
-        "Recommendation",
-        primaryjoin=generate_recommendation_join_on_status(RecommendationAction.ACCEPT),
-        uselist=True,
-        viewonly=True,
-    )
-    current_recommendation: Optional[Recommendation] = relationship(
-        "Recommendation",
-        primaryjoin=generate_recommendation_join_on_status(None),
-        uselist=False,
-        viewonly=True,
-    )
-    maybe_recommendations: [Recommendation] = relationship(
-        "Recommendation",
-        primaryjoin=generate_recommendation_join_on_status(RecommendationAction.MAYBE),
-        viewonly=True,
-    )
-    rejected_recommendations: [Recommendation] = relationship(
-        "Recommendation",
-        primaryjoin=generate_recommendation_join_on_status(RecommendationAction.REJECT),
-        viewonly=True,
-    )
+    # every recommendation of the session. Partitioned by status in python so one load serves every status
+    recommendations: [Recommendation] = relationship("Recommendation", viewonly=True)
+
+    @property
+    def current_recommendation(self) -> Optional[Recommendation]:
+        return next(
+            (
+                recommendation
+                for recommendation in self.recommendations
+                if recommendation.status is None
+            ),
+            None,
+        )
+
+    @property
+    def accepted_recommendations(self) -> [Recommendation]:
+        return self.__get_recommendations_with_status(RecommendationAction.ACCEPT)
+
+    @property
+    def maybe_recommendations(self) -> [Recommendation]:
+        return self.__get_recommendations_with_status(RecommendationAction.MAYBE)
+
+    @property
+    def rejected_recommendations(self) -> [Recommendation]:
+        return self.__get_recommendations_with_status(RecommendationAction.REJECT)
+
+    def get_recommendation(self, business_id: str) -> Optional[Recommendation]:
+        return next(
+            (
+                recommendation
+                for recommendation in self.recommendations
+                if recommendation.business_id == business_id
+            ),
+            None,
+        )
 
     @property
     def current_recommendation_id(self) -> str:
@@ -121,5 +145,14 @@ class SearchSession(DbBase):
             for recommendation in self.rejected_recommendations
         ]
 
+    def __get_recommendations_with_status(
+        self, status: RecommendationAction
+    ) -> [Recommendation]:
+        return [
+            recommendation
+            for recommendation in self.recommendations
+            if recommendation.status == status
+        ]
+
     def clone(self) -> SearchSession:
         return SearchSession(**self.__get_public_attributes__())
@@ -2,21 +2,62 @@ import os
 
 from redis import Redis
 from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
 from recommender.data.persistence_object import PersistenceObject
 from recommender.env_config import PROD
 
-engine = create_engine(
-    "sqlite:///recommendation.db", connect_args={"check_same_thread": False}
+DEFAULT_DATABASE_URL = "sqlite:///recommendation.db"
+DATABASE_URL = os.environ.get("DATABASE_URL", DEFAULT_DATABASE_URL)
+# ignored by sqlite, which opens a connection per checkout
+DATABASE_POOL_SIZE = int(os.environ.get("DATABASE_POOL_SIZE", 5))
+DATABASE_MAX_OVERFLOW = int(os.environ.get("DATABASE_MAX_OVERFLOW", 10))
+DATABASE_POOL_RECYCLE_IN_SECONDS = int(
+    os.environ.get("DATABASE_POOL_RECYCLE_IN_SECONDS", 30 * 60)
 )
-if not PROD:
-    @event.listens_for(engine, "connect")
-    def activate_foreign_keys(connection, record):
-        connection.execute("pragma foreign_keys=ON")
+DATABASE_POOL_PRE_PING = (
+    os.environ.get("DATABASE_POOL_PRE_PING", "true").lower() == "true"
+)
+# how long a sqlite writer waits for the file lock held by another process before failing
+SQLITE_BUSY_TIMEOUT_IN_MILLISECONDS = int(
+    os.environ.get("SQLITE_BUSY_TIMEOUT_IN_MILLISECONDS", 5000)
+)
+
+
+def normalize_database_url(database_url: str) -> str:
+    # heroku still provides the postgres:// scheme, which sqlalchemy 1.4 no longer accepts
+    if database_url.startswith("postgres://"):
+        return "postgresql://" + database_url[len("postgres://") :]
+    return database_url
+
+
+def create_database_engine(database_url: str) -> Engine:
+    url = make_url(normalize_database_url(database_url))
+    if url.get_backend_name() != "sqlite":
+        return create_engine(
+            url,
+            pool_size=DATABASE_POOL_SIZE,
+            max_overflow=DATABASE_MAX_OVERFLOW,
+            pool_recycle=DATABASE_POOL_RECYCLE_IN_SECONDS,
+            pool_pre_ping=DATABASE_POOL_PRE_PING,
+        )
+
+    sqlite_engine = create_engine(url, connect_args={"check_same_thread": False})
+
+    @event.listens_for(sqlite_engine, "connect")
+    def configure_sqlite_connection(connection, record):
+        # readers no longer block the writer, and the web processes and workers wait for the lock instead of failing
+        connection.execute("pragma journal_mode=WAL")
+        connection.execute(f"pragma busy_timeout={SQLITE_BUSY_TIMEOUT_IN_MILLISECONDS}")
+        if not PROD:
+            connection.execute("pragma foreign_keys=ON")
+
+    return sqlite_engine
 
 
+engine = create_database_engine(DATABASE_URL)
 DbSession = sessionmaker(autoflush=True, bind=engine)
 DbBase = declarative_base(cls=PersistenceObject)
 
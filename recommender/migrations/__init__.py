@@ -0,0 +1,47 @@
+"""
+Versioned schema migrations (alembic). upgrade_database brings the database to the latest revision. In production it
+runs once per release (`python -m recommender.migrations`, the release process of the Procfile) before the new processes
+start. The processes still upgrade at boot for local development, which is a no-op at the latest revision.
+
+To add a migration: `alembic revision --autogenerate -m "<message>"` from the repository root, then review it.
+"""
+import os
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+from recommender.db_config import engine as app_engine
+
+MIGRATIONS_DIRECTORY = os.path.dirname(__file__)
+BASELINE_REVISION = "0001"
+ALEMBIC_VERSION_TABLE = "alembic_version"
+# key of the PostgreSQL advisory lock held while upgrading
+UPGRADE_LOCK_ID = 7_301_552_019
+
+
+def create_alembic_config(connection=None) -> Config:
+    config = Config()
+    config.set_main_option("script_location", MIGRATIONS_DIRECTORY)
+    config.attributes["connection"] = connection
+    return config
+
+
+def upgrade_database(engine: Engine = app_engine):
+    """
+    concurrent upgrades (e.g. of the web processes booting together) wait for each other on PostgreSQL, so only the
+    first one migrates. The lock is released with the transaction
+    """
+    with engine.begin() as connection:
+        if connection.dialect.name == "postgresql":
+            connection.execute(
+                text("SELECT pg_advisory_xact_lock(:lock_id)"),
+                {"lock_id": UPGRADE_LOCK_ID},
+            )
+        config = create_alembic_config(connection)
+        table_names = inspect(connection).get_table_names()
+        if ALEMBIC_VERSION_TABLE not in table_names and "election" in table_names:
+            # created by DbBase.metadata.create_all before the migrations existed, so its schema is the baseline
+            command.stamp(config, BASELINE_REVISION)
+        command.upgrade(config, "head")
@@ -0,0 +1,4 @@
+from recommender.migrations import upgrade_database
+
+if __name__ == "__main__":
+    upgrade_database()
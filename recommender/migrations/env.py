@@ -0,0 +1,34 @@
+from alembic import context
+
+# import every model so the metadata is complete for autogenerate
+import recommender.data.rcv.election  # noqa: F401
+import recommender.data.recommendation.search_session  # noqa: F401
+from recommender.db_config import DbBase, engine
+
+config = context.config
+target_metadata = DbBase.metadata
+
+
+def run_migrations(connection):
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        # sqlite cannot alter most of a table, so alter operations copy it into a new table instead
+        render_as_batch=connection.dialect.name == "sqlite",
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+if context.is_offline_mode():
+    context.configure(
+        url=engine.url, target_metadata=target_metadata, literal_binds=True
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+elif config.attributes.get("connection") is not None:
+    # upgrade_database passes the connection of the application engine
+    run_migrations(config.attributes["connection"])
+else:
+    with engine.connect() as connection:
+        run_migrations(connection)
@@ -0,0 +1,144 @@
+"""
+baseline: the schema DbBase.metadata.create_all created before the migrations existed
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def timestamp_columns():
+    return [
+        sa.Column(
+            "created_at", sa.DateTime(), server_default=sa.func.now(), nullable=True
+        ),
+        sa.Column(
+            "updated_at", sa.DateTime(), server_default=sa.func.now(), nullable=True
+        ),
+    ]
+
+
+def upgrade():
+    op.create_table(
+        "user",
+        *timestamp_columns(),
+        sa.Column("id", sa.String(length=36), nullable=False),
+        sa.Column("nickname", sa.String(length=100), nullable=False),
+        sa.Column("type", sa.String(length=100), nullable=False),
+        sa.Column("email", sa.String(length=300), nullable=True),
+        sa.Column("first_name", sa.String(length=300), nullable=True),
+        sa.Column("last_name", sa.String(length=300), nullable=True),
+        sa.Column("password", sa.String(length=300), nullable=True),
+        sa.Column("is_admin", sa.Boolean(), nullable=True),
+        sa.CheckConstraint("LENGTH(nickname) > 0"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "election",
+        *timestamp_columns(),
+        sa.Column("id", sa.String(length=36), nullable=False),
+        sa.Column("active_id", sa.String(length=6), nullable=True),
+        sa.Column(
+            "election_status",
+            sa.Enum("IN_CREATION", "VOTING", "COMPLETE", name="electionstatus"),
+            nullable=False,
+        ),
+        sa.Column("election_completed_at", sa.DateTime(), nullable=True),
+        sa.Column("election_creator_id", sa.String(length=36), nullable=False),
+        sa.Column("election_result", sa.PickleType(), nullable=True),
+        sa.ForeignKeyConstraint(["election_creator_id"], ["user.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("active_id", "election", ["active_id", "election_completed_at"])
+    op.create_table(
+        "candidate",
+        *timestamp_columns(),
+        sa.Column("nominator_id", sa.String(length=36), nullable=True),
+        sa.Column("election_id", sa.String(length=36), nullable=False),
+        sa.Column("business_id", sa.String(length=100), nullable=False),
+        sa.Column("distance", sa.Float(), nullable=True),
+        sa.ForeignKeyConstraint(["election_id"], ["election.id"]),
+        sa.ForeignKeyConstraint(["nominator_id"], ["user.id"]),
+        sa.PrimaryKeyConstraint("election_id", "business_id"),
+    )
+    op.create_table(
+        "search_session",
+        *timestamp_columns(),
+        sa.Column("id", sa.String(length=36), nullable=False),
+        sa.Column(
+            "session_status",
+            sa.Enum("IN_PROGRESS", "COMPLETE", name="searchsessionstatus"),
+            nullable=False,
+        ),
+        sa.Column("dinner_party_id", sa.String(length=36), nullable=True),
+        sa.Column("created_by_id", sa.String(length=36), nullable=True),
+        sa.ForeignKeyConstraint(["created_by_id"], ["user.id"]),
+        sa.ForeignKeyConstraint(["dinner_party_id"], ["election.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "ranking",
+        *timestamp_columns(),
+        sa.Column("user_id", sa.String(length=36), nullable=False),
+        sa.Column("election_id", sa.String(length=36), nullable=False),
+        sa.Column("business_id", sa.String(length=100), nullable=False),
+        sa.Column("rank", sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["election_id", "business_id"],
+            ["candidate.election_id", "candidate.business_id"],
+        ),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"]),
+        sa.PrimaryKeyConstraint("user_id", "election_id", "business_id"),
+        sa.UniqueConstraint("user_id", "election_id", "rank"),
+    )
+    op.create_table(
+        "recommendation",
+        *timestamp_columns(),
+        sa.Column("session_id", sa.String(length=36), nullable=False),
+        sa.Column("business_id", sa.String(length=100), nullable=False),
+        sa.Column("distance", sa.Float(), nullable=True),
+        sa.Column(
+            "status",
+            sa.Enum("MAYBE", "REJECT", "ACCEPT", name="recommendationaction"),
+            nullable=True,
+        ),
+        sa.Column("business_data_for_recommendation", sa.PickleType(), nullable=False),
+        sa.ForeignKeyConstraint(["session_id"], ["search_session.id"]),
+        sa.PrimaryKeyConstraint("session_id", "business_id"),
+    )
+    op.create_table(
+        "search_request",
+        *timestamp_columns(),
+        sa.Column("session_id", sa.String(length=36), nullable=False),
+        sa.Column("search_term", sa.String(length=1000), nullable=True),
+        sa.Column("lat", sa.Float(), nullable=True),
+        sa.Column("long", sa.Float(), nullable=True),
+        sa.Column("price_categories", sa.PickleType(), nullable=True),
+        sa.Column("categories", sa.PickleType(), nullable=True),
+        sa.Column("attributes", sa.PickleType(), nullable=True),
+        sa.Column("radius", sa.Float(), nullable=True),
+        sa.ForeignKeyConstraint(["session_id"], ["search_session.id"]),
+        sa.PrimaryKeyConstraint("session_id"),
+    )
+
+
+def downgrade():
+    for table_name in [
+        "search_request",
+        "recommendation",
+        "ranking",
+        "search_session",
+        "candidate",
+        "election",
+        "user",
+    ]:
+        op.drop_table(table_name)
+    for enum_name in ["recommendationaction", "searchsessionstatus", "electionstatus"]:
+        sa.Enum(name=enum_name).drop(op.get_bind(), checkfirst=True)
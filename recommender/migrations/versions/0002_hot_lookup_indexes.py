@@ -0,0 +1,45 @@
+"""
+indexes for the hot lookups: the recommendations of a session by status, the search sessions of a dinner party and the
+ballots of an election. The candidates of an election are already served by the candidate primary key
+(election_id, business_id).
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("recommendation_session_status", "recommendation", ["session_id", "status"]),
+    ("search_session_dinner_party", "search_session", ["dinner_party_id"]),
+    # covers Election.iterate_ballots and the voters of an election
+    (
+        "ranking_election_ballots",
+        "ranking",
+        ["election_id", "user_id", "rank", "business_id"],
+    ),
+]
+
+
+def get_existing_index_names(table_name: str) -> [str]:
+    return [
+        index["name"] for index in sa.inspect(op.get_bind()).get_indexes(table_name)
+    ]
+
+
+def upgrade():
+    for index_name, table_name, column_names in INDEXES:
+        # databases created by create_all after the index was declared already have it
+        if index_name not in get_existing_index_names(table_name):
+            op.create_index(index_name, table_name, column_names)
+
+
+def downgrade():
+    for index_name, table_name, _ in INDEXES:
+        op.drop_index(index_name, table_name=table_name)
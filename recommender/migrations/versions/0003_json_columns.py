@@ -0,0 +1,273 @@
+"""
+stores the election results, the recommended businesses and the search request filters as JSON instead of pickles
+
+The formats are copied from recommender.data.json_column_types as they were at this revision, so later changes to the
+column types do not change what this revision writes. Unpickling (and pickling on downgrade) still needs the classes.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from datetime import datetime
+from itertools import chain
+
+from alembic import op
+import sqlalchemy as sa
+
+from recommender.data.rcv.election_result import CandidateRoundResult, ElectionResult
+from recommender.data.rcv.round_action import RoundAction
+from recommender.data.recommendation.filterable_business import RecommendableBusiness
+from recommender.data.recommendation.price import PriceCategory
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+ROWS_PER_UPDATE = 1000
+# the converted values are written to a temporary column, which then replaces the original column
+CONVERTED_COLUMN_SUFFIX = "_converted"
+# "price" of the Yelp API by price category name
+PRICE_BY_PRICE_CATEGORY_NAME = {
+    "FREE": None,
+    "LOW": "$",
+    "MID_LOW": "$$",
+    "MID_HIGH": "$$$",
+    "HIGH": "$$$$",
+}
+PRICE_CATEGORY_NAME_BY_PRICE = {
+    price: name for name, price in PRICE_BY_PRICE_CATEGORY_NAME.items()
+}
+
+
+def encode_election_result(election_result: ElectionResult) -> dict:
+    business_ids = list(dict.fromkeys(chain.from_iterable(election_result.rounds)))
+    return {
+        "calculatedAt": encode_timestamp(election_result.calculated_at),
+        "businessIds": business_ids,
+        "rounds": [
+            [
+                None
+                if business_id not in round
+                else [
+                    round[business_id].number_of_rank_one_votes,
+                    None
+                    if round[business_id].round_action is None
+                    else round[business_id].round_action.name,
+                ]
+                for business_id in business_ids
+            ]
+            for round in election_result.rounds
+        ],
+    }
+
+
+def decode_election_result(value: dict) -> ElectionResult:
+    business_ids = value["businessIds"]
+    return ElectionResult(
+        rounds=[
+            {
+                business_id: CandidateRoundResult(
+                    number_of_rank_one_votes=candidate_result[0],
+                    round_action=None
+                    if candidate_result[1] is None
+                    else RoundAction[candidate_result[1]],
+                )
+                for business_id, candidate_result in zip(business_ids, round)
+                if candidate_result is not None
+            }
+            for round in value["rounds"]
+        ],
+        calculated_at=decode_timestamp(value["calculatedAt"]),
+    )
+
+
+def encode_timestamp(timestamp):
+    return timestamp.isoformat() if isinstance(timestamp, datetime) else timestamp
+
+
+def decode_timestamp(timestamp):
+    return (
+        datetime.fromisoformat(timestamp) if isinstance(timestamp, str) else timestamp
+    )
+
+
+def encode_business(business: RecommendableBusiness) -> dict:
+    return {
+        "id": business.id,
+        "name": business.name,
+        "url": business.url,
+        "rating": business.rating,
+        "price": PRICE_BY_PRICE_CATEGORY_NAME[business.price_category.name],
+        "distance": business.distance,
+    }
+
+
+def decode_business(value: dict) -> RecommendableBusiness:
+    return RecommendableBusiness(
+        id=value["id"],
+        name=value["name"],
+        url=value["url"],
+        rating=value["rating"],
+        price_category=PriceCategory[PRICE_CATEGORY_NAME_BY_PRICE[value["price"]]],
+        distance=value["distance"],
+    )
+
+
+def encode_price_categories(price_categories: [PriceCategory]) -> [str]:
+    return [price_category.name for price_category in price_categories]
+
+
+def decode_price_categories(names: [str]) -> [PriceCategory]:
+    return [PriceCategory[name] for name in names]
+
+
+# table name, primary key column names, column name, nullable, encode, decode
+COLUMNS = [
+    (
+        "election",
+        ["id"],
+        "election_result",
+        True,
+        encode_election_result,
+        decode_election_result,
+    ),
+    (
+        "recommendation",
+        ["session_id", "business_id"],
+        "business_data_for_recommendation",
+        False,
+        encode_business,
+        decode_business,
+    ),
+    (
+        "search_request",
+        ["session_id"],
+        "price_categories",
+        True,
+        encode_price_categories,
+        decode_price_categories,
+    ),
+    ("search_request", ["session_id"], "categories", True, list, list),
+    ("search_request", ["session_id"], "attributes", True, list, list),
+]
+
+
+def convert_column(
+    table_name: str,
+    primary_key_column_names: [str],
+    column_name: str,
+    nullable: bool,
+    from_type: sa.types.TypeEngine,
+    to_type: sa.types.TypeEngine,
+    convert,
+):
+    """
+    replaces the column with a column of the other type, converting every value with convert
+    """
+    converted_column_name = column_name + CONVERTED_COLUMN_SUFFIX
+    with op.batch_alter_table(table_name) as batch_op:
+        batch_op.add_column(sa.Column(converted_column_name, to_type, nullable=True))
+
+    primary_key_columns = [
+        sa.column(name, sa.String) for name in primary_key_column_names
+    ]
+    table = sa.table(
+        table_name,
+        *primary_key_columns,
+        sa.column(column_name, from_type),
+        sa.column(converted_column_name, to_type),
+    )
+    connection = op.get_bind()
+    # pages of rows by primary key, so the table is never loaded into memory at once
+    primary_key = sa.tuple_(*[table.c[name] for name in primary_key_column_names])
+    page_query = (
+        sa.select(*table.c)
+        .where(table.c[column_name].isnot(None))
+        .order_by(*[table.c[name] for name in primary_key_column_names])
+        .limit(ROWS_PER_UPDATE)
+    )
+    update = (
+        table.update()
+        .where(
+            *[
+                table.c[name] == sa.bindparam(f"primary_key_{name}")
+                for name in primary_key_column_names
+            ]
+        )
+        .values({converted_column_name: sa.bindparam("converted_value")})
+    )
+    last_primary_key = None
+    while True:
+        rows = connection.execute(
+            page_query
+            if last_primary_key is None
+            else page_query.where(
+                primary_key
+                > sa.tuple_(*[sa.literal(value) for value in last_primary_key])
+            )
+        ).all()
+        if len(rows) == 0:
+            break
+        connection.execute(
+            update,
+            [
+                {
+                    **{
+                        f"primary_key_{name}": row._mapping[name]
+                        for name in primary_key_column_names
+                    },
+                    "converted_value": convert(row._mapping[column_name]),
+                }
+                for row in rows
+            ],
+        )
+        last_primary_key = [
+            rows[-1]._mapping[name] for name in primary_key_column_names
+        ]
+
+    with op.batch_alter_table(table_name) as batch_op:
+        batch_op.drop_column(column_name)
+        batch_op.alter_column(
+            converted_column_name, new_column_name=column_name, nullable=nullable
+        )
+
+
+def upgrade():
+    for (
+        table_name,
+        primary_key_column_names,
+        column_name,
+        nullable,
+        encode,
+        _,
+    ) in COLUMNS:
+        convert_column(
+            table_name,
+            primary_key_column_names,
+            column_name,
+            nullable,
+            sa.PickleType(),
+            sa.JSON(none_as_null=True),
+            encode,
+        )
+
+
+def downgrade():
+    for (
+        table_name,
+        primary_key_column_names,
+        column_name,
+        nullable,
+        _,
+        decode,
+    ) in reversed(COLUMNS):
+        convert_column(
+            table_name,
+            primary_key_column_names,
+            column_name,
+            nullable,
+            sa.JSON(none_as_null=True),
+            sa.PickleType(),
+            decode,
+        )
@@ -0,0 +1,112 @@
+"""
+NumPy backed ranking tally for elections with many ballots.
+
+Candidate ids are interned to small ints and the distinct ballots are packed into a dense ballots x ranks matrix (int8
+for up to 127 candidates) with a weight per ballot. Each ballot keeps a pointer to its highest ranked active candidate,
+so a round's first choice counts are a single weighted bincount and eliminating a candidate only advances the
+pointers of the ballots that ranked it first, with vectorized masking.
+"""
+from itertools import chain
+from typing import Dict, List
+
+import numpy as np
+
+from recommender.rcv.instant_runoff import BallotWeights, RankingTally
+
+# pads ballots that do not rank every candidate and marks exhausted ballots
+NO_CHOICE = -1
+
+
+class BallotMatrixTally(RankingTally):
+    __candidate_ids: List[str]
+    __active_candidates: np.ndarray
+    # identical ballots are packed once
+    __ballots: np.ndarray
+    __ballot_weights: np.ndarray
+    __ballot_pointers: np.ndarray
+    # interned id of the highest ranked active candidate of each ballot
+    __first_choices: np.ndarray
+
+    def __init__(self, ballot_weights: BallotWeights):
+        """
+        :param ballot_weights: see group_ballots
+        """
+        ballots = list(ballot_weights.keys())
+
+        candidate_indexes: Dict[str, int] = {}
+        for ballot in ballots:
+            for candidate_id in ballot:
+                candidate_indexes.setdefault(candidate_id, len(candidate_indexes))
+        self.__candidate_ids = list(candidate_indexes.keys())
+        self.__active_candidates = np.ones(len(self.__candidate_ids), dtype=bool)
+
+        dtype = (
+            np.int8 if len(self.__candidate_ids) <= np.iinfo(np.int8).max else np.int16
+        )
+        number_of_ranks = max((len(ballot) for ballot in ballots), default=0)
+        if all(len(ballot) == number_of_ranks for ballot in ballots):
+            # every ballot ranks every candidate (enforced when voting), intern in one pass
+            self.__ballots = np.fromiter(
+                map(candidate_indexes.__getitem__, chain.from_iterable(ballots)),
+                dtype=dtype,
+                count=len(ballots) * number_of_ranks,
+            ).reshape(len(ballots), number_of_ranks)
+        else:
+            self.__ballots = np.full(
+                (len(ballots), number_of_ranks), NO_CHOICE, dtype=dtype
+            )
+            for packed_ballot, ballot in zip(self.__ballots, ballots):
+                packed_ballot[: len(ballot)] = [
+                    candidate_indexes[candidate_id] for candidate_id in ballot
+                ]
+        self.__ballot_weights = np.fromiter(
+            ballot_weights.values(), dtype=np.int64, count=len(ballots)
+        )
+        self.__ballot_pointers = np.zeros(len(ballots), dtype=np.intp)
+        self.__first_choices = (
+            self.__ballots[:, 0].astype(np.intp)
+            if number_of_ranks > 0
+            else np.full(len(ballots), NO_CHOICE, dtype=np.intp)
+        )
+
+    @property
+    def number_of_ballots(self) -> int:
+        return int(self.__ballot_weights[self.__first_choices != NO_CHOICE].sum())
+
+    def get_first_choice_counts(self) -> Dict[str, int]:
+        is_continuing = self.__first_choices != NO_CHOICE
+        counts = np.bincount(
+            self.__first_choices[is_continuing],
+            weights=self.__ballot_weights[is_continuing],
+            minlength=len(self.__candidate_ids),
+        )
+        return {
+            self.__candidate_ids[candidate_index]: int(counts[candidate_index])
+            for candidate_index in np.flatnonzero(self.__active_candidates)
+        }
+
+    def eliminate(self, candidate_id: str):
+        candidate_index = self.__candidate_ids.index(candidate_id)
+        self.__active_candidates[candidate_index] = False
+        ballots_to_advance = np.flatnonzero(self.__first_choices == candidate_index)
+        number_of_ranks = self.__ballots.shape[1]
+        while ballots_to_advance.size > 0:
+            pointers = self.__ballot_pointers[ballots_to_advance] + 1
+            self.__ballot_pointers[ballots_to_advance] = pointers
+
+            is_exhausted = pointers >= number_of_ranks
+            self.__first_choices[ballots_to_advance[is_exhausted]] = NO_CHOICE
+            ballots_to_advance = ballots_to_advance[~is_exhausted]
+            next_choices = self.__ballots[
+                ballots_to_advance, pointers[~is_exhausted]
+            ].astype(np.intp)
+            self.__first_choices[ballots_to_advance] = next_choices
+
+            # padding means the ballot is exhausted. Otherwise keep advancing past eliminated candidates
+            is_active_choice = next_choices != NO_CHOICE
+            is_active_choice[is_active_choice] = self.__active_candidates[
+                next_choices[is_active_choice]
+            ]
+            ballots_to_advance = ballots_to_advance[
+                (next_choices != NO_CHOICE) & ~is_active_choice
+            ]
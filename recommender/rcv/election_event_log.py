@@ -0,0 +1,173 @@
+"""
+Replayable log of the update events of an election.
+
+Every event is appended to a capped redis stream and published in the same script, so the stream entry id is the
+event id of the frame and live frames are published in log order. A client that reconnects with the id of the last
+event it received (EventSource sends it as the Last-Event-ID header) is sent the missed tail of the log instead of
+reloading the election.
+"""
+from typing import Collection, Final, List, Optional, Tuple
+
+from redis import Redis
+
+from recommender.api.utils.server_sent_event import ServerSentEvent
+from recommender.db_config import primary_redis_conn
+
+# approximate, redis trims whole macro nodes of the stream
+ELECTION_EVENT_LOG_MAX_LENGTH = 500
+ELECTION_EVENT_LOG_EXPIRATION_IN_SECONDS = 24 * 60 * 60
+# version of elections whose log is empty. Smaller than every stream entry id
+EMPTY_LOG_EVENT_ID: Final[str] = "0-0"
+EVENT_ID_PREFIX: Final[bytes] = b"id: "
+EVENT_TYPE_PREFIX: Final[bytes] = b"event: "
+BODY_FIELD: Final[str] = "body"
+
+# KEYS: stream, version. ARGV: max length, frame body (without the id line), expiration, channel, "1" if the event
+# changes the election
+# returns the id of the appended event
+APPEND_EVENT_SCRIPT: Final[
+    str
+] = """
+local id = redis.call("XADD", KEYS[1], "MAXLEN", "~", ARGV[1], "*", "body", ARGV[2])
+redis.call("EXPIRE", KEYS[1], ARGV[3])
+if ARGV[5] == "1" then
+    redis.call("SET", KEYS[2], id, "EX", ARGV[3])
+else
+    redis.call("EXPIRE", KEYS[2], ARGV[3])
+end
+redis.call("PUBLISH", ARGV[4], "id: " .. id .. "\\n" .. ARGV[2])
+return id
+"""
+
+
+def parse_event_id(event_id: bytes) -> Optional[Tuple[int, int]]:
+    """
+    :return: None if the id is not a stream entry id (e.g. a client sent a stale id format)
+    """
+    milliseconds, separator, sequence_number = event_id.partition(b"-")
+    if separator != b"-" or not milliseconds.isdigit() or not sequence_number.isdigit():
+        return None
+    return int(milliseconds), int(sequence_number)
+
+
+def get_frame_event_id(frame: bytes) -> Optional[Tuple[int, int]]:
+    if not frame.startswith(EVENT_ID_PREFIX):
+        return None
+    return parse_event_id(frame[len(EVENT_ID_PREFIX) : frame.find(b"\n")])
+
+
+def get_frame_event_type(frame: bytes) -> Optional[str]:
+    type_start = frame.find(b"\n" + EVENT_TYPE_PREFIX)
+    if type_start < 0:
+        return None
+    type_start += 1 + len(EVENT_TYPE_PREFIX)
+    return frame[type_start : frame.find(b"\n", type_start)].decode("utf-8")
+
+
+class FrameFilter:
+    """
+    Drops the frames that are not after the last frame that went through, e.g. a live event that was also replayed from
+    the log, and the frames of the excluded event types. Frames without an event id (heartbeats) always go through
+    """
+
+    __excluded_event_types: Final[Collection[str]]
+    __last_event_id: Optional[Tuple[int, int]]
+
+    def __init__(self, excluded_event_types: Collection[str] = ()):
+        self.__excluded_event_types = excluded_event_types
+        self.__last_event_id = None
+
+    def is_included(self, frame: bytes) -> bool:
+        event_id = get_frame_event_id(frame)
+        if event_id is None:
+            return True
+        if self.__last_event_id is not None and event_id <= self.__last_event_id:
+            return False
+        self.__last_event_id = event_id
+        return get_frame_event_type(frame) not in self.__excluded_event_types
+
+
+class ElectionEventLog:
+    __redis_connection: Final[Redis]
+    __max_length: Final[int]
+
+    def __init__(
+        self,
+        redis_connection: Redis = primary_redis_conn,
+        max_length: int = ELECTION_EVENT_LOG_MAX_LENGTH,
+    ):
+        self.__redis_connection = redis_connection
+        self.__max_length = max_length
+        self.__append_event_script = redis_connection.register_script(
+            APPEND_EVENT_SCRIPT
+        )
+
+    def append(
+        self,
+        election_id: str,
+        channel: str,
+        event: ServerSentEvent,
+        changes_election: bool = True,
+    ) -> str:
+        """
+        :param channel: the frame is published on it with the log id as its event id
+        :param changes_election: False for events that do not change the election itself (e.g. results), they do not
+        advance the version of the election
+        :return: event id
+        """
+        event_id = self.__append_event_script(
+            keys=[self.__get_log_key(election_id), self.__get_version_key(election_id)],
+            args=[
+                self.__max_length,
+                event.convention_event_body,
+                ELECTION_EVENT_LOG_EXPIRATION_IN_SECONDS,
+                channel,
+                "1" if changes_election else "0",
+            ],
+        )
+        return event_id.decode("utf-8")
+
+    def get_frames_after(
+        self, election_id: str, last_event_id: str
+    ) -> Optional[List[bytes]]:
+        """
+        :return: None if the event is no longer (or was never) in the log, the missed events cannot be replayed
+        """
+        if parse_event_id(last_event_id.encode("utf-8")) is None:
+            return None
+        entries = self.__redis_connection.xrange(
+            self.__get_log_key(election_id), min=last_event_id
+        )
+        if last_event_id == EMPTY_LOG_EVENT_ID:
+            # every event is after it, unless the log has been trimmed
+            if len(entries) >= self.__max_length:
+                return None
+        elif len(entries) == 0 or entries[0][0].decode("utf-8") != last_event_id:
+            return None
+        else:
+            entries = entries[1:]
+        return [
+            EVENT_ID_PREFIX + event_id + b"\n" + fields[BODY_FIELD.encode("utf-8")]
+            for event_id, fields in entries
+        ]
+
+    def get_last_event_id(self, election_id: str) -> str:
+        entries = self.__redis_connection.xrevrange(
+            self.__get_log_key(election_id), count=1
+        )
+        return (
+            EMPTY_LOG_EVENT_ID if len(entries) == 0 else entries[0][0].decode("utf-8")
+        )
+
+    def get_version(self, election_id: str) -> str:
+        """
+        :return: id of the last logged event that changed the election (see ElectionReadModel)
+        """
+        version = self.__redis_connection.get(self.__get_version_key(election_id))
+        return EMPTY_LOG_EVENT_ID if version is None else version.decode("utf-8")
+
+    def __get_version_key(self, election_id: str) -> str:
+        return f"election:{election_id}:version"
+
+    def __get_log_key(self, election_id: str) -> str:
+        return f"election:{election_id}:events"
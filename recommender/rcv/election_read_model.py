@@ -0,0 +1,150 @@
+"""
+Materialized, pre-serialized DisplayableElection (with voters) of each election, so that reading an election is a single
+redis read.
+
+The read model is a hash of the serialized election and its version: the id of the last election event (see
+ElectionEventLog) it includes. Result events do not change the election and are not versions. It is built from the database on the first read, then updated incrementally by the code
+paths that publish the candidate added, vote cast and status changed events. Updates are idempotent and only applied to
+an older version. An update of a missing read model is skipped, so a rebuild is only stored if no event was logged while
+the election loaded (see RCVManager.get_serialized_election).
+"""
+import json
+from dataclasses import dataclass
+from typing import Callable, Dict, Final, Optional
+
+from redis import Redis, WatchError
+
+from recommender.data.auth.displayable_user import DisplayableUser
+from recommender.data.rcv.displayable_election import DisplayableCandidate
+from recommender.data.rcv.election_status import ElectionStatus
+from recommender.db_config import primary_redis_conn
+from recommender.rcv.election_event_log import parse_event_id
+from recommender.utilities.json_encode_utilities import to_serializable_dict
+
+ELECTION_READ_MODEL_EXPIRATION_IN_SECONDS = 24 * 60 * 60
+VERSION_FIELD: Final[str] = "version"
+ELECTION_FIELD: Final[str] = "election"
+
+
+@dataclass
+class SerializedElection:
+    # id of the last election event included
+    version: str
+    # json_encode of the DisplayableElection
+    encoded_election: str
+
+
+class ElectionReadModel:
+    __redis_connection: Final[Redis]
+
+    def __init__(self, redis_connection: Redis = primary_redis_conn):
+        self.__redis_connection = redis_connection
+
+    def get(self, election_id: str) -> Optional[SerializedElection]:
+        version, encoded_election = self.__redis_connection.hmget(
+            self.__get_key(election_id), VERSION_FIELD, ELECTION_FIELD
+        )
+        if encoded_election is None:
+            return None
+        return SerializedElection(
+            version=version.decode("utf-8"),
+            encoded_election=encoded_election.decode("utf-8"),
+        )
+
+    def store(self, election_id: str, serialized_election: SerializedElection):
+        """
+        stores an election rebuilt from the database, unless a newer version was stored in the meantime
+
+        :param serialized_election: its version must be read before the election is loaded
+        """
+        key = self.__get_key(election_id)
+        with self.__redis_connection.pipeline() as pipeline:
+            try:
+                pipeline.watch(key)
+                if not self.__is_older(
+                    pipeline.hget(key, VERSION_FIELD), serialized_election.version
+                ):
+                    return
+                pipeline.multi()
+                self.__set(pipeline, key, serialized_election)
+                pipeline.execute()
+            except WatchError:
+                # updated while the election loaded. That version is at least as new
+                pass
+
+    def add_candidate(
+        self, election_id: str, event_id: str, candidate: DisplayableCandidate
+    ):
+        serializable_candidate = to_serializable_dict(candidate)
+
+        def add(election: Dict):
+            election["candidates"] = [
+                existing_candidate
+                for existing_candidate in election["candidates"]
+                if existing_candidate["businessId"] != candidate.business_id
+            ] + [serializable_candidate]
+
+        self.__update(election_id, event_id, add)
+
+    def add_voter(self, election_id: str, event_id: str, voter: DisplayableUser):
+        def add(election: Dict):
+            voters = election.get("voters") or []
+            if all(existing_voter["id"] != voter.id for existing_voter in voters):
+                election["voters"] = voters + [to_serializable_dict(voter)]
+
+        self.__update(election_id, event_id, add)
+
+    def set_status(self, election_id: str, event_id: str, status: ElectionStatus):
+        def set_status(election: Dict):
+            election["electionStatus"] = status.name
+
+        self.__update(election_id, event_id, set_status)
+
+    def __update(self, election_id: str, event_id: str, update: Callable[[Dict], None]):
+        """
+        optimistic read-modify-write of the serialized election. A missing read model is built on its next read instead
+        """
+        key = self.__get_key(election_id)
+        with self.__redis_connection.pipeline() as pipeline:
+            while True:
+                try:
+                    pipeline.watch(key)
+                    version, encoded_election = pipeline.hmget(
+                        key, VERSION_FIELD, ELECTION_FIELD
+                    )
+                    if encoded_election is None or not self.__is_older(
+                        version, event_id
+                    ):
+                        return
+                    election = json.loads(encoded_election)
+                    update(election)
+                    pipeline.multi()
+                    self.__set(
+                        pipeline,
+                        key,
+                        SerializedElection(
+                            version=event_id, encoded_election=json.dumps(election)
+                        ),
+                    )
+                    pipeline.execute()
+                    return
+                except WatchError:
+                    continue
+
+    def __set(self, pipeline, key: str, serialized_election: SerializedElection):
+        pipeline.hset(
+            key,
+            mapping={
+                VERSION_FIELD: serialized_election.version,
+                ELECTION_FIELD: serialized_election.encoded_election,
+            },
+        )
+        pipeline.expire(key, ELECTION_READ_MODEL_EXPIRATION_IN_SECONDS)
+
+    def __is_older(self, version: Optional[bytes], event_id: str) -> bool:
+        return version is None or parse_event_id(version) < parse_event_id(
+            event_id.encode("utf-8")
+        )
+
+    def __get_key(self, election_id: str) -> str:
+        return f"election:{election_id}:read-model"
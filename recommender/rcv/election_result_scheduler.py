@@ -0,0 +1,233 @@
+"""
+Schedules the result updates of elections on the sharded rcv vote queues.
+
+Live update requests (one per vote) are debounced: a burst of requests for an election is coalesced into one update
+that runs once the election has been quiet for the quiet window, or once the oldest request of the burst reaches the
+max staleness. Each election has at most one pending update job. A pending job that stalls (never starts or never
+finishes) is replaced instead of blocking the updates of its election forever.
+"""
+import logging
+from datetime import datetime, timedelta
+from time import time
+from typing import Callable, Final, Optional
+from uuid import uuid4
+
+from redis import Redis, WatchError
+from rq.exceptions import NoSuchJobError
+from rq.job import Job, JobStatus
+
+from recommender.db_config import primary_redis_conn
+from recommender.rcv.election_result_update_consumer import (
+    ElectionResultUpdateConsumer,
+)
+from recommender.rcv.rcv_queue_config import get_rcv_vote_queue
+
+LOGGER = logging.getLogger(__name__)
+
+RESULT_UPDATE_QUIET_WINDOW_IN_SECONDS = 1.0
+RESULT_UPDATE_MAX_STALENESS_IN_SECONDS = 5.0
+# rq's default job timeout
+RESULT_UPDATE_STALLED_AFTER_IN_SECONDS = 180.0
+RESULT_UPDATE_STATE_EXPIRATION_IN_SECONDS = 24 * 60 * 60
+
+
+class ElectionResultScheduler:
+    __redis_connection: Final[Redis]
+    __quiet_window_in_seconds: Final[float]
+    __max_staleness_in_seconds: Final[float]
+    __stalled_after_in_seconds: Final[float]
+    __election_result_update_consumer: Final[ElectionResultUpdateConsumer]
+    # POSIX timestamp of now
+    __clock: Final[Callable[[], float]]
+
+    def __init__(
+        self,
+        redis_connection: Redis = primary_redis_conn,
+        quiet_window_in_seconds: float = RESULT_UPDATE_QUIET_WINDOW_IN_SECONDS,
+        max_staleness_in_seconds: float = RESULT_UPDATE_MAX_STALENESS_IN_SECONDS,
+        stalled_after_in_seconds: float = RESULT_UPDATE_STALLED_AFTER_IN_SECONDS,
+        election_result_update_consumer: ElectionResultUpdateConsumer = ElectionResultUpdateConsumer(),
+        clock: Callable[[], float] = time,
+    ):
+        self.__redis_connection = redis_connection
+        self.__quiet_window_in_seconds = quiet_window_in_seconds
+        self.__max_staleness_in_seconds = max_staleness_in_seconds
+        self.__stalled_after_in_seconds = stalled_after_in_seconds
+        self.__election_result_update_consumer = election_result_update_consumer
+        self.__clock = clock
+
+    def request_live_update(self, election_id: str):
+        now = self.__clock()
+        pipeline = self.__redis_connection.pipeline()
+        pipeline.set(
+            self.__get_last_request_key(election_id),
+            now,
+            ex=RESULT_UPDATE_STATE_EXPIRATION_IN_SECONDS,
+        )
+        pipeline.set(
+            self.__get_first_request_key(election_id),
+            now,
+            ex=RESULT_UPDATE_STATE_EXPIRATION_IN_SECONDS,
+            nx=True,
+        )
+        pipeline.get(self.__get_pending_job_key(election_id))
+        _, _, pending_job_id = pipeline.execute()
+        if not self.__is_job_pending(pending_job_id):
+            self.__schedule(
+                election_id,
+                delay_in_seconds=self.__quiet_window_in_seconds,
+                is_final=False,
+            )
+
+    def request_final_update(self, election_id: str):
+        """
+        recounts the election right away. Supersedes the pending live update
+        """
+        self.__schedule(election_id, delay_in_seconds=None, is_final=True)
+
+    def run(self, job_id: str, election_id: str, is_final: bool):
+        pending_job_key = self.__get_pending_job_key(election_id)
+        if self.__get_string(pending_job_key) != job_id:
+            # superseded by a final update or by the job that replaced this one after it stalled
+            return
+
+        if is_final:
+            self.__election_result_update_consumer.consume(election_id)
+            self.__complete_job(election_id, job_id, handled_last_request=None)
+            return
+
+        last_request_key = self.__get_last_request_key(election_id)
+        last_request, first_request = self.__redis_connection.mget(
+            last_request_key, self.__get_first_request_key(election_id)
+        )
+        now = self.__clock()
+        if last_request is not None:
+            quiet_in_seconds = (
+                float(last_request) + self.__quiet_window_in_seconds - now
+            )
+            staleness_deadline_in_seconds = (
+                (now if first_request is None else float(first_request))
+                + self.__max_staleness_in_seconds
+                - now
+            )
+            if quiet_in_seconds > 0 and staleness_deadline_in_seconds > 0:
+                self.__schedule(
+                    election_id,
+                    delay_in_seconds=min(
+                        quiet_in_seconds, staleness_deadline_in_seconds
+                    ),
+                    is_final=False,
+                )
+                return
+
+        # the next request starts a new burst
+        self.__redis_connection.delete(self.__get_first_request_key(election_id))
+        self.__election_result_update_consumer.publish_live_result(election_id)
+        self.__complete_job(
+            election_id,
+            job_id,
+            handled_last_request=None
+            if last_request is None
+            else last_request.decode("utf-8"),
+        )
+
+    def __complete_job(
+        self, election_id: str, job_id: str, handled_last_request: Optional[str]
+    ):
+        """
+        Releases the election for the next update. Requests that arrived while the update ran were coalesced into this
+        job, so they get a new update
+        """
+        pending_job_key = self.__get_pending_job_key(election_id)
+        last_request_key = self.__get_last_request_key(election_id)
+        with self.__redis_connection.pipeline() as pipeline:
+            try:
+                pipeline.watch(pending_job_key, last_request_key)
+                pending_job_id = pipeline.get(pending_job_key)
+                if pending_job_id is None or pending_job_id.decode("utf-8") != job_id:
+                    return
+                last_request = pipeline.get(last_request_key)
+                has_new_requests = (
+                    None if last_request is None else last_request.decode("utf-8")
+                ) != handled_last_request
+                if not has_new_requests or handled_last_request is None:
+                    pipeline.multi()
+                    pipeline.delete(pending_job_key)
+                    pipeline.execute()
+                    return
+            except WatchError:
+                pass
+        self.__schedule(
+            election_id, delay_in_seconds=self.__quiet_window_in_seconds, is_final=False
+        )
+
+    def __schedule(
+        self, election_id: str, delay_in_seconds: Optional[float], is_final: bool
+    ):
+        job_id = f"election-result-update:{election_id}:{uuid4()}"
+        self.__redis_connection.set(
+            self.__get_pending_job_key(election_id),
+            job_id,
+            ex=RESULT_UPDATE_STATE_EXPIRATION_IN_SECONDS,
+        )
+        queue = get_rcv_vote_queue(election_id)
+        if delay_in_seconds is None:
+            queue.enqueue(
+                run_scheduled_result_update,
+                job_id,
+                election_id,
+                is_final,
+                job_id=job_id,
+            )
+        else:
+            queue.enqueue_in(
+                timedelta(seconds=delay_in_seconds),
+                run_scheduled_result_update,
+                job_id,
+                election_id,
+                is_final,
+                job_id=job_id,
+            )
+
+    def __is_job_pending(self, job_id: Optional[bytes]) -> bool:
+        if job_id is None:
+            return False
+        try:
+            job = Job.fetch(job_id.decode("utf-8"), connection=self.__redis_connection)
+        except NoSuchJobError:
+            return False
+
+        status = job.get_status(refresh=False)
+        if status == JobStatus.FINISHED or status == JobStatus.FAILED:
+            return False
+        waiting_since = (
+            job.started_at if status == JobStatus.STARTED else job.created_at
+        )
+        if waiting_since is not None and datetime.utcnow() - waiting_since > timedelta(
+            seconds=self.__stalled_after_in_seconds
+        ):
+            LOGGER.warning(
+                f"Replacing stalled election result update job {job.id} ({status})"
+            )
+            return False
+        return True
+
+    def __get_string(self, key: str) -> Optional[str]:
+        value = self.__redis_connection.get(key)
+        return None if value is None else value.decode("utf-8")
+
+    def __get_pending_job_key(self, election_id: str) -> str:
+        return f"election:{election_id}:result-update:pending-job"
+
+    def __get_last_request_key(self, election_id: str) -> str:
+        return f"election:{election_id}:result-update:last-request"
+
+    def __get_first_request_key(self, election_id: str) -> str:
+        return f"election:{election_id}:result-update:first-request"
+
+
+def run_scheduled_result_update(job_id: str, election_id: str, is_final: bool):
+    """
+    entry point of the scheduled jobs. The scheduler holds a redis connection, so it is not pickled into the job
+    """
+    ElectionResultScheduler().run(job_id, election_id, is_final)
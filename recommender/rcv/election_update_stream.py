@@ -1,22 +1,52 @@
 from __future__ import annotations
 
+import json
 from datetime import datetime
 from enum import Enum
-from typing import Dict, Final, Union
+from typing import (
+    Dict,
+    Final,
+    FrozenSet,
+    List,
+    Optional,
+    Union,
+)
 
 from recommender.api.utils.server_sent_event import ServerSentEvent
 from recommender.data.rcv.election_result import (
     DisplayableElectionResult,
 )
 from recommender.data.rcv.election_status import ElectionStatus
+from recommender.rcv.election_event_log import ElectionEventLog
+from recommender.rcv.latest_election_result_store import LatestElectionResultStore
 from recommender.utilities.notification_queue import MessageStream
+from recommender.utilities.pubsub_multiplexer import PubSubMultiplexer
+
+# one subscription to every election per process, shared by the update streams
+election_update_multiplexer = PubSubMultiplexer("election:*")
+election_event_log = ElectionEventLog()
+latest_election_result_store = LatestElectionResultStore()
+COMPACT_JSON_SEPARATORS: Final = (",", ":")
 
 
 class ElectionUpdateEventType(Enum):
     STATUS_CHANGED = "STATUS_CHANGED"
     CANDIDATE_ADDED = "CANDIDATE_ADDED"
     VOTE_CAST = "VOTE_CAST"
+    # the full result. Only sent as part of snapshots, published results are sent as RESULTS_DELTA
     RESULTS_UPDATED = "RESULTS_UPDATED"
+    # only the rounds that changed since the previous result
+    RESULTS_DELTA = "RESULTS_DELTA"
+    SNAPSHOT = "SNAPSHOT"
+
+
+# events about the result of the election. They do not change the election (see ElectionReadModel)
+RESULT_EVENT_TYPES: Final[FrozenSet[str]] = frozenset(
+    {
+        ElectionUpdateEventType.RESULTS_UPDATED.value,
+        ElectionUpdateEventType.RESULTS_DELTA.value,
+    }
+)
 
 
 class StatusChangedEvent(ServerSentEvent[Dict]):
@@ -40,6 +70,7 @@ class CandidateAddedEvent(ServerSentEvent[Dict]):
             },
         )
 
+
 class VoteCastEvent(ServerSentEvent[Dict]):
     def __init__(self, user_id: str, nickname: str):
         super(VoteCastEvent, self).__init__(
@@ -52,12 +83,97 @@ class VoteCastEvent(ServerSentEvent[Dict]):
         )
 
 
-class ElectionResultEvent(ServerSentEvent[DisplayableElectionResult]):
+class ElectionResultEvent(ServerSentEvent[Dict]):
     def __init__(self, result: DisplayableElectionResult):
         super(ElectionResultEvent, self).__init__(
             id=f"{ElectionUpdateEventType.RESULTS_UPDATED.value}-{datetime.now().timestamp()}",
             type=ElectionUpdateEventType.RESULTS_UPDATED.value,
-            data=result,
+            data=result.to_serializable_dict(),
+        )
+
+    def encode_data(self) -> str:
+        return json.dumps(self.data, separators=COMPACT_JSON_SEPARATORS)
+
+
+class ElectionResultDeltaEvent(ServerSentEvent[Dict]):
+    """
+    Only carries the rounds that changed since the previous result, and of those only the candidates that changed
+    (one more ballot usually changes the votes of a single candidate per round).
+
+    A subscriber skips the delta if its result was not calculated before calculatedAt (e.g. its snapshot already
+    includes it). It applies the delta if its result was calculated at previousCalculatedAt: it truncates the rounds to
+    numberOfRounds, then merges the candidates of each changed round and removes its removed candidates. Otherwise, it
+    reloads the result
+
+    :param previous_result: serializable dict of the previous result, None if this is the first result (the delta then
+    carries every round)
+    """
+
+    def __init__(self, previous_result: Optional[Dict], result: Dict):
+        previous_rounds = [] if previous_result is None else previous_result["rounds"]
+        changed_rounds = []
+        for index, round in enumerate(result["rounds"]):
+            previous_round = (
+                previous_rounds[index] if index < len(previous_rounds) else {}
+            )
+            if round == previous_round:
+                continue
+            changed_rounds.append(
+                {
+                    "index": index,
+                    "candidates": {
+                        business_id: candidate_result
+                        for business_id, candidate_result in round.items()
+                        if previous_round.get(business_id) != candidate_result
+                    },
+                    "removedCandidates": [
+                        business_id
+                        for business_id in previous_round
+                        if business_id not in round
+                    ],
+                }
+            )
+        super(ElectionResultDeltaEvent, self).__init__(
+            id=f"{ElectionUpdateEventType.RESULTS_DELTA.value}-{datetime.now().timestamp()}",
+            type=ElectionUpdateEventType.RESULTS_DELTA.value,
+            data={
+                "previousCalculatedAt": None
+                if previous_result is None
+                else previous_result["calculatedAt"],
+                "calculatedAt": result["calculatedAt"],
+                "numberOfRounds": len(result["rounds"]),
+                "changedRounds": changed_rounds,
+            },
+        )
+
+    def encode_data(self) -> str:
+        return json.dumps(self.data, separators=COMPACT_JSON_SEPARATORS)
+
+
+class ElectionSnapshotEvent(ServerSentEvent[Dict]):
+    """
+    sent to subscribers that cannot resume from the event log instead of the missed events
+
+    :param event_id: id of the last logged event included in the snapshot
+    :param encoded_election: json_encode of the DisplayableElection
+    :param encoded_result: data of the latest RESULTS_UPDATED event
+    """
+
+    def __init__(
+        self, event_id: str, encoded_election: str, encoded_result: Optional[str]
+    ):
+        super(ElectionSnapshotEvent, self).__init__(
+            id=event_id,
+            type=ElectionUpdateEventType.SNAPSHOT.value,
+            data={"election": encoded_election, "result": encoded_result},
+        )
+
+    def encode_data(self) -> str:
+        # both parts are already encoded, they must not be encoded (and their business ids normalized) again
+        encoded_result = self.data["result"]
+        return (
+            f'{{"election":{self.data["election"]},'
+            f'"result":{"null" if encoded_result is None else encoded_result}}}'
         )
 
 
@@ -71,10 +187,63 @@ class ElectionUpdateStream(
         return ElectionUpdateStream(election_id=id)
 
     election_id: Final[str]
+    __event_log: Final[ElectionEventLog]
+    __latest_result_store: Final[LatestElectionResultStore]
 
-    def __init__(self, election_id: str):
+    def __init__(
+        self,
+        election_id: str,
+        event_log: ElectionEventLog = election_event_log,
+        latest_result_store: LatestElectionResultStore = latest_election_result_store,
+    ):
         super(ElectionUpdateStream, self).__init__(
             queue_name=f"election:{election_id}",
             serializer=lambda x: x.to_convention_event_string(),
+            multiplexer=election_update_multiplexer,
         )
         self.election_id = election_id
+        self.__event_log = event_log
+        self.__latest_result_store = latest_result_store
+
+    def publish_message(self, message: ServerSentEvent) -> str:
+        """
+        logs the event, its log id replaces the id of the event in the published frame
+
+        :return: log id of the event
+        """
+        return self.__event_log.append(
+            self.election_id,
+            self.queue_name,
+            message,
+            changes_election=message.type not in RESULT_EVENT_TYPES,
+        )
+
+    def publish_result(self, result: DisplayableElectionResult):
+        """
+        publishes the delta from the previously published result. The full result is only sent to the subscribers
+        that need a snapshot
+        """
+        result_event = ElectionResultEvent(result)
+        previous_encoded_result = self.__latest_result_store.replace(
+            self.election_id, result_event.encoded_data
+        )
+        self.publish_message(
+            ElectionResultDeltaEvent(
+                None
+                if previous_encoded_result is None
+                else json.loads(previous_encoded_result),
+                result_event.data,
+            )
+        )
+
+    def get_latest_encoded_result(self) -> Optional[str]:
+        return self.__latest_result_store.get(self.election_id)
+
+    def get_frames_after(self, last_event_id: str) -> Optional[List[bytes]]:
+        return self.__event_log.get_frames_after(self.election_id, last_event_id)
+
+    def get_last_event_id(self) -> str:
+        return self.__event_log.get_last_event_id(self.election_id)
+
+    def get_version(self) -> str:
+        return self.__event_log.get_version(self.election_id)
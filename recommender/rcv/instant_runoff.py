@@ -0,0 +1,203 @@
+"""
+Instant-runoff (ranked choice) tabulation.
+
+Identical ballots are grouped with their multiplicity. Each ballot group keeps a pointer to its highest ranked active
+candidate instead of removing eliminated candidates from every ballot, and the first choice tallies are updated
+incrementally: eliminating a candidate only touches the ballot groups that currently rank it first.
+"""
+import random
+from abc import ABC, abstractmethod
+from operator import itemgetter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from recommender.data.rcv.election_result import CandidateRoundResult, ElectionRound
+from recommender.data.rcv.round_action import RoundAction
+
+
+class RankingTally(ABC):
+    """
+    First choice tallies of the continuing ballots of an election
+    """
+
+    @property
+    @abstractmethod
+    def number_of_ballots(self) -> int:
+        """
+        number of ballots that still rank an active candidate
+        """
+        pass
+
+    @abstractmethod
+    def get_first_choice_counts(self) -> Dict[str, int]:
+        """
+        :return: number of first choice votes for every active candidate (in the order the first ballot ranks them)
+        """
+        pass
+
+    @abstractmethod
+    def eliminate(self, candidate_id: str):
+        pass
+
+
+BallotWeights = Dict[Tuple[str, ...], int]
+
+
+def group_ballots(rankings: Iterable[Sequence[str]]) -> BallotWeights:
+    """
+    :return: number of voters by distinct ranking, in the order the rankings are first cast
+    """
+    ballot_weights: BallotWeights = {}
+    for ranking in rankings:
+        ballot = tuple(ranking)
+        ballot_weights[ballot] = ballot_weights.get(ballot, 0) + 1
+    return ballot_weights
+
+
+class GroupedBallotTally(RankingTally):
+    __ballots: List[Tuple[str, ...]]
+    __ballot_weights: List[int]
+    # index of the highest ranked active candidate of each ballot
+    __ballot_pointers: List[int]
+    # indexes of the ballots that currently rank the candidate first
+    __ballots_by_first_choice: Dict[str, List[int]]
+    __first_choice_counts: Dict[str, int]
+    __number_of_ballots: int
+
+    def __init__(self, ballot_weights: BallotWeights):
+        """
+        :param ballot_weights: see group_ballots
+        """
+        self.__ballots = []
+        self.__ballot_weights = []
+        self.__ballot_pointers = []
+        self.__ballots_by_first_choice = {}
+        self.__first_choice_counts = {}
+        self.__number_of_ballots = 0
+        for ballot, weight in ballot_weights.items():
+            for candidate_id in ballot:
+                self.__add_candidate(candidate_id)
+            if len(ballot) == 0:
+                continue
+            ballot_index = len(self.__ballots)
+            self.__ballots.append(ballot)
+            self.__ballot_weights.append(weight)
+            self.__ballot_pointers.append(0)
+            self.__ballots_by_first_choice[ballot[0]].append(ballot_index)
+            self.__first_choice_counts[ballot[0]] += weight
+            self.__number_of_ballots += weight
+
+    @property
+    def number_of_ballots(self) -> int:
+        return self.__number_of_ballots
+
+    def get_first_choice_counts(self) -> Dict[str, int]:
+        return dict(self.__first_choice_counts)
+
+    def eliminate(self, candidate_id: str):
+        del self.__first_choice_counts[candidate_id]
+        for ballot_index in self.__ballots_by_first_choice.pop(candidate_id):
+            next_choice = self.__advance_to_next_active_choice(ballot_index)
+            weight = self.__ballot_weights[ballot_index]
+            if next_choice is None:
+                # exhausted ballot
+                self.__number_of_ballots -= weight
+                continue
+            self.__ballots_by_first_choice[next_choice].append(ballot_index)
+            self.__first_choice_counts[next_choice] += weight
+
+    def __add_candidate(self, candidate_id: str):
+        if candidate_id not in self.__first_choice_counts:
+            self.__first_choice_counts[candidate_id] = 0
+            self.__ballots_by_first_choice[candidate_id] = []
+
+    def __advance_to_next_active_choice(self, ballot_index: int) -> Optional[str]:
+        ballot = self.__ballots[ballot_index]
+        pointer = self.__ballot_pointers[ballot_index] + 1
+        while (
+            pointer < len(ballot) and ballot[pointer] not in self.__first_choice_counts
+        ):
+            pointer += 1
+        self.__ballot_pointers[ballot_index] = pointer
+        return ballot[pointer] if pointer < len(ballot) else None
+
+
+def run_instant_runoff(
+    tally: RankingTally, candidate_ids: [str], rng: random.Random = None
+) -> [ElectionRound]:
+    """
+    Eliminates the candidate with the fewest first choice votes (the first one ranked on the first ballot if there is
+    a tie) until a candidate has a majority. If the last two candidates are tied, the winner is picked at random.
+
+    :param candidate_ids: every candidate of the election. Only used to pick a random winner if there are no ballots
+    :param rng: source of the random tiebreaks
+    """
+    rng = random.Random() if rng is None else rng
+    if tally.number_of_ballots == 0:
+        return [generate_random_tie_round(candidate_ids, rng)]
+
+    rounds = []
+    while True:
+        first_choice_counts = tally.get_first_choice_counts()
+        number_of_ballots = tally.number_of_ballots
+        most_voted, most_first_choice_votes = max(
+            first_choice_counts.items(), key=itemgetter(1)
+        )
+        if (
+            most_first_choice_votes > number_of_ballots / 2
+            or len(first_choice_counts) == 1
+        ):
+            rounds.append(
+                get_candidate_round_results(
+                    first_choice_counts, most_voted, RoundAction.WON
+                )
+            )
+            return rounds
+        elif (
+            most_first_choice_votes == number_of_ballots / 2
+            and len(first_choice_counts) == 2
+        ):
+            rounds.append(
+                get_candidate_round_results(
+                    first_choice_counts,
+                    list(first_choice_counts.keys())[rng.randrange(0, 2)],
+                    RoundAction.WON_VIA_TIEBREAKER,
+                )
+            )
+            return rounds
+
+        least_voted, _ = min(first_choice_counts.items(), key=itemgetter(1))
+        rounds.append(
+            get_candidate_round_results(
+                first_choice_counts, least_voted, RoundAction.ELIMINATED
+            )
+        )
+        tally.eliminate(least_voted)
+
+
+def get_candidate_round_results(
+    first_choice_counts: Dict[str, int],
+    affected_candidate: str,
+    candidate_round_action: RoundAction,
+) -> ElectionRound:
+    return {
+        candidate_id: CandidateRoundResult(
+            number_of_rank_one_votes=number_of_rank_one_votes,
+            round_action=None
+            if candidate_id != affected_candidate
+            else candidate_round_action,
+        )
+        for candidate_id, number_of_rank_one_votes in first_choice_counts.items()
+    }
+
+
+def generate_random_tie_round(
+    candidate_ids: [str], rng: random.Random
+) -> ElectionRound:
+    candidate_to_win = candidate_ids[rng.randrange(0, len(candidate_ids))]
+    return {
+        candidate_id: CandidateRoundResult(
+            number_of_rank_one_votes=0,
+            round_action=RoundAction.WON if candidate_id == candidate_to_win else None,
+        )
+        for candidate_id in candidate_ids
+    }
@@ -0,0 +1,44 @@
+from typing import Final, Optional
+
+from redis import Redis
+
+from recommender.db_config import primary_redis_conn
+
+LATEST_ELECTION_RESULT_EXPIRATION_IN_SECONDS = 24 * 60 * 60
+
+
+class LatestElectionResultStore:
+    """
+    The encoded data of the last result published for each election (live or final). Result deltas are calculated from
+    it, and snapshots include it
+    """
+
+    __redis_connection: Final[Redis]
+
+    def __init__(self, redis_connection: Redis = primary_redis_conn):
+        self.__redis_connection = redis_connection
+
+    def replace(self, election_id: str, encoded_result: str) -> Optional[str]:
+        """
+        :return: the replaced result
+        """
+        pipeline = self.__redis_connection.pipeline()
+        pipeline.get(self.__get_key(election_id))
+        pipeline.set(
+            self.__get_key(election_id),
+            encoded_result,
+            ex=LATEST_ELECTION_RESULT_EXPIRATION_IN_SECONDS,
+        )
+        previous_encoded_result, _ = pipeline.execute()
+        return (
+            None
+            if previous_encoded_result is None
+            else previous_encoded_result.decode("utf-8")
+        )
+
+    def get(self, election_id: str) -> Optional[str]:
+        encoded_result = self.__redis_connection.get(self.__get_key(election_id))
+        return None if encoded_result is None else encoded_result.decode("utf-8")
+
+    def __get_key(self, election_id: str) -> str:
+        return f"election:{election_id}:latest-result"
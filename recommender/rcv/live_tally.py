@@ -0,0 +1,154 @@
+"""
+Live results for elections that are still voting.
+
+Every ballot is grouped by its ranking signature (the ranked business ids), so the tally of an election is a redis hash
+of signature -> number of voters plus a hash of voter -> signature to replace a voter's previous ballot. A vote applies
+its delta atomically instead of reloading every ranking from the database. If the tally is missing (expired, or votes
+were cast before live results existed), it is rebuilt from the database.
+"""
+import random
+from typing import Dict, Final, List
+
+from redis import Redis, WatchError
+from sqlalchemy.orm import Session
+
+from recommender.data.rcv.election import Election
+from recommender.data.rcv.election_result import ElectionResult
+from recommender.db_config import primary_redis_conn
+from recommender.rcv.instant_runoff import (
+    BallotWeights,
+    GroupedBallotTally,
+    run_instant_runoff,
+)
+
+LIVE_TALLY_EXPIRATION_IN_SECONDS = 24 * 60 * 60
+# signatures are never empty. Marks a tally that holds every ballot of the election
+INITIALIZED_FIELD: Final[str] = ""
+SIGNATURE_SEPARATOR: Final[str] = ","
+
+# KEYS: ballots hash, voters hash. ARGV: voter id, signature, expiration, initialized field
+# returns 0 if the tally has not been built
+APPLY_BALLOT_SCRIPT: Final[
+    str
+] = """
+if redis.call("HEXISTS", KEYS[1], ARGV[4]) == 0 then
+    return 0
+end
+local previous_signature = redis.call("HGET", KEYS[2], ARGV[1])
+if previous_signature then
+    if redis.call("HINCRBY", KEYS[1], previous_signature, -1) <= 0 then
+        redis.call("HDEL", KEYS[1], previous_signature)
+    end
+end
+redis.call("HSET", KEYS[2], ARGV[1], ARGV[2])
+redis.call("HINCRBY", KEYS[1], ARGV[2], 1)
+redis.call("EXPIRE", KEYS[1], ARGV[3])
+redis.call("EXPIRE", KEYS[2], ARGV[3])
+return 1
+"""
+
+
+class LiveTally:
+    __redis_connection: Final[Redis]
+
+    def __init__(self, redis_connection: Redis = primary_redis_conn):
+        self.__redis_connection = redis_connection
+        self.__apply_ballot_script = redis_connection.register_script(
+            APPLY_BALLOT_SCRIPT
+        )
+
+    def apply_ballot(
+        self, db_session: Session, election_id: str, user_id: str, ranking: [str]
+    ):
+        """
+        Adds the ballot of a voter, replacing their previous ballot. Call after the ballot is committed
+        """
+        is_applied = self.__apply_ballot_script(
+            keys=[
+                self.__get_ballots_key(election_id),
+                self.__get_voters_key(election_id),
+            ],
+            args=[
+                user_id,
+                SIGNATURE_SEPARATOR.join(ranking),
+                LIVE_TALLY_EXPIRATION_IN_SECONDS,
+                INITIALIZED_FIELD,
+            ],
+        )
+        if not is_applied:
+            # the rebuilt tally includes the committed ballot
+            self.rebuild(db_session, election_id)
+
+    def rebuild(self, db_session: Session, election_id: str):
+        """
+        Replaces the tally with the ballots in the database. The tally is watched while the ballots load, so a ballot
+        applied after they were read is never overwritten by the older snapshot. The rebuild reloads instead
+        """
+        ballots_key = self.__get_ballots_key(election_id)
+        voters_key = self.__get_voters_key(election_id)
+        with self.__redis_connection.pipeline() as pipeline:
+            while True:
+                try:
+                    pipeline.watch(ballots_key, voters_key)
+                    rankings_by_voter: Dict[
+                        str, List[str]
+                    ] = Election.get_rankings_by_user_for_election(
+                        db_session, election_id
+                    )
+                    signatures_by_voter = {
+                        user_id: SIGNATURE_SEPARATOR.join(ranking)
+                        for user_id, ranking in rankings_by_voter.items()
+                    }
+                    ballot_counts = {INITIALIZED_FIELD: 0}
+                    for signature in signatures_by_voter.values():
+                        ballot_counts[signature] = ballot_counts.get(signature, 0) + 1
+
+                    pipeline.multi()
+                    pipeline.delete(ballots_key, voters_key)
+                    pipeline.hset(ballots_key, mapping=ballot_counts)
+                    if len(signatures_by_voter) > 0:
+                        pipeline.hset(voters_key, mapping=signatures_by_voter)
+                    pipeline.expire(ballots_key, LIVE_TALLY_EXPIRATION_IN_SECONDS)
+                    pipeline.expire(voters_key, LIVE_TALLY_EXPIRATION_IN_SECONDS)
+                    pipeline.execute()
+                    return
+                except WatchError:
+                    continue
+
+    def get_ballot_weights(self, election_id: str) -> BallotWeights:
+        """
+        :return: number of voters by ranking, ordered by ranking so repeated calculations break ties the same way
+        """
+        ballot_weights = {}
+        for signature, count in sorted(
+            self.__redis_connection.hgetall(self.__get_ballots_key(election_id)).items()
+        ):
+            signature = signature.decode("utf-8")
+            if signature != INITIALIZED_FIELD:
+                ballot_weights[tuple(signature.split(SIGNATURE_SEPARATOR))] = int(count)
+        return ballot_weights
+
+    def calculate_result(
+        self, election_id: str, candidate_ids: [str]
+    ) -> ElectionResult:
+        """
+        the random tiebreaks are seeded by the election so a live result does not flip between updates
+        """
+        return ElectionResult(
+            run_instant_runoff(
+                GroupedBallotTally(self.get_ballot_weights(election_id)),
+                candidate_ids,
+                random.Random(election_id),
+            )
+        )
+
+    def clear(self, election_id: str):
+        self.__redis_connection.delete(
+            self.__get_ballots_key(election_id), self.__get_voters_key(election_id)
+        )
+
+    def __get_ballots_key(self, election_id: str) -> str:
+        return f"election:{election_id}:tally:ballots"
+
+    def __get_voters_key(self, election_id: str) -> str:
+        return f"election:{election_id}:tally:voters"
@@ -1,9 +1,8 @@
 import random
 from datetime import datetime
-from typing import Optional
+from typing import FrozenSet, List, Optional
 from uuid import uuid4
 
-from rq.job import JobStatus
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import load_only
 
@@ -19,7 +18,11 @@ from recommender.data.rcv.displayable_election import (
     DisplayableCandidate,
     DisplayableElection,
 )
-from recommender.data.rcv.election import ACTIVE_ID_LENGTH, Election
+from recommender.data.rcv.election import (
+    ACTIVE_ID_LENGTH,
+    Election,
+    with_candidates_and_nominators,
+)
 from recommender.data.rcv.election_result import (
     DisplayableElectionResult,
     ElectionResult,
@@ -27,25 +30,59 @@ from recommender.data.rcv.election_result import (
 from recommender.data.rcv.election_status import ElectionStatus
 from recommender.data.rcv.ranking import Ranking
 from recommender.db_config import DbSession
-from recommender.rcv.election_result_update_consumer import ElectionResultUpdateConsumer
+from recommender.rcv.election_event_log import (
+    get_frame_event_id,
+    get_frame_event_type,
+    parse_event_id,
+)
+from recommender.rcv.election_read_model import ElectionReadModel, SerializedElection
+from recommender.rcv.election_result_scheduler import ElectionResultScheduler
 from recommender.rcv.election_update_stream import (
     CandidateAddedEvent,
+    ElectionResultEvent,
+    ElectionSnapshotEvent,
     ElectionUpdateStream,
-    StatusChangedEvent, VoteCastEvent,
+    RESULT_EVENT_TYPES,
+    StatusChangedEvent,
+    VoteCastEvent,
 )
-from recommender.rcv.rcv_queue_config import rcv_vote_queue
+from recommender.rcv.live_tally import LiveTally
+from recommender.utilities.json_encode_utilities import json_encode
+from recommender.utilities.lru_ttl_cache import LruTtlCache
+
+VOTING_CANDIDATE_IDS_CACHE_MAX_SIZE = 1000
+VOTING_CANDIDATE_IDS_CACHE_EXPIRATION_IN_SECONDS = 60 * 60
 
 
 class RCVManager:
     __business_manager: BusinessManager
-    __election_result_update_consumer: ElectionResultUpdateConsumer = ElectionResultUpdateConsumer()
     __user_manager: UserManager
+    __live_tally: LiveTally
+    __election_result_scheduler: ElectionResultScheduler
+    __election_read_model: ElectionReadModel
+    __voting_candidate_ids_cache: LruTtlCache[str, FrozenSet[str]]
 
-    def __init__(self, business_manager: BusinessManager, user_manager: UserManager):
+    def __init__(
+        self,
+        business_manager: BusinessManager,
+        user_manager: UserManager,
+        live_tally: LiveTally = LiveTally(),
+        election_result_scheduler: ElectionResultScheduler = ElectionResultScheduler(),
+        election_read_model: ElectionReadModel = ElectionReadModel(),
+    ):
         self.__business_manager = business_manager
         self.__user_manager = user_manager
+        self.__live_tally = live_tally
+        self.__election_result_scheduler = election_result_scheduler
+        self.__election_read_model = election_read_model
+        self.__voting_candidate_ids_cache = LruTtlCache(
+            max_size=VOTING_CANDIDATE_IDS_CACHE_MAX_SIZE,
+            ttl_in_seconds=VOTING_CANDIDATE_IDS_CACHE_EXPIRATION_IN_SECONDS,
+        )
 
-    def create_election(self, db_session: DbSession, user: SerializableBasicUser) -> Election:
+    def create_election(
+        self, db_session: DbSession, user: SerializableBasicUser
+    ) -> Election:
         election_id = str(uuid4())
         while True:
             try:
@@ -71,17 +108,26 @@ class RCVManager:
             ]
         )
 
-    def get_displayable_election_by_id(self, db_session: DbSession, id: str, with_voters=False) -> Optional[
-        DisplayableElection]:
+    def get_displayable_election_by_id(
+        self, db_session: DbSession, id: str, with_voters=False
+    ) -> Optional[DisplayableElection]:
 
-        election = Election.get_election_by_id(db_session=db_session, id=id)
+        election = Election.get_election_by_id(
+            db_session=db_session, id=id, query_modifier=with_candidates_and_nominators
+        )
         if election is None:
             return None
 
         optional_props = {}
         if with_voters:
-            optional_props["voters"] = [DisplayableUser.from_user(user) for user in election.voters]
+            optional_props["voters"] = [
+                DisplayableUser.from_user(user) for user in election.voters
+            ]
 
+        candidates = election.candidates
+        candidate_businesses = self.__business_manager.get_displayable_businesses(
+            [candidate.business_id for candidate in candidates]
+        )
         return DisplayableElection(
             id=election.id,
             active_id=election.active_id,
@@ -89,32 +135,60 @@ class RCVManager:
             candidates=[
                 DisplayableCandidate(
                     business_id=candidate.business_id,
-                    name=self.__business_manager.get_displayable_business(
-                        candidate.business_id
-                    ).name,
+                    name=business.name,
                     nominator_nickname=candidate.nominator.nickname,
                 )
-                for candidate in election.candidates
+                for candidate, business in zip(candidates, candidate_businesses)
             ],
-            **optional_props
+            **optional_props,
         )
 
-    def get_active_election_by_active_id(self, db_session: DbSession, active_id: str) -> Election:
+    def get_serialized_election(
+        self, db_session: DbSession, id: str
+    ) -> Optional[SerializedElection]:
+        """
+        :return: the displayable election with its voters, from the read model
+        """
+        serialized_election = self.__election_read_model.get(id)
+        if serialized_election is not None:
+            return serialized_election
+
+        update_stream = ElectionUpdateStream.for_election(id)
+        # read before the election, so the election includes at least the events up to the version. Result events do
+        # not change the election, so they do not advance the version
+        version = update_stream.get_version()
+        election = self.get_displayable_election_by_id(db_session, id, with_voters=True)
+        if election is None:
+            return None
+        serialized_election = SerializedElection(
+            version=version, encoded_election=json_encode(election)
+        )
+        # an event logged while the election loaded skipped the missing read model. Storing the election at the older
+        # version would lose it, so the read model is rebuilt on the next read instead
+        if update_stream.get_version() == version:
+            self.__election_read_model.store(id, serialized_election)
+        return serialized_election
+
+    def get_active_election_by_active_id(
+        self, db_session: DbSession, active_id: str
+    ) -> Election:
         return Election.get_active_election_by_active_id(db_session, active_id)
 
-    def get_election_results(self, db_session: DbSession, id: str) -> Optional[DisplayableElectionResult]:
+    def get_election_results(
+        self, db_session: DbSession, id: str
+    ) -> Optional[DisplayableElectionResult]:
         results = Election.get_election_by_id(
             db_session, id, lambda x: x.options(load_only(Election.election_result))
         ).election_result
         if results is None:
             return None
         return DisplayableElectionResult.from_election_result(
-            ElectionResult(
-                calculated_at=results.calculated_at, rounds=results.rounds
-            )
+            ElectionResult(calculated_at=results.calculated_at, rounds=results.rounds)
         )
 
-    def add_candidate(self, db_session: DbSession, active_id: str, business_id: str, user_id: str) -> bool:
+    def add_candidate(
+        self, db_session: DbSession, active_id: str, business_id: str, user_id: str
+    ) -> bool:
         partial_election = Election.get_active_election_by_active_id(
             db_session=db_session,
             active_id=active_id,
@@ -150,18 +224,28 @@ class RCVManager:
                 return False
             raise error
         # TODO: Accelerate fetching process here
-        business: DisplayableBusiness = self.__business_manager.get_displayable_business(
-            business_id=business_id
+        business: DisplayableBusiness = (
+            self.__business_manager.get_displayable_business(business_id=business_id)
         )
         # TODO: Maybe just pass the name stored within the cookie instead of refetching from the database
         nickname = self.__user_manager.get_nickname_by_user_id(db_session, user_id)
-        ElectionUpdateStream.for_election(partial_election.id).publish_message(
+        displayable_candidate = DisplayableCandidate(
+            business_id=business_id,
+            name=business.name,
+            nominator_nickname=nickname if nickname is not None else "Unknown",
+        )
+        event_id = ElectionUpdateStream.for_election(
+            partial_election.id
+        ).publish_message(
             CandidateAddedEvent(
-                business_id=business_id,
-                name=business.name,
-                nominator_nickname=nickname if nickname is not None else "Unknown",
+                business_id=displayable_candidate.business_id,
+                name=displayable_candidate.name,
+                nominator_nickname=displayable_candidate.nominator_nickname,
             )
         )
+        self.__election_read_model.add_candidate(
+            partial_election.id, event_id, displayable_candidate
+        )
         return True
 
     def move_election_to_voting(self, db_session: DbSession, election_id: str):
@@ -194,7 +278,8 @@ class RCVManager:
                 election_id=election_id,
                 status=partial_election.election_status,
                 message=f"Cannot move election to status {ElectionStatus.VOTING.name} "
-                        f"when no candidates have been nominated")
+                f"when no candidates have been nominated",
+            )
 
         # TODO: validate change made by using WHERE
         partial_election.election_status = ElectionStatus.VOTING
@@ -203,9 +288,7 @@ class RCVManager:
             election_id, ElectionStatus.VOTING
         )
 
-    def mark_election_as_complete(
-            self, db_session: DbSession, election_id: str
-    ):
+    def mark_election_as_complete(self, db_session: DbSession, election_id: str):
         # could lead to race conditions, but exact completed_at not support important
         partial_election = Election.get_election_by_id(
             db_session,
@@ -225,15 +308,19 @@ class RCVManager:
         partial_election.election_status = ElectionStatus.COMPLETE
         partial_election.election_completed_at = datetime.now()
         db_session.commit()
-        self.__queue_election_for_result_update(election=partial_election)
-        self.__push_election_status_change_to_update_stream(election_id, ElectionStatus.COMPLETE)
+        self.__election_result_scheduler.request_final_update(election_id)
+        self.__live_tally.clear(election_id)
+        self.__push_election_status_change_to_update_stream(
+            election_id, ElectionStatus.COMPLETE
+        )
 
     def __push_election_status_change_to_update_stream(
-            self, election_id: str, new_status: ElectionStatus
+        self, election_id: str, new_status: ElectionStatus
     ):
-        ElectionUpdateStream.for_election(election_id).publish_message(
+        event_id = ElectionUpdateStream.for_election(election_id).publish_message(
             StatusChangedEvent(new_status)
         )
+        self.__election_read_model.set_status(election_id, event_id, new_status)
 
     def get_candidates(self, db_session: DbSession, active_id: str) -> [Candidate]:
         partial_election = Election.get_active_election_by_active_id(
@@ -269,9 +356,7 @@ class RCVManager:
                 status=partial_election.election_status,
             )
 
-        candidate_ids = set(
-            [candidate.business_id for candidate in partial_election.candidates]
-        )
+        candidate_ids = set(self.__get_voting_candidate_ids(db_session, election_id))
         for business_id in votes:
             if business_id not in candidate_ids:
                 raise HttpException(
@@ -286,51 +371,40 @@ class RCVManager:
                 status_code=400,
             )
 
-        rankings = [
-            Ranking(
-                user_id=user_id,
-                election_id=election_id,
-                business_id=business_id,
-                rank=index,
-            )
-            for index, business_id in enumerate(votes)
-        ]
-        already_voted = Ranking.delete_users_rankings_for_election(
-            db_session, user_id=user_id, election_id=election_id
-        ) > 0
-        db_session.add_all(rankings)
+        already_voted = Ranking.replace_users_rankings_for_election(
+            db_session, user_id=user_id, election_id=election_id, business_ids=votes
+        )
         db_session.commit()
+        self.__live_tally.apply_ballot(db_session, election_id, user_id, votes)
+        self.__election_result_scheduler.request_live_update(election_id)
 
         if not already_voted:
             # TODO: Maybe pass nickname from cookie instead of re-fetching after vote
             nickname = self.__user_manager.get_nickname_by_user_id(db_session, user_id)
-            ElectionUpdateStream.for_election(election_id).publish_message(
-                VoteCastEvent(
-                    user_id=user_id,
-                    nickname=nickname if nickname is not None else "Unknown"
-                )
+            voter = DisplayableUser(
+                id=user_id, nickname=nickname if nickname is not None else "Unknown"
             )
+            event_id = ElectionUpdateStream.for_election(election_id).publish_message(
+                VoteCastEvent(user_id=voter.id, nickname=voter.nickname)
+            )
+            self.__election_read_model.add_voter(election_id, event_id, voter)
 
-    def __queue_election_for_result_update(self, election: Election):
+    def __get_voting_candidate_ids(
+        self, db_session: DbSession, election_id: str
+    ) -> FrozenSet[str]:
         """
-        Add more logic later on:
-        If election has been updated recently, delay update by a bit or add some sort of rate limit on an
-        election basis
+        candidates can only be added while the election is in creation, so the candidates of an election in voting
+        never change
         """
-        fetch_result = rcv_vote_queue.fetch_job(election.id)
-        # TODO: Watch for stalled jobs
-        if (
-                fetch_result is None
-                or fetch_result.get_status(refresh=False) == JobStatus.FINISHED
-                or fetch_result.get_status(refresh=False) == JobStatus.FAILED
-        ):
-            rcv_vote_queue.enqueue(
-                self.__election_result_update_consumer.consume,
-                election.id,
-                job_id=election.id,
-            )
-
-    def get_election_update_stream(self, db_session: DbSession, election_id: str) -> ElectionUpdateStream:
+        candidate_ids = self.__voting_candidate_ids_cache.get(election_id)
+        if candidate_ids is None:
+            candidate_ids = Election.get_candidate_ids(db_session, election_id)
+            self.__voting_candidate_ids_cache.set(election_id, candidate_ids)
+        return candidate_ids
+
+    def get_election_update_stream(
+        self, db_session: DbSession, election_id: str
+    ) -> ElectionUpdateStream:
         """
         checks election existence.
 
@@ -339,10 +413,10 @@ class RCVManager:
         :return: if the election exists, returns the ElectionUpdateStream
         """
         if (
-                Election.get_election_by_id(
-                    db_session, election_id, lambda x: x.options(load_only(Election.id))
-                )
-                is None
+            Election.get_election_by_id(
+                db_session, election_id, lambda x: x.options(load_only(Election.id))
+            )
+            is None
         ):
             raise HttpException(
                 message=f"Election with id: {election_id} not found", status_code=404
@@ -350,10 +424,54 @@ class RCVManager:
 
         return ElectionUpdateStream.for_election(election_id)
 
+    def get_election_update_backlog(
+        self, db_session: DbSession, election_id: str, last_event_id: Optional[str]
+    ) -> List[bytes]:
+        """
+        :param last_event_id: id of the last event the subscriber received (the Last-Event-ID header), if any
+        :return: the events missed since then, or a snapshot of the election if they cannot be replayed
+        """
+        update_stream = ElectionUpdateStream.for_election(election_id)
+        if last_event_id is not None:
+            missed_frames = update_stream.get_frames_after(last_event_id)
+            if missed_frames is not None:
+                return missed_frames
+
+        serialized_election = self.get_serialized_election(db_session, election_id)
+        if serialized_election is None:
+            # deleted since the subscription started
+            raise HttpException(
+                message=f"Election with id: {election_id} not found", status_code=404
+            )
+        # read before the result. A result is stored before its event is logged, so the result includes at least the
+        # results logged up to this event
+        result_version = parse_event_id(
+            update_stream.get_last_event_id().encode("utf-8")
+        )
+        encoded_result = update_stream.get_latest_encoded_result()
+        if encoded_result is None:
+            stored_result = self.get_election_results(db_session, election_id)
+            if stored_result is not None:
+                encoded_result = ElectionResultEvent(stored_result).encoded_data
+        snapshot = ElectionSnapshotEvent(
+            serialized_election.version,
+            encoded_election=serialized_election.encoded_election,
+            encoded_result=encoded_result,
+        )
+        # events logged after the version of the election, e.g. one whose read model update is still in flight. The
+        # result events the snapshot already includes are left out
+        return [snapshot.to_convention_event_frame()] + [
+            frame
+            for frame in update_stream.get_frames_after(serialized_election.version)
+            or []
+            if get_frame_event_type(frame) not in RESULT_EVENT_TYPES
+            or get_frame_event_id(frame) > result_version
+        ]
+
 
 class InvalidElectionStatusException(HttpException):
     def __init__(
-            self, message: str, status: ElectionStatus, election_id: Optional[str] = None
+        self, message: str, status: ElectionStatus, election_id: Optional[str] = None
     ):
         super(InvalidElectionStatusException, self).__init__(
             message=message,
@@ -1,7 +1,20 @@
+import os
+import zlib
+
 from rq import Queue
 
 from recommender.db_config import primary_redis_conn
 
-rcv_vote_queue = Queue(
-    "rcv_election_result_update_queue", connection=primary_redis_conn
-)
+# elections are sharded across queues by id so several workers can tabulate different elections in parallel
+NUMBER_OF_RCV_VOTE_QUEUE_SHARDS = int(os.environ.get("RCV_VOTE_QUEUE_SHARDS", 4))
+
+rcv_vote_queues = [
+    Queue(f"rcv_election_result_update_queue_{shard}", connection=primary_redis_conn)
+    for shard in range(NUMBER_OF_RCV_VOTE_QUEUE_SHARDS)
+]
+
+
+def get_rcv_vote_queue(election_id: str) -> Queue:
+    return rcv_vote_queues[
+        zlib.crc32(election_id.encode("utf-8")) % NUMBER_OF_RCV_VOTE_QUEUE_SHARDS
+    ]
@@ -0,0 +1,110 @@
+"""
+Per search session buffer of ranked businesses that have not been recommended yet.
+
+Filled ahead of time so that a swipe only has to pop the next candidate instead of searching Yelp. Backed by a
+redis list (best candidate at the head) so the web processes and the rq workers that refill it share the buffer.
+A set of the normalized names ever pushed for the session dedupes the pushes, so the synchronous search of a swipe
+and a refill running at the same time never buffer a business twice.
+"""
+import json
+from typing import Final, Optional
+
+from redis import Redis
+
+from recommender.data.recommendation.filterable_business import RecommendableBusiness
+from recommender.db_config import primary_redis_conn
+from recommender.recommend.recommendation_engine_input import RecommendationEngineInput
+from recommender.recommend.recommender import Recommender
+
+CANDIDATE_POOL_EXPIRATION_IN_SECONDS = 60 * 60
+# a refill is scheduled once a session has fewer candidates buffered than this
+CANDIDATE_POOL_LOW_WATERMARK = 5
+
+# KEYS: pool list, pushed names set. ARGV: expiration, then the normalized name and the business of each candidate
+# returns the number of candidates pushed
+PUSH_SCRIPT: Final[
+    str
+] = """
+local number_of_pushed_candidates = 0
+for index = 2, #ARGV, 2 do
+    if redis.call("SADD", KEYS[2], ARGV[index]) == 1 then
+        redis.call("RPUSH", KEYS[1], ARGV[index + 1])
+        number_of_pushed_candidates = number_of_pushed_candidates + 1
+    end
+end
+redis.call("EXPIRE", KEYS[1], ARGV[1])
+redis.call("EXPIRE", KEYS[2], ARGV[1])
+return number_of_pushed_candidates
+"""
+
+
+class CandidatePool:
+    __redis_connection: Final[Redis]
+
+    def __init__(self, redis_connection: Redis = primary_redis_conn):
+        self.__redis_connection = redis_connection
+        self.__push_script = redis_connection.register_script(PUSH_SCRIPT)
+
+    def pop(self, session_id: str) -> Optional[RecommendableBusiness]:
+        business_as_string = self.__redis_connection.lpop(
+            self.__get_pool_key(session_id)
+        )
+        if business_as_string is None:
+            return None
+        return RecommendableBusiness.from_dict(json.loads(business_as_string))
+
+    def push(self, session_id: str, businesses: [RecommendableBusiness]) -> int:
+        """
+        Appends the businesses, in order, that were never pushed for the session
+
+        :return: the number of businesses appended
+        """
+        if len(businesses) == 0:
+            return 0
+        return self.__push_script(
+            keys=[
+                self.__get_pool_key(session_id),
+                self.__get_pushed_names_key(session_id),
+            ],
+            args=[CANDIDATE_POOL_EXPIRATION_IN_SECONDS]
+            + [
+                argument
+                for business in businesses
+                for argument in (business.name.lower(), json.dumps(business.to_dict()))
+            ],
+        )
+
+    def size(self, session_id: str) -> int:
+        return self.__redis_connection.llen(self.__get_pool_key(session_id))
+
+    def is_low(self, session_id: str) -> bool:
+        return self.size(session_id) < CANDIDATE_POOL_LOW_WATERMARK
+
+    def clear(self, session_id: str):
+        self.__redis_connection.delete(
+            self.__get_pool_key(session_id), self.__get_pushed_names_key(session_id)
+        )
+
+    def refill(
+        self, recommender: Recommender, recommendation_input: RecommendationEngineInput
+    ):
+        """
+        Appends newly generated candidates that were never pushed for the session
+        """
+        session_id = recommendation_input.session_id
+        pushed_business_names = {
+            name.decode("utf-8")
+            for name in self.__redis_connection.smembers(
+                self.__get_pushed_names_key(session_id)
+            )
+        }
+        candidates = recommender.generate_candidates(
+            recommendation_input, excluded_business_names=pushed_business_names
+        )
+        self.push(session_id, candidates)
+
+    def __get_pool_key(self, session_id: str) -> str:
+        return f"search-session:{session_id}:candidates"
+
+    def __get_pushed_names_key(self, session_id: str) -> str:
+        return f"search-session:{session_id}:candidate-names"
@@ -0,0 +1,68 @@
+import logging
+import os
+from typing import Final, Optional
+
+from recommender.api.utils.http_exception import ErrorCode, HttpException
+from recommender.business.business_manager import BusinessManager
+from recommender.business.yelp_client import YelpClient
+from recommender.data.recommendation.search_session import (
+    SearchSession,
+    with_search_request,
+)
+from recommender.db_config import DbSession
+from recommender.recommend.candidate_pool import CandidatePool
+from recommender.recommend.candidate_ranker import CandidateRanker
+from recommender.recommend.recommendation_engine_input import RecommendationEngineInput
+from recommender.recommend.recommendation_queue_config import (
+    candidate_pool_refill_queue,
+)
+from recommender.recommend.recommender import Recommender
+from recommender.recommend.search_cursor import SearchCursor
+from recommender.recommend.seen_business_index import SeenBusinessIndex
+
+LOGGER = logging.getLogger(__name__)
+
+# created on first use so only the worker processes create a Yelp client
+__recommender: Optional[Recommender] = None
+
+
+def get_worker_recommender() -> Recommender:
+    global __recommender
+    if __recommender is None:
+        __recommender = Recommender(
+            BusinessManager(YelpClient(os.environ["YELP_API_KEY"])),
+            SearchCursor(),
+            CandidateRanker(),
+        )
+    return __recommender
+
+
+class CandidatePoolRefillConsumer:
+    QUEUE_NAME: Final[str] = candidate_pool_refill_queue.name
+
+    def consume(self, session_id: str):
+        db_session = DbSession()
+        try:
+            search_session = SearchSession.get_session_by_id(
+                db_session, session_id, with_search_request
+            )
+            if search_session is None or search_session.is_complete:
+                return
+            candidate_pool = CandidatePool()
+            if not candidate_pool.is_low(session_id):
+                # refilled since the job was queued
+                return
+            try:
+                candidate_pool.refill(
+                    get_worker_recommender(),
+                    RecommendationEngineInput.from_search_session(
+                        search_session, SeenBusinessIndex().get(db_session, session_id)
+                    ),
+                )
+            except HttpException as error:
+                if error.error_code != ErrorCode.NO_BUSINESSES_FOUND.code_value:
+                    raise error
+                # the remaining candidates are used up, a swipe will search synchronously
+                LOGGER.info(f"No candidates found to refill session {session_id}")
+        finally:
+            db_session.close()
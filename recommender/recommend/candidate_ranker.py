@@ -0,0 +1,58 @@
+import random
+from typing import Final
+
+from rapidfuzz import fuzz, process, utils
+
+from recommender.data.recommendation.filterable_business import RecommendableBusiness
+from recommender.utilities.lru_ttl_cache import LruTtlCache
+
+NORMALIZED_TERM_CACHE_MAX_SIZE = 1000
+NORMALIZED_TERM_CACHE_EXPIRATION_IN_SECONDS = 60 * 60
+
+
+class CandidateRanker:
+    """
+    Orders candidates from best to worst recommendation.
+
+    Without a search term, candidates are shuffled. With a search term, candidates are scored against the term in one
+    batched rapidfuzz call, which keeps the top candidates with a heap instead of sorting every candidate.
+    """
+
+    __normalized_term_cache: Final[LruTtlCache[str, str]]
+
+    def __init__(self):
+        # per session, the search term of a session never changes
+        self.__normalized_term_cache = LruTtlCache(
+            max_size=NORMALIZED_TERM_CACHE_MAX_SIZE,
+            ttl_in_seconds=NORMALIZED_TERM_CACHE_EXPIRATION_IN_SECONDS,
+        )
+
+    def rank(
+        self,
+        session_id: str,
+        search_term: str,
+        candidates: [RecommendableBusiness],
+        limit: int,
+    ) -> [RecommendableBusiness]:
+        """
+        :return: at most limit candidates, best first
+        """
+        if len(search_term) == 0:
+            return random.sample(candidates, min(limit, len(candidates)))
+
+        normalized_term = self.__get_normalized_term(session_id, search_term)
+        top_matches = process.extract(
+            normalized_term,
+            [utils.default_process(candidate.name) for candidate in candidates],
+            scorer=fuzz.partial_ratio,
+            processor=None,
+            limit=limit,
+        )
+        return [candidates[index] for _, _, index in top_matches]
+
+    def __get_normalized_term(self, session_id: str, search_term: str) -> str:
+        normalized_term = self.__normalized_term_cache.get(session_id)
+        if normalized_term is None:
+            normalized_term = utils.default_process(search_term)
+            self.__normalized_term_cache.set(session_id, normalized_term)
+        return normalized_term
@@ -1,54 +1,31 @@
-from dataclasses import dataclass, field
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Set
 
 from recommender.data.recommendation.business_search_request import (
     BusinessSearchRequest,
 )
-from recommender.data.recommendation.recommendation import Recommendation
+from recommender.data.recommendation.search_session import SearchSession
 
 
 @dataclass
 class RecommendationEngineInput:
-    session_id: str
-    rejected_recommendations: [Recommendation]
-    maybe_recommendations: [Recommendation]
-    accepted_recommendations: [Recommendation]
-    search_request: BusinessSearchRequest
-
-    @property
-    def rejected_business_ids(self):
-        return [
-            recommendation.business_id
-            for recommendation in self.rejected_recommendations
-        ]
-
-    @property
-    def maybe_business_ids(self):
-        return [
-            recommendation.business_id for recommendation in self.maybe_recommendations
-        ]
-
-    @property
-    def accepted_recommendation_ids(self):
-        return [
-            recommendation.business_id
-            for recommendation in self.accepted_recommendations
-        ]
-
-    @property
-    def seen_business_ids(self):
-        return (
-            self.rejected_business_ids
-            + self.maybe_business_ids
-            + self.accepted_recommendation_ids
+    @staticmethod
+    def from_search_session(
+        search_session: SearchSession, seen_businesses: Dict[str, str]
+    ) -> RecommendationEngineInput:
+        """
+        :param seen_businesses: normalized business name by business id (see SeenBusinessIndex)
+        """
+        return RecommendationEngineInput(
+            session_id=search_session.id,
+            search_request=search_session.search_request,
+            seen_business_ids=set(seen_businesses.keys()),
+            normalized_seen_business_names=set(seen_businesses.values()),
         )
 
-    @property
-    def normalized_seen_business_names(self):
-        return set(
-            [
-                recommendation.business_data_for_recommendation.name.lower()
-                for recommendation in self.rejected_recommendations
-                + self.maybe_recommendations
-                + self.accepted_recommendations
-            ]
-        )
+    session_id: str
+    search_request: BusinessSearchRequest
+    seen_business_ids: Set[str]
+    normalized_seen_business_names: Set[str]
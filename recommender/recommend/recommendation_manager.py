@@ -1,30 +1,88 @@
+from typing import Optional
+
+from rq.job import JobStatus
+from sqlalchemy.orm import Session
+
 from recommender.business.search_client import SearchClient
 from recommender.data.recommendation.displayable_recommendation import (
     DisplayableRecommendation,
 )
+from recommender.data.recommendation.filterable_business import RecommendableBusiness
 from recommender.data.recommendation.recommendation import Recommendation
 from recommender.data.recommendation.search_session import SearchSession
+from recommender.recommend.candidate_pool import CandidatePool
+from recommender.recommend.candidate_pool_refill_consumer import (
+    CandidatePoolRefillConsumer,
+)
 from recommender.recommend.recommendation_engine_input import RecommendationEngineInput
+from recommender.recommend.recommendation_queue_config import (
+    candidate_pool_refill_queue,
+)
 from recommender.recommend.recommender import Recommender
+from recommender.recommend.seen_business_index import SeenBusinessIndex
 
 
 class RecommendationManager:
-    def __init__(self, search_client: SearchClient, recommender: Recommender) -> None:
+    __candidate_pool_refill_consumer: CandidatePoolRefillConsumer = (
+        CandidatePoolRefillConsumer()
+    )
+
+    def __init__(
+        self,
+        search_client: SearchClient,
+        recommender: Recommender,
+        candidate_pool: CandidatePool,
+        seen_business_index: SeenBusinessIndex,
+    ) -> None:
         super().__init__()
         self.__recommender = recommender
         self.__search_client = search_client
+        self.__candidate_pool = candidate_pool
+        self.__seen_business_index = seen_business_index
+
+    def fill_candidate_pool(self, db_session: Session, search_session: SearchSession):
+        self.__candidate_pool.refill(
+            self.__recommender,
+            self.__get_recommendation_engine_input(db_session, search_session),
+        )
+
+    def clear_session_caches(self, session_id: str):
+        self.__candidate_pool.clear(session_id)
+        self.__seen_business_index.clear(session_id)
+
+    def record_seen_recommendation(self, recommendation: Recommendation):
+        self.__seen_business_index.record(recommendation)
 
     def generate_new_recommendation_for_session(
-        self, search_session: SearchSession
+        self, db_session: Session, search_session: SearchSession
     ) -> Recommendation:
-        recommendation_engine_input = RecommendationEngineInput(
-            session_id=search_session.id,
-            search_request=search_session.search_request,
-            rejected_recommendations=search_session.rejected_recommendations,
-            maybe_recommendations=search_session.maybe_recommendations,
-            accepted_recommendations=search_session.accepted_recommendations,
+        """
+        :param search_session: only its search request is read
+        """
+        recommendation_engine_input = self.__get_recommendation_engine_input(
+            db_session, search_session
+        )
+        business_to_recommend = self.__pop_unseen_candidate(recommendation_engine_input)
+        if business_to_recommend is None:
+            # nothing buffered (e.g. the refill has not finished yet), search synchronously. The candidates go through
+            # the pool like the candidates of a refill, so a refill running meanwhile does not buffer them twice
+            candidates = self.__recommender.generate_candidates(
+                recommendation_engine_input
+            )
+            self.__candidate_pool.push(search_session.id, candidates)
+            business_to_recommend = self.__pop_unseen_candidate(
+                recommendation_engine_input
+            )
+            if business_to_recommend is None:
+                # every candidate was buffered and popped by concurrent requests of the session
+                business_to_recommend = candidates[0]
+
+        if self.__candidate_pool.is_low(search_session.id):
+            self.__queue_candidate_pool_refill(search_session.id)
+
+        return self.__recommender.create_recommendation(
+            search_session.id, business_to_recommend
         )
-        return self.__recommender.recommend(recommendation_engine_input)
 
     def get_displayable_recommendation_from_recommendation(
         self, recommendation: Recommendation
@@ -37,3 +95,62 @@ class RecommendationManager:
             business=displayable_business,
             distance=recommendation.distance,
         )
+
+    def get_displayable_recommendations_from_recommendations(
+        self, recommendations: [Recommendation]
+    ) -> [DisplayableRecommendation]:
+        displayable_businesses = self.__search_client.get_displayable_businesses(
+            [recommendation.business_id for recommendation in recommendations]
+        )
+        return [
+            DisplayableRecommendation(
+                session_id=recommendation.session_id,
+                business=displayable_business,
+                distance=recommendation.distance,
+            )
+            for recommendation, displayable_business in zip(
+                recommendations, displayable_businesses
+            )
+        ]
+
+    def __pop_unseen_candidate(
+        self, recommendation_engine_input: RecommendationEngineInput
+    ) -> Optional[RecommendableBusiness]:
+        """
+        buffered candidates may have been seen since they were buffered (e.g. a refill raced a swipe)
+        """
+        seen_business_ids = recommendation_engine_input.seen_business_ids
+        seen_business_names = recommendation_engine_input.normalized_seen_business_names
+        while True:
+            candidate = self.__candidate_pool.pop(
+                recommendation_engine_input.session_id
+            )
+            if candidate is None:
+                return None
+            if (
+                candidate.id not in seen_business_ids
+                and candidate.name.lower() not in seen_business_names
+            ):
+                return candidate
+
+    def __get_recommendation_engine_input(
+        self, db_session: Session, search_session: SearchSession
+    ) -> RecommendationEngineInput:
+        return RecommendationEngineInput.from_search_session(
+            search_session,
+            self.__seen_business_index.get(db_session, search_session.id),
+        )
+
+    def __queue_candidate_pool_refill(self, session_id: str):
+        job_id = f"candidate-pool-refill:{session_id}"
+        fetch_result = candidate_pool_refill_queue.fetch_job(job_id)
+        if (
+            fetch_result is None
+            or fetch_result.get_status(refresh=False) == JobStatus.FINISHED
+            or fetch_result.get_status(refresh=False) == JobStatus.FAILED
+        ):
+            candidate_pool_refill_queue.enqueue(
+                self.__candidate_pool_refill_consumer.consume,
+                session_id,
+                job_id=job_id,
+            )
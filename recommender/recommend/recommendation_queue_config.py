@@ -0,0 +1,7 @@
+from rq import Queue
+
+from recommender.db_config import primary_redis_conn
+
+candidate_pool_refill_queue = Queue(
+    "recommendation_candidate_pool_refill_queue", connection=primary_redis_conn
+)
@@ -1,9 +1,5 @@
-import math
-import random
 from logging import warning
-from typing import Final
-
-from fuzzywuzzy import fuzz
+from typing import Final, Set
 
 from recommender.api.utils.http_exception import ErrorCode, HttpException
 from recommender.business.page import Page
@@ -16,69 +12,113 @@ from recommender.data.recommendation.displayable_recommendation import (
 )
 from recommender.data.recommendation.filterable_business import RecommendableBusiness
 from recommender.data.recommendation.recommendation import Recommendation
+from recommender.recommend.candidate_ranker import CandidateRanker
 from recommender.recommend.recommendation_engine_input import RecommendationEngineInput
+from recommender.recommend.search_cursor import SearchCursor
+
+
+DEFAULT_MAX_FETCHES = 3
 
 
 class Recommender:
     __LIMIT_TO_USE: Final[int] = 20
-    __MAX_FETCHES: Final[int] = 1
+    __TARGET_AMOUNT: Final[int] = 20
+    __max_fetches: Final[int]
+    __search_cursor: Final[SearchCursor]
+    __candidate_ranker: Final[CandidateRanker]
 
-    def __init__(self, search_client: SearchClient):
+    def __init__(
+        self,
+        search_client: SearchClient,
+        search_cursor: SearchCursor,
+        candidate_ranker: CandidateRanker,
+        max_fetches: int = DEFAULT_MAX_FETCHES,
+    ):
+        """
+        :param max_fetches: maximum number of search pages fetched to generate candidates
+        """
         self._search_client = search_client
+        self.__search_cursor = search_cursor
+        self.__max_fetches = max_fetches
+        self.__candidate_ranker = candidate_ranker
 
     def recommend(
         self, recommendation_input: RecommendationEngineInput
     ) -> Recommendation:
+        return self.create_recommendation(
+            recommendation_input.session_id,
+            self.generate_candidates(recommendation_input)[0],
+        )
+
+    def generate_candidates(
+        self,
+        recommendation_input: RecommendationEngineInput,
+        excluded_business_names: Set[str] = frozenset(),
+    ) -> [RecommendableBusiness]:
+        """
+        :param excluded_business_names: normalized names to skip in addition to the businesses already seen
+        :return: unseen businesses, best recommendation first
+        """
         potential_businesses_to_recommend = self.__fetch_unseen_businesses(
-            recommendation_input, target_amount=20
+            recommendation_input,
+            target_amount=self.__TARGET_AMOUNT,
+            excluded_business_names=excluded_business_names,
         )
-        if len(recommendation_input.search_request.search_term) == 0:
-            business_to_recommend: RecommendableBusiness = potential_businesses_to_recommend[
-                random.randint(0, len(potential_businesses_to_recommend) - 1)
-            ]
-        else:
-            business_to_recommend: RecommendableBusiness = sorted(
-                potential_businesses_to_recommend,
-                key=lambda business: fuzz.partial_ratio(
-                    recommendation_input.search_request.search_term, business.name
-                ),
-                reverse=True,
-            )[0]
-        return Recommendation(
+        return self.__candidate_ranker.rank(
             session_id=recommendation_input.session_id,
+            search_term=recommendation_input.search_request.search_term,
+            candidates=potential_businesses_to_recommend,
+            limit=self.__TARGET_AMOUNT,
+        )
+
+    def create_recommendation(
+        self, session_id: str, business_to_recommend: RecommendableBusiness
+    ) -> Recommendation:
+        return Recommendation(
+            session_id=session_id,
             business_id=business_to_recommend.id,
             distance=business_to_recommend.distance,
             business_data_for_recommendation=business_to_recommend,
         )
 
     def __fetch_unseen_businesses(
-        self, recommendation_input: RecommendationEngineInput, target_amount
+        self,
+        recommendation_input: RecommendationEngineInput,
+        target_amount,
+        excluded_business_names: Set[str],
     ) -> [RecommendableBusiness]:
-        seen_business_ids = recommendation_input.seen_business_ids
+        session_id = recommendation_input.session_id
+        seen_business_names = recommendation_input.normalized_seen_business_names
 
         potential_recommendations = []
-        initial_offset = math.floor(len(seen_business_ids) / self.__LIMIT_TO_USE)
-        current_page = Page(limit=self.__LIMIT_TO_USE, offset=initial_offset)
+        # resume from the page after the last one fetched for the session
+        current_page = self.__search_cursor.get_page(session_id, self.__LIMIT_TO_USE)
         iteration_counter = 0
         while len(potential_recommendations) < target_amount:
-            if iteration_counter >= self.__MAX_FETCHES:
+            if iteration_counter >= self.__max_fetches:
                 break
             raw_businesses = self.__fetch_raw_businesses(
                 recommendation_input.search_request, current_page
             )
-            if len(raw_businesses) == 0:
-                break
-            seen_business_names = recommendation_input.normalized_seen_business_names
+            iteration_counter += 1
             unseen_businesses = list(
                 filter(
-                    lambda x: x.name.lower() not in seen_business_names, raw_businesses
+                    lambda x: x.name.lower() not in seen_business_names
+                    and x.name.lower() not in excluded_business_names,
+                    raw_businesses,
                 )
             )
 
             potential_recommendations = potential_recommendations + unseen_businesses
 
+            if len(raw_businesses) < current_page.limit:
+                # reached the end of the results. Start over next time: businesses that were closed earlier may
+                # be open now and the seen businesses are filtered out anyway
+                current_page = Page(limit=self.__LIMIT_TO_USE, offset=0)
+                break
             current_page = current_page.next_page()
-            iteration_counter += 1
+        self.__search_cursor.save(session_id, current_page)
+
         if len(potential_recommendations) == 0:
             raise HttpException(
                 message="No businesses found. Try different parameters",
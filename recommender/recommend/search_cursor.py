@@ -0,0 +1,33 @@
+"""
+Remembers the next search page to fetch for each search session so that later fetches resume where the last one
+left off instead of re-reading pages whose businesses were already seen.
+"""
+from typing import Final
+
+from redis import Redis
+
+from recommender.business.page import Page
+from recommender.db_config import primary_redis_conn
+
+SEARCH_CURSOR_EXPIRATION_IN_SECONDS = 60 * 60
+
+
+class SearchCursor:
+    __redis_connection: Final[Redis]
+
+    def __init__(self, redis_connection: Redis = primary_redis_conn):
+        self.__redis_connection = redis_connection
+
+    def get_page(self, session_id: str, limit: int) -> Page:
+        offset = self.__redis_connection.get(self.__get_cursor_key(session_id))
+        return Page(limit=limit, offset=0 if offset is None else int(offset))
+
+    def save(self, session_id: str, next_page: Page):
+        self.__redis_connection.set(
+            self.__get_cursor_key(session_id),
+            next_page.offset,
+            ex=SEARCH_CURSOR_EXPIRATION_IN_SECONDS,
+        )
+
+    def __get_cursor_key(self, session_id: str) -> str:
+        return f"search-session:{session_id}:search-offset"
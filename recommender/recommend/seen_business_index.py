@@ -0,0 +1,90 @@
+"""
+Per search session index of the businesses the user already acted on (rejected, maybe-ed or accepted).
+
+Updated incrementally whenever an action is applied so that building the recommendation engine input does not load
+the recommendations of the session. Backed by a redis hash of business id -> normalized business name. If the hash
+is missing (expired, or the session started before the index existed), it is rebuilt from the business names of the
+recommendations in the database.
+"""
+from typing import Dict, Final
+
+from redis import Redis
+from sqlalchemy.orm import Session
+
+from recommender.data.recommendation.recommendation import Recommendation
+from recommender.db_config import primary_redis_conn
+
+SEEN_BUSINESS_INDEX_EXPIRATION_IN_SECONDS = 60 * 60
+# business ids are never empty. Marks an index that holds every seen business of the session
+INITIALIZED_FIELD: Final[str] = ""
+
+# KEYS: index. ARGV: initialized field, business id, normalized business name, expiration
+# returns 0 if the index has not been built
+RECORD_SCRIPT: Final[
+    str
+] = """
+if redis.call("HEXISTS", KEYS[1], ARGV[1]) == 0 then
+    return 0
+end
+redis.call("HSET", KEYS[1], ARGV[2], ARGV[3])
+redis.call("EXPIRE", KEYS[1], ARGV[4])
+return 1
+"""
+
+
+class SeenBusinessIndex:
+    __redis_connection: Final[Redis]
+
+    def __init__(self, redis_connection: Redis = primary_redis_conn):
+        self.__redis_connection = redis_connection
+        self.__record_script = redis_connection.register_script(RECORD_SCRIPT)
+
+    def get(self, db_session: Session, session_id: str) -> Dict[str, str]:
+        """
+        :return: normalized business name by business id
+        """
+        seen_businesses = {
+            business_id.decode("utf-8"): name.decode("utf-8")
+            for business_id, name in self.__redis_connection.hgetall(
+                self.__get_index_key(session_id)
+            ).items()
+        }
+        if seen_businesses.pop(INITIALIZED_FIELD, None) is not None:
+            return seen_businesses
+        return self.__rebuild(db_session, session_id)
+
+    def record(self, recommendation: Recommendation):
+        """
+        Adds a recommendation the user acted on, in one atomic step. A no-op until the index is built so a partial
+        index is never read
+        """
+        self.__record_script(
+            keys=[self.__get_index_key(recommendation.session_id)],
+            args=[
+                INITIALIZED_FIELD,
+                recommendation.business_id,
+                recommendation.business_data_for_recommendation.name.lower(),
+                SEEN_BUSINESS_INDEX_EXPIRATION_IN_SECONDS,
+            ],
+        )
+
+    def clear(self, session_id: str):
+        self.__redis_connection.delete(self.__get_index_key(session_id))
+
+    def __rebuild(self, db_session: Session, session_id: str) -> Dict[str, str]:
+        seen_businesses = {
+            business_id: name.lower()
+            for business_id, name in Recommendation.get_seen_business_names(
+                db_session, session_id
+            ).items()
+        }
+        index_key = self.__get_index_key(session_id)
+        pipeline = self.__redis_connection.pipeline()
+        pipeline.delete(index_key)
+        pipeline.hset(index_key, mapping={INITIALIZED_FIELD: "", **seen_businesses})
+        pipeline.expire(index_key, SEEN_BUSINESS_INDEX_EXPIRATION_IN_SECONDS)
+        pipeline.execute()
+        return seen_businesses
+
+    def __get_index_key(self, session_id: str) -> str:
+        return f"search-session:{session_id}:seen-businesses"
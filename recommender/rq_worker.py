@@ -17,11 +17,19 @@ else:
     from rq.worker import Worker
 
 # optimization -> Import all libraries used in the consumer function
+from recommender.rcv.election_result_scheduler import run_scheduled_result_update
 from recommender.rcv.election_result_update_consumer import ElectionResultUpdateConsumer
+from recommender.recommend.candidate_pool_refill_consumer import (
+    CandidatePoolRefillConsumer,
+)
 
-QUEUES_TO_WORK = [ElectionResultUpdateConsumer.QUEUE_NAME]
+QUEUES_TO_WORK = [
+    *ElectionResultUpdateConsumer.QUEUE_NAMES,
+    CandidatePoolRefillConsumer.QUEUE_NAME,
+]
 
 if __name__ == "__main__":
     with Connection(primary_redis_conn):
         worker = Worker(map(Queue, QUEUES_TO_WORK))
-        worker.work()
+        # the scheduler moves the debounced election result updates to their queues when they are due
+        worker.work(with_scheduler=True)
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
-from typing import Final, List, Optional, Union
+import logging
+from time import perf_counter
+from typing import Dict, Final, List, Optional
 from uuid import uuid4
 
 from sqlalchemy.orm import Session
@@ -19,58 +21,82 @@ from recommender.data.recommendation.displayable_search_session import (
 )
 from recommender.data.recommendation.recommendation import Recommendation
 from recommender.data.recommendation.recommendation_action import RecommendationAction
-from recommender.data.recommendation.search_session import SearchSession
+from recommender.data.recommendation.search_session import (
+    SearchSession,
+    with_search_request,
+    with_search_request_and_recommendations,
+)
 from recommender.data.recommendation.search_session_status import SearchSessionStatus
 from recommender.db_config import DbSession
 from recommender.rcv.rcv_manager import InvalidElectionStatusException, RCVManager
 from recommender.recommend.recommendation_manager import RecommendationManager
 
+LOGGER = logging.getLogger(__name__)
+
 
 class SessionManager:
     __recommendation_manager: Final[RecommendationManager]
     __rcv_manager: Final[RCVManager]
 
     def __init__(
-            self, recommendation_manager: RecommendationManager, rcv_manager: RCVManager
+        self, recommendation_manager: RecommendationManager, rcv_manager: RCVManager
     ) -> None:
         # init tables (after everything has been imported by the services)
         self.__recommendation_manager = recommendation_manager
         self.__rcv_manager = rcv_manager
 
-    __RECOMMENDATION_KEYS = [
-        "current_recommendation",
+    __RECOMMENDATION_LIST_KEYS = [
         "accepted_recommendations",
         "maybe_recommendations",
         "rejected_recommendations",
     ]
 
-    def get_displayable_session(self, db_session: DbSession, session_id: str) -> DisplayableSearchSession:
-        search_session = SearchSession.get_session_by_id(db_session, session_id)
-        # parallelize
+    def get_displayable_session(
+        self, db_session: DbSession, session_id: str
+    ) -> DisplayableSearchSession:
+        start_time = perf_counter()
+        search_session = SearchSession.get_session_by_id(
+            db_session, session_id, with_search_request_and_recommendations
+        )
+        load_end_time = perf_counter()
+
+        # resolve the businesses of every bucket in one batch (cached businesses are skipped and the rest are
+        # fetched concurrently) and then split the batch back into the buckets
+        recommendations_by_key: Dict[str, List[Recommendation]] = {
+            recommendation_key: getattr(search_session, recommendation_key)
+            for recommendation_key in self.__RECOMMENDATION_LIST_KEYS
+        }
+        if search_session.current_recommendation is not None:
+            recommendations_by_key["current_recommendation"] = [
+                search_session.current_recommendation
+            ]
+        displayable_recommendations = self.__recommendation_manager.get_displayable_recommendations_from_recommendations(
+            [
+                recommendation
+                for recommendations in recommendations_by_key.values()
+                for recommendation in recommendations
+            ]
+        )
         displayable_recommendations_dict = {}
-        for recommendation_key in self.__RECOMMENDATION_KEYS:
-            recommendation_or_recommendations: Union[
-                Recommendation, List[Recommendation]
-            ] = getattr(search_session, recommendation_key)
-            if not isinstance(recommendation_or_recommendations, list):
-                if recommendation_or_recommendations is None:
-                    continue
-                displayable_recommendations_dict[
-                    recommendation_key
-                ] = self.__recommendation_manager.get_displayable_recommendation_from_recommendation(
-                    recommendation_or_recommendations
-                )
-            else:
-                displayable_recommendations = [
-                    self.__recommendation_manager.get_displayable_recommendation_from_recommendation(
-                        recommendation
-                    )
-                    for recommendation in recommendation_or_recommendations
-                ]
-                displayable_recommendations_dict[
-                    recommendation_key
-                ] = displayable_recommendations
+        start_index = 0
+        for recommendation_key, recommendations in recommendations_by_key.items():
+            displayable_recommendations_dict[
+                recommendation_key
+            ] = displayable_recommendations[
+                start_index : start_index + len(recommendations)
+            ]
+            start_index += len(recommendations)
+        if "current_recommendation" in displayable_recommendations_dict:
+            displayable_recommendations_dict[
+                "current_recommendation"
+            ] = displayable_recommendations_dict["current_recommendation"][0]
 
+        end_time = perf_counter()
+        LOGGER.info(
+            f"Assembled displayable session {session_id} with {len(displayable_recommendations)} recommendations in "
+            f"{(end_time - start_time) * 1000:.1f} ms (load: {(load_end_time - start_time) * 1000:.1f} ms, "
+            f"businesses: {(end_time - load_end_time) * 1000:.1f} ms)"
+        )
         return DisplayableSearchSession(
             id=session_id,
             search_request=search_session.search_request,
@@ -80,19 +106,18 @@ class SessionManager:
         )
 
     def new_session(
-            self,
-            db_session: DbSession,
-            search_request: BusinessSearchRequest,
-            dinner_party_active_id: Optional[str],
-            user_maybe: Optional[SerializableBasicUser],
+        self,
+        db_session: DbSession,
+        search_request: BusinessSearchRequest,
+        dinner_party_active_id: Optional[str],
+        user_maybe: Optional[SerializableBasicUser],
     ) -> SearchSession:
         session_id = str(uuid4())
 
         dinner_party_id = None
         if dinner_party_active_id is not None:
             dinner_party = self.__rcv_manager.get_active_election_by_active_id(
-                db_session,
-                dinner_party_active_id
+                db_session, dinner_party_active_id
             )
             if dinner_party is None:
                 raise HttpException(
@@ -116,41 +141,46 @@ class SessionManager:
         )
         db_session.add(new_session)
         db_session.commit()
+        # prefetch candidates so the first swipes do not wait on Yelp
+        self.__recommendation_manager.fill_candidate_pool(db_session, new_session)
         return new_session
 
     def apply_recommendation_action_to_current(
-            self,
-            db_session: DbSession,
-            session_id: str,
-            current_recommendation_id: str,
-            recommendation_action: RecommendationAction,
+        self,
+        db_session: DbSession,
+        session_id: str,
+        current_recommendation_id: str,
+        recommendation_action: RecommendationAction,
     ):
+        # the other recommendations are only loaded to complete the session
         current_session: SearchSession = SearchSession.get_session_by_id(
-            db_session, session_id
+            db_session, session_id, with_search_request
+        )
+        current_recommendation: Optional[
+            Recommendation
+        ] = Recommendation.get_current_recommendation(db_session, session_id)
+        current_recommendation_id_of_session = (
+            None
+            if current_recommendation is None
+            else current_recommendation.business_id
         )
 
-        if current_recommendation_id != current_session.current_recommendation_id:
+        if current_recommendation_id != current_recommendation_id_of_session:
             raise ValueError(
                 f"Attempting to {recommendation_action} recommendation of id {current_recommendation_id}"
-                f" but current recommendation is {current_session.current_recommendation_id} for "
+                f" but current recommendation is {current_recommendation_id_of_session} for "
                 f"session {current_session.id}"
             )
-        current_recommendation: Recommendation = Recommendation.get_recommendation_by_key(
-            db_session, session_id, current_recommendation_id
-        )
         if current_recommendation is None:
             return ValueError(
                 f"Attempting to {recommendation_action} recommendation of id {current_recommendation_id},"
                 f"but current recommendation is None. This indicates the state of the session is incorrect."
             )
         if recommendation_action == RecommendationAction.MAYBE:
-            current_session.maybe_recommendations.append(current_recommendation)
             current_recommendation.status = RecommendationAction.MAYBE
         elif recommendation_action == RecommendationAction.REJECT:
-            current_session.rejected_recommendations.append(current_recommendation)
             current_recommendation.status = RecommendationAction.REJECT
         else:
-            current_session.accepted_recommendations.append(current_recommendation)
             current_recommendation.status = RecommendationAction.ACCEPT
             db_session.commit()  # complete transaction so rcv_manager can add candidate for SqlLite
             if current_session.is_dinner_party:
@@ -165,16 +195,23 @@ class SessionManager:
                     db_session=db_session, current_session=current_session
                 )
 
+        if not current_session.is_complete:
+            self.__recommendation_manager.record_seen_recommendation(
+                current_recommendation
+            )
         db_session.commit()
-        current_session.current_recommendation = None
 
     def get_next_recommendation_for_session(
-            self, db_session: DbSession, session_id: str
+        self, db_session: DbSession, session_id: str
     ) -> DisplayableRecommendation:
+        # the seen businesses come from the seen business index, not from the recommendations of the session
         search_session: SearchSession = SearchSession.get_session_by_id(
-            db_session, session_id
+            db_session, session_id, with_search_request
         )
-        if search_session.current_recommendation is not None:
+        if (
+            Recommendation.get_current_recommendation(db_session, session_id)
+            is not None
+        ):
             raise ValueError(
                 "Cannot get a new recommendation. The search session has a current recommendation"
             )
@@ -182,8 +219,10 @@ class SessionManager:
         if search_session.is_complete:
             return None
 
-        recommendation: Recommendation = self.__recommendation_manager.generate_new_recommendation_for_session(
-            search_session
+        recommendation: Recommendation = (
+            self.__recommendation_manager.generate_new_recommendation_for_session(
+                db_session, search_session
+            )
         )
         db_session.add(recommendation)
         db_session.commit()
@@ -192,14 +231,14 @@ class SessionManager:
         )
 
     def apply_action_to_maybe(
-            self,
-            db_session: DbSession,
-            session_id: str,
-            recommendation_id: str,
-            recommendation_action: RecommendationAction,
+        self,
+        db_session: DbSession,
+        session_id: str,
+        recommendation_id: str,
+        recommendation_action: RecommendationAction,
     ):
         current_session: SearchSession = SearchSession.get_session_by_id(
-            db_session, session_id
+            db_session, session_id, with_search_request_and_recommendations
         )
 
         if recommendation_action == RecommendationAction.MAYBE:
@@ -215,26 +254,14 @@ class SessionManager:
                 f"Recommendation of id {recommendation_id} not in maybe recommendations"
             )
 
-        recommendation = Recommendation.get_recommendation_by_key(
-            db_session, current_session.id, recommendation_id
-        )
-
+        recommendation = current_session.get_recommendation(recommendation_id)
         recommendation.status = recommendation_action
-        current_session.maybe_recommendations = [
-            rec
-            for rec in current_session.maybe_recommendations
-            if rec.business_id != recommendation_id
-        ]
 
         if recommendation_action == RecommendationAction.ACCEPT:
-            current_session.accepted_recommendations.append(recommendation)
-            recommendation.session_id = session_id  # ORM workaround
             self.__complete_session(
                 db_session=db_session, current_session=current_session
             )
-        elif recommendation_action == RecommendationAction.REJECT:
-            current_session.rejected_recommendations.append(recommendation)
-        else:
+        elif recommendation_action != RecommendationAction.REJECT:
             raise ValueError(
                 f"Unsupported operation to a maybe operation: {recommendation_action}"
             )
@@ -252,8 +279,9 @@ class SessionManager:
             )
 
         for rec_id in recommendations_ids_to_reject:
-            Recommendation.get_recommendation_by_key(
-                db_session, current_session.id, rec_id
+            current_session.get_recommendation(
+                rec_id
             ).status = RecommendationAction.REJECT
 
         current_session.session_status = SearchSessionStatus.COMPLETE
+        self.__recommendation_manager.clear_session_caches(current_session.id)
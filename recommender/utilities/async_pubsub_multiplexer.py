@@ -0,0 +1,168 @@
+"""
+asyncio version of PubSubMultiplexer: one pattern subscription per event loop, fanned out to bounded per-subscriber
+queues. An idle subscriber is a suspended coroutine and a small queue instead of a thread and a redis connection.
+"""
+import asyncio
+import logging
+from typing import (
+    AsyncGenerator,
+    Awaitable,
+    Callable,
+    Dict,
+    Final,
+    Iterable,
+    Optional,
+    Set,
+)
+
+from redis.asyncio import Redis
+from redis.exceptions import ConnectionError
+
+from recommender.utilities.pubsub_multiplexer import (
+    HEARTBEAT_INTERVAL_IN_SECONDS,
+    MAX_QUEUED_MESSAGES_PER_SUBSCRIBER,
+    RECONNECT_DELAY_IN_SECONDS,
+)
+
+LOGGER = logging.getLogger(__name__)
+
+
+class _AsyncSubscriber:
+    messages: Final[asyncio.Queue]
+    # set when the subscriber falls too far behind. It is dropped after reading the messages already queued
+    is_overflowed: bool
+
+    def __init__(self, max_queued_messages: int):
+        self.messages = asyncio.Queue(maxsize=max_queued_messages)
+        self.is_overflowed = False
+
+
+class AsyncPubSubMultiplexer:
+    pattern: Final[str]
+    __redis_connection: Final[Redis]
+    __max_queued_messages: Final[int]
+    __heartbeat_interval_in_seconds: Final[float]
+    __subscribers_by_channel: Dict[str, Set[_AsyncSubscriber]]
+    __listener: Optional[asyncio.Task]
+    # set while the pattern subscription is active
+    __is_listening: Optional[asyncio.Event]
+
+    def __init__(
+        self,
+        pattern: str,
+        redis_connection: Redis,
+        max_queued_messages: int = MAX_QUEUED_MESSAGES_PER_SUBSCRIBER,
+        heartbeat_interval_in_seconds: float = HEARTBEAT_INTERVAL_IN_SECONDS,
+    ):
+        """
+        :param pattern: redis glob pattern matching every channel that can be subscribed to
+        """
+        self.pattern = pattern
+        self.__redis_connection = redis_connection
+        self.__max_queued_messages = max_queued_messages
+        self.__heartbeat_interval_in_seconds = heartbeat_interval_in_seconds
+        self.__subscribers_by_channel = {}
+        self.__listener = None
+        self.__is_listening = None
+
+    async def subscribe(
+        self,
+        channel: str,
+        heartbeat_message: Optional[bytes] = None,
+        initial_messages: Optional[Callable[[], Awaitable[Iterable[bytes]]]] = None,
+    ) -> AsyncGenerator[bytes, None]:
+        """
+        The subscription ends when the generator is closed or cancelled (e.g. the client disconnected) or if the
+        subscriber falls more than the maximum number of queued messages behind
+
+        :param heartbeat_message: yielded when no message was received within the heartbeat interval
+        :param initial_messages: awaited once the subscription is registered and yielded first
+        """
+        subscriber = _AsyncSubscriber(self.__max_queued_messages)
+        self.__subscribers_by_channel.setdefault(channel, set()).add(subscriber)
+        self.__start_listener()
+        try:
+            if initial_messages is not None:
+                # the messages published while the initial messages load must reach the queue
+                await self.__is_listening.wait()
+                for message in await initial_messages():
+                    yield message
+            while True:
+                if subscriber.is_overflowed and subscriber.messages.empty():
+                    LOGGER.warning(
+                        f"Dropped a subscriber of {channel} that fell behind"
+                    )
+                    return
+                try:
+                    message = await asyncio.wait_for(
+                        subscriber.messages.get(),
+                        timeout=self.__heartbeat_interval_in_seconds,
+                    )
+                except asyncio.TimeoutError:
+                    if heartbeat_message is not None:
+                        yield heartbeat_message
+                    continue
+                yield message
+        finally:
+            self.__unsubscribe(channel, subscriber)
+
+    @property
+    def number_of_subscribers(self) -> int:
+        return sum(
+            len(subscribers) for subscribers in self.__subscribers_by_channel.values()
+        )
+
+    async def close(self):
+        if self.__listener is not None:
+            self.__listener.cancel()
+            try:
+                await self.__listener
+            except asyncio.CancelledError:
+                pass
+            self.__listener = None
+
+    def __unsubscribe(self, channel: str, subscriber: _AsyncSubscriber):
+        subscribers = self.__subscribers_by_channel.get(channel)
+        if subscribers is None:
+            return
+        subscribers.discard(subscriber)
+        if len(subscribers) == 0:
+            del self.__subscribers_by_channel[channel]
+
+    def __start_listener(self):
+        if self.__listener is not None and not self.__listener.done():
+            return
+        self.__is_listening = asyncio.Event()
+        self.__listener = asyncio.get_running_loop().create_task(self.__listen())
+
+    async def __listen(self):
+        while True:
+            pubsub = self.__redis_connection.pubsub()
+            try:
+                await pubsub.psubscribe(self.pattern)
+                async for message in pubsub.listen():
+                    if message["type"] == "psubscribe":
+                        # redis confirmed the subscription, the messages published from now on are received
+                        self.__is_listening.set()
+                    elif message["type"] == "pmessage":
+                        self.__dispatch(
+                            message["channel"].decode("utf-8"), message["data"]
+                        )
+            except ConnectionError:
+                LOGGER.exception(
+                    f"Lost the subscription to {self.pattern}, reconnecting"
+                )
+                self.__is_listening.clear()
+                await asyncio.sleep(RECONNECT_DELAY_IN_SECONDS)
+            finally:
+                await pubsub.close()
+
+    def __dispatch(self, channel: str, message: bytes):
+        for subscriber in self.__subscribers_by_channel.get(channel, ()):
+            if subscriber.is_overflowed:
+                continue
+            try:
+                subscriber.messages.put_nowait(message)
+            except asyncio.QueueFull:
+                # a slow client. Stop queueing so it does not hold the memory of an unbounded backlog
+                subscriber.is_overflowed = True
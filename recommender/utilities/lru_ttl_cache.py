@@ -0,0 +1,129 @@
+"""
+Bounded in-process cache with least-recently-used eviction and a per-entry time to live.
+Safe to share between threads.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from time import monotonic
+from typing import (
+    Callable,
+    Dict,
+    Final,
+    Generic,
+    Hashable,
+    Iterable,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+@dataclass
+class CacheStats:
+    size: int
+    max_size: int
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    invalidations: int
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return 0 if lookups == 0 else self.hits / lookups
+
+
+class LruTtlCache(Generic[K, V]):
+    max_size: Final[int]
+    ttl_in_seconds: Final[float]
+    __clock: Final[Callable[[], float]]
+    __entries: "OrderedDict[K, Tuple[float, V]]"
+    __lock: Final[Lock]
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl_in_seconds: float,
+        clock: Callable[[], float] = monotonic,
+    ):
+        if max_size <= 0:
+            raise ValueError("max_size must be positive")
+        self.max_size = max_size
+        self.ttl_in_seconds = ttl_in_seconds
+        self.__clock = clock
+        self.__entries = OrderedDict()
+        self.__lock = Lock()
+
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+        self.__expirations = 0
+        self.__invalidations = 0
+
+    def get(self, key: K) -> Optional[V]:
+        with self.__lock:
+            return self.__get_locked(key, self.__clock())
+
+    def get_many(self, keys: Iterable[K]) -> Dict[K, V]:
+        """
+        :return: the cached values for the keys that are present (missing keys are omitted)
+        """
+        found = {}
+        with self.__lock:
+            now = self.__clock()
+            for key in keys:
+                value = self.__get_locked(key, now)
+                if value is not None:
+                    found[key] = value
+        return found
+
+    def set(self, key: K, value: V):
+        with self.__lock:
+            self.__entries[key] = (self.__clock() + self.ttl_in_seconds, value)
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.max_size:
+                self.__entries.popitem(last=False)
+                self.__evictions += 1
+
+    def invalidate(self, key: K):
+        with self.__lock:
+            if self.__entries.pop(key, None) is not None:
+                self.__invalidations += 1
+
+    def clear(self):
+        with self.__lock:
+            self.__invalidations += len(self.__entries)
+            self.__entries.clear()
+
+    @property
+    def stats(self) -> CacheStats:
+        with self.__lock:
+            return CacheStats(
+                size=len(self.__entries),
+                max_size=self.max_size,
+                hits=self.__hits,
+                misses=self.__misses,
+                evictions=self.__evictions,
+                expirations=self.__expirations,
+                invalidations=self.__invalidations,
+            )
+
+    def __get_locked(self, key: K, now: float) -> Optional[V]:
+        entry = self.__entries.get(key)
+        if entry is None:
+            self.__misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= now:
+            del self.__entries[key]
+            self.__expirations += 1
+            self.__misses += 1
+            return None
+        self.__entries.move_to_end(key)
+        self.__hits += 1
+        return value
@@ -1,11 +1,12 @@
 """
 Backed by Redis
 """
-from typing import TypeVar, Generic, Set, Final, Generator, Callable, Optional
+from typing import TypeVar, Generic, Set, Final, Generator, Callable, Iterable, Optional
 
 from redis import Redis
 
 from recommender.db_config import primary_redis_conn
+from recommender.utilities.pubsub_multiplexer import PubSubMultiplexer
 
 T = TypeVar("T")
 created_queues: Set[str] = set()
@@ -16,6 +17,7 @@ class MessageStream(Generic[T]):
     __redis_connection: Final[Redis]
     __serializer: Callable[[T], str]
     __deserializer: Optional[Callable[[str], T]]
+    __multiplexer: Optional[PubSubMultiplexer]
 
     def __init__(
         self,
@@ -23,19 +25,40 @@ class MessageStream(Generic[T]):
         serializer: Callable[[T], str],
         deserializer: Optional[Callable[[str], T]] = None,
         redis_connection: Redis = primary_redis_conn,
+        multiplexer: Optional[PubSubMultiplexer] = None,
     ):
+        """
+        :param multiplexer: shared subscription whose pattern matches the queue name. Without one, every subscriber
+        opens its own pubsub connection
+        """
         self.queue_name = queue_name
         self.__serializer = serializer
         self.__deserializer = deserializer
         self.__redis_connection = redis_connection
+        self.__multiplexer = multiplexer
 
     def publish_message(self, message: T):
         message_as_string = self.__serializer(message)
         self.__redis_connection.publish(self.queue_name, message_as_string)
 
-    def subscribe_to_raw(self) -> Generator[str, None, None]:
+    def subscribe_to_raw(
+        self,
+        heartbeat_message: Optional[bytes] = None,
+        initial_messages: Optional[Callable[[], Iterable[bytes]]] = None,
+    ) -> Generator[str, None, None]:
+        """
+        :param heartbeat_message: yielded while no message is published (only with a multiplexer)
+        :param initial_messages: loaded once subscribed and yielded before the published messages
+        """
+        if self.__multiplexer is not None:
+            yield from self.__multiplexer.subscribe(
+                self.queue_name, heartbeat_message, initial_messages
+            )
+            return
         subscription = self.__redis_connection.pubsub()
         subscription.subscribe(self.queue_name)
+        if initial_messages is not None:
+            yield from initial_messages()
         for message in subscription.listen():
             if message["type"] != "message":
                 continue
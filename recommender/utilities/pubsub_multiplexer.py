@@ -0,0 +1,165 @@
+"""
+Shares one redis pubsub connection between every subscriber of a process.
+
+The multiplexer pattern subscribes once (e.g. to every election channel) on a background thread and fans each message
+out to bounded in-process queues, one per subscriber. Redis connections and listener threads therefore scale with the
+number of processes instead of the number of open streams.
+"""
+import logging
+from queue import Empty, Full, Queue
+from threading import Event, Lock, Thread
+from time import sleep
+from typing import Callable, Dict, Final, Generator, Iterable, Optional, Set
+
+from redis import Redis
+from redis.exceptions import ConnectionError
+
+from recommender.db_config import primary_redis_conn
+
+LOGGER = logging.getLogger(__name__)
+
+MAX_QUEUED_MESSAGES_PER_SUBSCRIBER = 100
+HEARTBEAT_INTERVAL_IN_SECONDS = 15
+RECONNECT_DELAY_IN_SECONDS = 1
+
+
+class _Subscriber:
+    messages: Final[Queue]
+    # set when the subscriber falls too far behind. It is dropped after reading the messages already queued
+    is_overflowed: bool
+
+    def __init__(self, max_queued_messages: int):
+        self.messages = Queue(maxsize=max_queued_messages)
+        self.is_overflowed = False
+
+
+class PubSubMultiplexer:
+    pattern: Final[str]
+    __redis_connection: Final[Redis]
+    __max_queued_messages: Final[int]
+    __heartbeat_interval_in_seconds: Final[float]
+    __subscribers_by_channel: Dict[str, Set[_Subscriber]]
+    __lock: Final[Lock]
+    __listener: Optional[Thread]
+    # set while the pattern subscription is active
+    __is_listening: Final[Event]
+
+    def __init__(
+        self,
+        pattern: str,
+        redis_connection: Redis = primary_redis_conn,
+        max_queued_messages: int = MAX_QUEUED_MESSAGES_PER_SUBSCRIBER,
+        heartbeat_interval_in_seconds: float = HEARTBEAT_INTERVAL_IN_SECONDS,
+    ):
+        """
+        :param pattern: redis glob pattern matching every channel that can be subscribed to
+        """
+        self.pattern = pattern
+        self.__redis_connection = redis_connection
+        self.__max_queued_messages = max_queued_messages
+        self.__heartbeat_interval_in_seconds = heartbeat_interval_in_seconds
+        self.__subscribers_by_channel = {}
+        self.__lock = Lock()
+        self.__listener = None
+        self.__is_listening = Event()
+
+    def subscribe(
+        self,
+        channel: str,
+        heartbeat_message: Optional[bytes] = None,
+        initial_messages: Optional[Callable[[], Iterable[bytes]]] = None,
+    ) -> Generator[bytes, None, None]:
+        """
+        The subscription ends when the generator is closed (e.g. the client disconnected) or if the subscriber falls
+        more than the maximum number of queued messages behind
+
+        :param heartbeat_message: yielded when no message was received within the heartbeat interval so that
+        disconnected clients are detected (a write fails) and proxies keep the connection open
+        :param initial_messages: loaded once the subscription is registered and yielded first, so no message published
+        while they load is missed (e.g. the backlog of a stream)
+        """
+        subscriber = _Subscriber(self.__max_queued_messages)
+        with self.__lock:
+            self.__subscribers_by_channel.setdefault(channel, set()).add(subscriber)
+            self.__start_listener()
+        try:
+            if initial_messages is not None:
+                # the messages published while the initial messages load must reach the queue
+                self.__is_listening.wait()
+                yield from initial_messages()
+            while True:
+                if subscriber.is_overflowed and subscriber.messages.empty():
+                    LOGGER.warning(
+                        f"Dropped a subscriber of {channel} that fell behind"
+                    )
+                    return
+                try:
+                    message = subscriber.messages.get(
+                        timeout=self.__heartbeat_interval_in_seconds
+                    )
+                except Empty:
+                    if heartbeat_message is not None:
+                        yield heartbeat_message
+                    continue
+                yield message
+        finally:
+            self.__unsubscribe(channel, subscriber)
+
+    @property
+    def number_of_subscribers(self) -> int:
+        with self.__lock:
+            return sum(
+                len(subscribers)
+                for subscribers in self.__subscribers_by_channel.values()
+            )
+
+    def __unsubscribe(self, channel: str, subscriber: _Subscriber):
+        with self.__lock:
+            subscribers = self.__subscribers_by_channel.get(channel)
+            if subscribers is None:
+                return
+            subscribers.discard(subscriber)
+            if len(subscribers) == 0:
+                del self.__subscribers_by_channel[channel]
+
+    def __start_listener(self):
+        if self.__listener is not None and self.__listener.is_alive():
+            return
+        self.__listener = Thread(
+            target=self.__listen, name=f"pubsub-multiplexer-{self.pattern}", daemon=True
+        )
+        self.__listener.start()
+
+    def __listen(self):
+        while True:
+            pubsub = self.__redis_connection.pubsub()
+            try:
+                pubsub.psubscribe(self.pattern)
+                for message in pubsub.listen():
+                    if message["type"] == "psubscribe":
+                        # redis confirmed the subscription, the messages published from now on are received
+                        self.__is_listening.set()
+                    elif message["type"] == "pmessage":
+                        self.__dispatch(
+                            message["channel"].decode("utf-8"), message["data"]
+                        )
+            except ConnectionError:
+                LOGGER.exception(
+                    f"Lost the subscription to {self.pattern}, reconnecting"
+                )
+                self.__is_listening.clear()
+                sleep(RECONNECT_DELAY_IN_SECONDS)
+            finally:
+                pubsub.close()
+
+    def __dispatch(self, channel: str, message: bytes):
+        with self.__lock:
+            subscribers = list(self.__subscribers_by_channel.get(channel, ()))
+        for subscriber in subscribers:
+            if subscriber.is_overflowed:
+                continue
+            try:
+                subscriber.messages.put_nowait(message)
+            except Full:
+                # a slow client. Stop queueing so it does not hold the memory of an unbounded backlog
+                subscriber.is_overflowed = True
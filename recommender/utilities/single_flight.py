@@ -0,0 +1,50 @@
+"""
+De-duplicates concurrent calls with the same key within a process:
+the first caller runs the function and every caller that arrives while it is running waits for and shares its result.
+"""
+from dataclasses import dataclass, field
+from threading import Event, Lock
+from typing import Callable, Dict, Final, Generic, Hashable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class _InFlightCall(Generic[T]):
+    done: Event = field(default_factory=Event)
+    result: Optional[T] = None
+    error: Optional[BaseException] = None
+
+
+class SingleFlight(Generic[T]):
+    __lock: Final[Lock]
+    __in_flight_calls: Final[Dict[Hashable, _InFlightCall[T]]]
+
+    def __init__(self):
+        self.__lock = Lock()
+        self.__in_flight_calls = {}
+
+    def do(self, key: Hashable, function: Callable[[], T]) -> T:
+        with self.__lock:
+            call = self.__in_flight_calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = _InFlightCall()
+                self.__in_flight_calls[key] = call
+
+        if not is_leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = function()
+            return call.result
+        except BaseException as error:
+            call.error = error
+            raise error
+        finally:
+            with self.__lock:
+                del self.__in_flight_calls[key]
+            call.done.set()
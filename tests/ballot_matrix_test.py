@@ -0,0 +1,53 @@
+import random
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from recommender.rcv.ballot_matrix import BallotMatrixTally
+from recommender.rcv.instant_runoff import (
+    GroupedBallotTally,
+    group_ballots,
+    run_instant_runoff,
+)
+
+
+def generate_rankings(rng: random.Random, number_of_candidates: int, partial: bool):
+    candidate_ids = [f"business-{index}" for index in range(number_of_candidates)]
+    rankings = []
+    for _ in range(rng.randint(0, 60)):
+        ranking = rng.sample(candidate_ids, number_of_candidates)
+        rankings.append(
+            ranking[: rng.randint(1, number_of_candidates)] if partial else ranking
+        )
+    return candidate_ids, rankings
+
+
+@pytest.mark.parametrize("partial", [False, True])
+@pytest.mark.parametrize("seed", range(100))
+def test_matches_grouped_ballot_tally(seed, partial):
+    rng = random.Random(seed)
+    candidate_ids, rankings = generate_rankings(rng, rng.randint(1, 9), partial)
+
+    expected = run_instant_runoff(
+        GroupedBallotTally(group_ballots(rankings)), candidate_ids, random.Random(seed)
+    )
+    actual = run_instant_runoff(
+        BallotMatrixTally(group_ballots(rankings)), candidate_ids, random.Random(seed)
+    )
+
+    assert actual == expected
+    assert [list(election_round.keys()) for election_round in actual] == [
+        list(election_round.keys()) for election_round in expected
+    ]
+
+
+def test_uses_wider_ints_for_many_candidates():
+    rng = random.Random(0)
+    candidate_ids, rankings = generate_rankings(rng, 200, partial=False)
+
+    assert run_instant_runoff(
+        BallotMatrixTally(group_ballots(rankings)), candidate_ids, random.Random(0)
+    ) == run_instant_runoff(
+        GroupedBallotTally(group_ballots(rankings)), candidate_ids, random.Random(0)
+    )
@@ -0,0 +1,101 @@
+import time
+
+from recommender.business.business_manager import (
+    BUSINESS_CACHE_INVALIDATION_CHANNEL,
+    BusinessManager,
+)
+
+BUSINESS_ID = "business-1"
+
+
+def wait_until(condition, timeout_in_seconds: float = 5) -> bool:
+    deadline = time.monotonic() + timeout_in_seconds
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.05)
+    return True
+
+
+def test_a_refreshed_business_is_dropped_from_the_local_cache_of_other_instances(
+    business_manager, search_client, primary_redis_conn
+):
+    other_business_manager = BusinessManager(search_client)
+    assert (
+        other_business_manager.get_displayable_business(BUSINESS_ID).name == BUSINESS_ID
+    )
+    assert other_business_manager.local_cache_stats.size == 1
+
+    # the business expired from redis, then changed
+    primary_redis_conn.delete(f"business:{BUSINESS_ID}")
+    search_client.names_by_business_id[BUSINESS_ID] = "Renamed"
+    assert business_manager.get_displayable_business(BUSINESS_ID).name == "Renamed"
+
+    assert wait_until(lambda: other_business_manager.local_cache_stats.size == 0)
+    assert (
+        other_business_manager.get_displayable_business(BUSINESS_ID).name == "Renamed"
+    )
+    # read from redis, not refreshed again
+    assert search_client.business_lookups == [[BUSINESS_ID], [BUSINESS_ID]]
+    # its own refresh stays in its local cache
+    assert business_manager.local_cache_stats.size == 1
+
+
+def get_number_of_invalidation_listeners(primary_redis_conn) -> int:
+    return dict(primary_redis_conn.pubsub_numsub(BUSINESS_CACHE_INVALIDATION_CHANNEL))[
+        BUSINESS_CACHE_INVALIDATION_CHANNEL.encode()
+    ]
+
+
+def test_the_invalidation_listener_starts_with_the_local_cache(
+    business_manager, primary_redis_conn
+):
+    # after the instance was created. The listeners of the instances of other tests are still subscribed
+    number_of_invalidation_listeners = get_number_of_invalidation_listeners(
+        primary_redis_conn
+    )
+
+    business_manager.get_displayable_businesses([BUSINESS_ID, "business-2"])
+    business_manager.get_displayable_business("business-3")
+
+    assert (
+        get_number_of_invalidation_listeners(primary_redis_conn)
+        == number_of_invalidation_listeners + 1
+    )
+
+
+def test_businesses_are_returned_in_the_requested_order(
+    business_manager, search_client
+):
+    business_ids = ["business-3", "business-1", "business-3", "business-2"]
+
+    businesses = business_manager.get_displayable_businesses(business_ids)
+
+    assert [business.id for business in businesses] == business_ids
+    # one lookup of each missing business
+    assert search_client.business_lookups == [
+        ["business-3", "business-1", "business-2"]
+    ]
+
+
+def test_only_the_businesses_missing_from_both_caches_are_looked_up(
+    business_manager, search_client
+):
+    # in redis only
+    BusinessManager(search_client).get_displayable_business("business-1")
+    # in the local cache
+    business_manager.get_displayable_business("business-2")
+    search_client.business_lookups.clear()
+
+    businesses = business_manager.get_displayable_businesses(
+        ["business-4", "business-2", "business-1", "business-3"]
+    )
+
+    assert [business.id for business in businesses] == [
+        "business-4",
+        "business-2",
+        "business-1",
+        "business-3",
+    ]
+    assert search_client.business_lookups == [["business-4", "business-3"]]
+    assert business_manager.get_displayable_businesses([]) == []
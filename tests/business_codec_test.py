@@ -0,0 +1,118 @@
+import struct
+from dataclasses import replace
+
+import jsonpickle
+import pytest
+
+from recommender.business.business_codec import (
+    LEGACY_JSONPICKLE_PREFIX,
+    MAX_COUNT,
+    MAX_STRING_LENGTH,
+    SCHEMA_VERSION,
+    decode_displayable_business,
+    encode_displayable_business,
+)
+from recommender.data.business.address import Address
+from recommender.data.recommendation.location import Location
+from tests.conftest import create_displayable_business
+
+
+def test_businesses_round_trip():
+    business = create_displayable_business("business")
+    businesses = [
+        business,
+        replace(
+            business,
+            rating=3.7,
+            delivery=False,
+            pickup=True,
+            image_urls=[],
+            categories=[],
+        ),
+        replace(
+            business,
+            name="Café ☕",
+            coordinates=Location(lat=None, long=None),
+            address=Address(
+                country="US", region=None, city=None, address_line=None, zip_code=None
+            ),
+        ),
+    ]
+
+    for business in businesses:
+        encoded_business = encode_displayable_business(business)
+
+        assert encoded_business[0] == SCHEMA_VERSION
+        assert decode_displayable_business(encoded_business) == business
+
+
+def test_ratings_are_not_rounded():
+    business = replace(create_displayable_business("business"), rating=4.123456789)
+
+    assert (
+        decode_displayable_business(encode_displayable_business(business)).rating
+        == 4.123456789
+    )
+
+
+def test_version_1_businesses_are_decoded():
+    business = create_displayable_business("business")
+    encoded_business = encode_displayable_business(business)
+    version_2_header = struct.Struct(">BBBdIdd")
+    (
+        _,
+        price_index,
+        flags,
+        rating,
+        rating_count,
+        lat,
+        long,
+    ) = version_2_header.unpack_from(encoded_business, 0)
+    version_1_business = (
+        struct.Struct(">BBBfIdd").pack(
+            1, price_index, flags, rating, rating_count, lat, long
+        )
+        + encoded_business[version_2_header.size :]
+    )
+
+    assert decode_displayable_business(version_1_business) == business
+
+
+@pytest.mark.parametrize(
+    "oversized_business",
+    [
+        replace(
+            create_displayable_business("business"),
+            image_urls=[
+                f"https://s3-media.yelp.com/{index}.jpg"
+                for index in range(MAX_COUNT + 1)
+            ],
+        ),
+        replace(
+            create_displayable_business("business"), name="a" * (MAX_STRING_LENGTH + 1)
+        ),
+    ],
+)
+def test_businesses_that_do_not_fit_the_layout_are_encoded_with_jsonpickle(
+    oversized_business,
+):
+    encoded_business = encode_displayable_business(oversized_business)
+
+    assert encoded_business[0] == LEGACY_JSONPICKLE_PREFIX
+    assert decode_displayable_business(encoded_business) == oversized_business
+
+
+def test_legacy_jsonpickle_businesses_are_decoded():
+    business = create_displayable_business("business")
+
+    assert (
+        decode_displayable_business(jsonpickle.encode(business).encode("utf-8"))
+        == business
+    )
+
+
+def test_unknown_versions_are_not_decoded():
+    with pytest.raises(ValueError):
+        decode_displayable_business(bytes([SCHEMA_VERSION + 1]))
+    with pytest.raises(ValueError):
+        decode_displayable_business(b"")
@@ -0,0 +1,60 @@
+from threading import Thread
+
+from recommender.business.page import Page
+from tests.conftest import create_search_request
+
+PAGE = Page(limit=3, offset=0)
+NUMBER_OF_SEARCHES = 5
+
+
+def test_searches_of_a_bucket_get_the_results_of_the_normalized_search(
+    business_manager, search_client
+):
+    business_manager.business_search(create_search_request(radius=1100), PAGE)
+    businesses = business_manager.business_search(
+        create_search_request(radius=1500), PAGE
+    )
+
+    assert len(search_client.searches) == 1
+    upstream_search_request, upstream_page = search_client.searches[0]
+    assert upstream_search_request.radius == 1500
+    assert upstream_page == PAGE
+    assert [business.id for business in businesses] == [
+        "business-0",
+        "business-1",
+        "business-2",
+    ]
+
+
+def test_concurrent_identical_searches_call_the_client_once(
+    business_manager, search_client
+):
+    search_client.search_allowed.clear()
+    results = []
+    searches = [
+        Thread(
+            target=lambda: results.append(
+                business_manager.business_search(create_search_request(), PAGE)
+            )
+        )
+        for _ in range(NUMBER_OF_SEARCHES)
+    ]
+    for search in searches:
+        search.start()
+    # let every search reach the search in flight
+    search_client.search_allowed.wait(timeout=0.2)
+    search_client.search_allowed.set()
+    for search in searches:
+        search.join()
+
+    assert len(search_client.searches) == 1
+    assert len(results) == NUMBER_OF_SEARCHES
+    assert all(result == results[0] for result in results)
+
+
+def test_different_searches_call_the_client(business_manager, search_client):
+    business_manager.business_search(create_search_request("pizza"), PAGE)
+    business_manager.business_search(create_search_request("sushi"), PAGE)
+    business_manager.business_search(create_search_request("pizza"), PAGE.next_page())
+
+    assert len(search_client.searches) == 3
@@ -0,0 +1,114 @@
+import pytest
+
+from recommender.data.recommendation.search_session import SearchSession
+from recommender.recommend.candidate_pool import CandidatePool
+from recommender.recommend.candidate_ranker import CandidateRanker
+from recommender.recommend.recommendation_engine_input import RecommendationEngineInput
+from recommender.recommend.recommender import Recommender
+from recommender.recommend.search_cursor import SearchCursor
+from tests.conftest import (
+    FakeSearchClient,
+    add_search_session,
+    create_recommendable_business,
+)
+
+SESSION_ID = "session"
+
+
+@pytest.fixture
+def candidate_pool(primary_redis_conn) -> CandidatePool:
+    return CandidatePool(primary_redis_conn)
+
+
+@pytest.fixture
+def search_session(db_session) -> SearchSession:
+    return add_search_session(db_session, SESSION_ID)
+
+
+def pop_all(candidate_pool: CandidatePool) -> [str]:
+    business_ids = []
+    while (business := candidate_pool.pop(SESSION_ID)) is not None:
+        business_ids.append(business.id)
+    return business_ids
+
+
+def test_candidates_are_popped_in_the_order_they_were_pushed(candidate_pool):
+    candidate_pool.push(
+        SESSION_ID,
+        [create_recommendable_business(f"business-{index}") for index in range(3)],
+    )
+
+    assert candidate_pool.size(SESSION_ID) == 3
+    assert pop_all(candidate_pool) == ["business-0", "business-1", "business-2"]
+    assert candidate_pool.pop(SESSION_ID) is None
+
+
+def test_a_business_is_only_pushed_once_per_session(candidate_pool):
+    business = create_recommendable_business("business")
+    renamed_business = create_recommendable_business("other-id")
+    renamed_business.name = "BUSINESS"
+
+    assert candidate_pool.push(SESSION_ID, [business]) == 1
+    candidate_pool.pop(SESSION_ID)
+    assert candidate_pool.push(SESSION_ID, [business, renamed_business]) == 0
+    assert candidate_pool.push("other-session", [business]) == 1
+
+
+def test_clearing_the_pool_allows_pushing_the_businesses_again(candidate_pool):
+    business = create_recommendable_business("business")
+    candidate_pool.push(SESSION_ID, [business])
+
+    candidate_pool.clear(SESSION_ID)
+
+    assert candidate_pool.size(SESSION_ID) == 0
+    assert candidate_pool.push(SESSION_ID, [business]) == 1
+
+
+def test_refills_append_businesses_that_were_not_buffered(
+    candidate_pool, recommender, search_session
+):
+    recommendation_input = RecommendationEngineInput.from_search_session(
+        search_session, {"business-0": "business-0"}
+    )
+
+    candidate_pool.refill(recommender, recommendation_input)
+    size_after_the_first_refill = candidate_pool.size(SESSION_ID)
+    candidate_pool.refill(recommender, recommendation_input)
+
+    business_ids = pop_all(candidate_pool)
+    assert "business-0" not in business_ids
+    assert len(business_ids) > size_after_the_first_refill
+    assert len(business_ids) == len(set(business_ids))
+
+
+def test_the_synchronous_search_does_not_duplicate_the_candidates_of_a_concurrent_refill(
+    db_session,
+    search_client,
+    recommendation_manager,
+    candidate_pool,
+    search_session,
+    primary_redis_conn,
+):
+    refill_recommender = Recommender(
+        FakeSearchClient(), SearchCursor(primary_redis_conn), CandidateRanker()
+    )
+    business_search = search_client.business_search
+
+    def business_search_during_refill(search_params, page):
+        if len(search_client.searches) == 0:
+            # the refill reads the same search page before the synchronous search saves its cursor
+            candidate_pool.refill(
+                refill_recommender,
+                RecommendationEngineInput.from_search_session(search_session, {}),
+            )
+        return business_search(search_params, page)
+
+    search_client.business_search = business_search_during_refill
+
+    recommendation = recommendation_manager.generate_new_recommendation_for_session(
+        db_session, search_session
+    )
+
+    buffered_business_ids = pop_all(candidate_pool)
+    assert recommendation.business_id not in buffered_business_ids
+    assert len(buffered_business_ids) == len(set(buffered_business_ids)) == 19
@@ -0,0 +1,73 @@
+from dataclasses import replace
+
+import pytest
+
+from recommender.recommend.candidate_ranker import CandidateRanker
+from tests.conftest import create_recommendable_business
+
+SESSION_ID = "session"
+
+
+def create_candidates(*names: str):
+    return [
+        replace(create_recommendable_business(f"business-{index}"), name=name)
+        for index, name in enumerate(names)
+    ]
+
+
+@pytest.fixture
+def candidate_ranker() -> CandidateRanker:
+    return CandidateRanker()
+
+
+def test_candidates_are_ranked_by_how_well_their_name_matches_the_search_term(
+    candidate_ranker,
+):
+    candidates = create_candidates("Sushi Bar", "Joe's Pizza", "Taco Stand")
+
+    ranked_candidates = candidate_ranker.rank(
+        SESSION_ID, "  PIZZA ", candidates, limit=3
+    )
+
+    assert ranked_candidates[0].name == "Joe's Pizza"
+    assert sorted(candidate.id for candidate in ranked_candidates) == [
+        candidate.id for candidate in candidates
+    ]
+
+
+def test_only_the_best_candidates_up_to_the_limit_are_kept(candidate_ranker):
+    candidates = create_candidates("Sushi Bar", "Pizza Place", "Taco Stand", "Pizza")
+
+    ranked_candidates = candidate_ranker.rank(SESSION_ID, "pizza", candidates, limit=2)
+
+    assert sorted(candidate.name for candidate in ranked_candidates) == [
+        "Pizza",
+        "Pizza Place",
+    ]
+
+
+def test_candidates_are_sampled_without_a_search_term(candidate_ranker):
+    candidates = create_candidates("Sushi Bar", "Joe's Pizza", "Taco Stand")
+
+    ranked_candidates = candidate_ranker.rank(SESSION_ID, "", candidates, limit=2)
+    all_candidates = candidate_ranker.rank(SESSION_ID, "", candidates, limit=10)
+
+    assert len(ranked_candidates) == 2
+    assert len(set(candidate.id for candidate in ranked_candidates)) == 2
+    assert sorted(candidate.id for candidate in all_candidates) == [
+        candidate.id for candidate in candidates
+    ]
+
+
+def test_the_normalized_search_term_is_cached_per_session(candidate_ranker):
+    candidates = create_candidates("Sushi Bar", "Joe's Pizza")
+    candidate_ranker.rank(SESSION_ID, "pizza", candidates, limit=1)
+
+    # the search term of a session never changes, the cached term is used
+    [best_candidate] = candidate_ranker.rank(SESSION_ID, "sushi", candidates, limit=1)
+    [best_candidate_of_other_session] = candidate_ranker.rank(
+        "other-session", "sushi", candidates, limit=1
+    )
+
+    assert best_candidate.name == "Joe's Pizza"
+    assert best_candidate_of_other_session.name == "Sushi Bar"
@@ -0,0 +1,309 @@
+import os
+from threading import Event
+from types import SimpleNamespace
+from typing import List
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+sqlalchemy = pytest.importorskip("sqlalchemy")
+
+from redis import Redis
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+# recommender.db_config connects to redis on import. Without a REDIS_URL, the tests run against an in memory redis
+if "REDIS_URL" not in os.environ:
+    os.environ["REDIS_URL"] = "redis://localhost:6379"
+    Redis.from_url = staticmethod(lambda url, **kwargs: fakeredis.FakeRedis(**kwargs))
+
+
+class QueryCounter:
+    statements: List[str]
+
+    def __init__(self):
+        self.statements = []
+
+    def __call__(self, connection, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def reset(self):
+        self.statements = []
+
+
+@pytest.fixture
+def db_engine():
+    from recommender.db_config import DbBase
+
+    # import every model so the tables (and their foreign keys) exist
+    import recommender.data.rcv.election  # noqa: F401
+    import recommender.data.recommendation.search_session  # noqa: F401
+
+    engine = create_engine("sqlite://")
+    DbBase.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db_session(db_engine):
+    db_session = sessionmaker(autoflush=True, bind=db_engine)()
+    yield db_session
+    db_session.close()
+
+
+@pytest.fixture
+def query_counter(db_engine) -> QueryCounter:
+    """
+    counts the statements sent to the database. Reset it after setting up the data under test
+    """
+    query_counter = QueryCounter()
+    event.listen(db_engine, "before_cursor_execute", query_counter)
+    yield query_counter
+    event.remove(db_engine, "before_cursor_execute", query_counter)
+
+
+@pytest.fixture
+def redis_connection():
+    """
+    a redis of its own, for the classes that take their connection
+    """
+    return fakeredis.FakeRedis()
+
+
+@pytest.fixture
+def primary_redis_conn():
+    """
+    the shared redis of the application, emptied for the test
+    """
+    from recommender.db_config import primary_redis_conn
+
+    primary_redis_conn.flushall()
+    yield primary_redis_conn
+    primary_redis_conn.flushall()
+
+
+class FakeClock:
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+def create_search_request(
+    search_term="Pizza",
+    lat=40.7128,
+    long=-74.006,
+    radius=1000,
+    price_categories=None,
+    categories=("pizza", "italian"),
+    attributes=(),
+):
+    """
+    :param price_categories: LOW and MID_LOW when None
+    """
+    from recommender.data.recommendation.business_search_request import (
+        BusinessSearchRequest,
+    )
+    from recommender.data.recommendation.location import Location
+    from recommender.data.recommendation.price import PriceCategory
+
+    return BusinessSearchRequest(
+        search_term=search_term,
+        location=Location(lat=lat, long=long),
+        price_categories=[PriceCategory.LOW, PriceCategory.MID_LOW]
+        if price_categories is None
+        else list(price_categories),
+        categories=list(categories),
+        attributes=list(attributes),
+        radius=radius,
+    )
+
+
+def add_search_session(db_session, session_id: str, search_term: str = ""):
+    from recommender.data.recommendation.search_session import SearchSession
+
+    search_session = SearchSession(
+        id=session_id, search_request=create_search_request(search_term=search_term)
+    )
+    db_session.add(search_session)
+    db_session.commit()
+    return search_session
+
+
+def create_recommendable_business(business_id: str):
+    from recommender.data.recommendation.filterable_business import (
+        RecommendableBusiness,
+    )
+    from recommender.data.recommendation.price import PriceCategory
+
+    return RecommendableBusiness(
+        id=business_id,
+        name=business_id,
+        url=f"https://www.yelp.com/biz/{business_id}",
+        rating=4.5,
+        price_category=PriceCategory.LOW,
+        distance=100.0,
+    )
+
+
+def create_displayable_business(business_id: str, name: str = None):
+    from recommender.data.business.address import Address
+    from recommender.data.business.displayable_business import DisplayableBusiness
+    from recommender.data.recommendation.displayable_category import DisplayableCategory
+    from recommender.data.recommendation.location import Location
+    from recommender.data.recommendation.price import PriceCategory
+
+    return DisplayableBusiness(
+        id=business_id,
+        name=business_id if name is None else name,
+        url=f"https://www.yelp.com/biz/{business_id}",
+        image_urls=[f"https://s3-media.yelp.com/{business_id}.jpg"],
+        price=PriceCategory.MID_LOW,
+        rating=4.5,
+        rating_count=120,
+        delivery=True,
+        pickup=False,
+        categories=[DisplayableCategory(id="pizza", label="Pizza")],
+        coordinates=Location(lat=40.7, long=-74.0),
+        address=Address(
+            country="US",
+            region="NY",
+            city="New York",
+            address_line="1 Main St",
+            zip_code="10001",
+        ),
+    )
+
+
+class FakeSearchClient:
+    """
+    Yelp stand in that generates the businesses and records the requests. A search waits for search_allowed when it is
+    cleared. Businesses are named after their id, unless renamed in names_by_business_id
+    """
+
+    def __init__(self):
+        self.names_by_business_id = {}
+        self.searches = []
+        self.business_lookups = []
+        self.search_allowed = Event()
+        self.search_allowed.set()
+
+    def business_search(self, search_params, page):
+        self.searches.append((search_params, page))
+        self.search_allowed.wait(timeout=5)
+        return [
+            create_recommendable_business(f"business-{index}")
+            for index in range(page.offset, page.offset + page.limit)
+        ]
+
+    def get_displayable_business(self, business_id: str):
+        return self.get_displayable_businesses([business_id])[0]
+
+    def get_displayable_businesses(self, business_ids: [str]):
+        self.business_lookups.append(list(business_ids))
+        return [
+            create_displayable_business(
+                business_id, self.names_by_business_id.get(business_id)
+            )
+            for business_id in business_ids
+        ]
+
+
+@pytest.fixture
+def search_client() -> FakeSearchClient:
+    return FakeSearchClient()
+
+
+@pytest.fixture
+def business_manager(search_client, primary_redis_conn):
+    from recommender.business.business_manager import BusinessManager
+
+    return BusinessManager(search_client)
+
+
+@pytest.fixture
+def recommender(search_client):
+    from recommender.recommend.candidate_ranker import CandidateRanker
+    from recommender.recommend.recommender import Recommender
+    from recommender.recommend.search_cursor import SearchCursor
+
+    return Recommender(search_client, SearchCursor(), CandidateRanker())
+
+
+@pytest.fixture
+def recommendation_manager(search_client, recommender, primary_redis_conn):
+    from recommender.recommend.candidate_pool import CandidatePool
+    from recommender.recommend.recommendation_manager import RecommendationManager
+    from recommender.recommend.seen_business_index import SeenBusinessIndex
+
+    return RecommendationManager(
+        search_client, recommender, CandidatePool(), SeenBusinessIndex()
+    )
+
+
+class NamedBusinessManager:
+    """
+    resolves every business to its id as its name with a single bulk lookup
+    """
+
+    def __init__(self):
+        self.number_of_lookups = 0
+
+    def get_displayable_businesses(
+        self, business_ids: List[str]
+    ) -> List[SimpleNamespace]:
+        self.number_of_lookups += 1
+        return [
+            SimpleNamespace(id=business_id, name=business_id)
+            for business_id in business_ids
+        ]
+
+
+@pytest.fixture
+def named_business_manager() -> NamedBusinessManager:
+    return NamedBusinessManager()
+
+
+class NicknameUserManager:
+    """
+    the nickname of every user is its id
+    """
+
+    def __init__(self):
+        self.number_of_lookups = 0
+
+    def get_nickname_by_user_id(self, db_session, id: str) -> str:
+        self.number_of_lookups += 1
+        return id
+
+
+@pytest.fixture
+def user_manager() -> NicknameUserManager:
+    return NicknameUserManager()
+
+
+class UnscheduledElectionResults:
+    def request_live_update(self, election_id: str):
+        pass
+
+
+@pytest.fixture
+def rcv_manager(named_business_manager, user_manager):
+    from recommender.rcv.rcv_manager import RCVManager
+
+    return RCVManager(
+        business_manager=named_business_manager,
+        user_manager=user_manager,
+        election_result_scheduler=UnscheduledElectionResults(),
+    )
@@ -0,0 +1,62 @@
+from recommender.data.auth.user import BasicUser
+from recommender.data.rcv.candidate import Candidate
+from recommender.data.rcv.election import Election
+from recommender.data.rcv.election_status import ElectionStatus
+from recommender.data.rcv.ranking import Ranking
+from recommender.rcv.rcv_manager import RCVManager
+
+ELECTION_ID = "election"
+
+
+def create_election(db_session, number_of_candidates: int, number_of_voters: int):
+    users = [
+        BasicUser(id=f"user-{index}", nickname=f"User {index}", type="BasicUser")
+        for index in range(number_of_voters)
+    ]
+    db_session.add_all(users)
+    db_session.add(
+        Election(
+            id=ELECTION_ID,
+            active_id="abcdef",
+            election_status=ElectionStatus.VOTING,
+            election_creator_id=users[0].id,
+        )
+    )
+    candidate_ids = [f"business-{index}" for index in range(number_of_candidates)]
+    db_session.add_all(
+        Candidate(
+            election_id=ELECTION_ID,
+            business_id=business_id,
+            distance=0,
+            nominator_id=users[index % len(users)].id,
+        )
+        for index, business_id in enumerate(candidate_ids)
+    )
+    db_session.add_all(
+        Ranking(
+            election_id=ELECTION_ID, user_id=user.id, business_id=business_id, rank=rank
+        )
+        for user in users
+        for rank, business_id in enumerate(candidate_ids)
+    )
+    db_session.commit()
+    db_session.expunge_all()
+
+
+def test_displayable_election_loads_in_three_queries_regardless_of_size(
+    db_session, query_counter, named_business_manager
+):
+    create_election(db_session, number_of_candidates=50, number_of_voters=200)
+    query_counter.reset()
+
+    election = RCVManager(
+        named_business_manager, user_manager=None
+    ).get_displayable_election_by_id(db_session, ELECTION_ID, with_voters=True)
+
+    # election, candidates with their nominators, voters
+    assert query_counter.count == 3, query_counter.statements
+    assert named_business_manager.number_of_lookups == 1
+    assert len(election.candidates) == 50
+    assert len(election.voters) == 200
+    assert election.candidates[1].name == "business-1"
+    assert election.candidates[1].nominator_nickname == "User 1"
@@ -0,0 +1,84 @@
+import random
+
+from recommender.data.auth.user import BasicUser
+from recommender.data.rcv.candidate import Candidate
+from recommender.data.rcv.election import Election
+from recommender.data.rcv.election_status import ElectionStatus
+from recommender.data.rcv.ranking import Ranking
+
+ELECTION_IDS = ["election-1", "election-2"]
+CANDIDATE_IDS = [f"business-{index}" for index in range(5)]
+
+
+def create_elections(db_session, number_of_voters: int):
+    rng = random.Random(0)
+    users = [
+        BasicUser(id=f"user-{index}", nickname=f"User {index}", type="BasicUser")
+        for index in range(number_of_voters)
+    ]
+    db_session.add_all(users)
+    rankings_by_election = {}
+    for election_id in ELECTION_IDS:
+        db_session.add(
+            Election(
+                id=election_id,
+                active_id=election_id[-6:],
+                election_status=ElectionStatus.VOTING,
+                election_creator_id=users[0].id,
+            )
+        )
+        db_session.add_all(
+            Candidate(
+                election_id=election_id,
+                business_id=business_id,
+                distance=0,
+                nominator_id=users[0].id,
+            )
+            for business_id in CANDIDATE_IDS
+        )
+        rankings_by_election[election_id] = {
+            user.id: rng.sample(CANDIDATE_IDS, rng.randint(1, len(CANDIDATE_IDS)))
+            for user in users
+        }
+    db_session.flush()
+
+    # inserted out of rank and voter order
+    rankings = [
+        Ranking(
+            election_id=election_id, user_id=user_id, business_id=business_id, rank=rank
+        )
+        for election_id, rankings_by_voter in rankings_by_election.items()
+        for user_id, ranking in rankings_by_voter.items()
+        for rank, business_id in enumerate(ranking)
+    ]
+    rng.shuffle(rankings)
+    db_session.add_all(rankings)
+    db_session.commit()
+    return rankings_by_election
+
+
+def test_ballots_are_in_rank_order_for_each_voter(db_session, query_counter):
+    rankings_by_election = create_elections(db_session, number_of_voters=50)
+    query_counter.reset()
+
+    rankings_by_voter = Election.get_rankings_by_user_for_election(
+        db_session, ELECTION_IDS[0]
+    )
+
+    assert query_counter.count == 1, query_counter.statements
+    assert rankings_by_voter == rankings_by_election[ELECTION_IDS[0]]
+
+
+def test_ballots_stream_once_per_voter(db_session):
+    create_elections(db_session, number_of_voters=50)
+
+    user_ids = [
+        user_id for user_id, _ in Election.iterate_ballots(db_session, ELECTION_IDS[1])
+    ]
+
+    assert user_ids == sorted(user_ids)
+    assert len(set(user_ids)) == 50
+
+
+def test_an_election_without_votes_has_no_ballots(db_session):
+    assert Election.get_rankings_by_user_for_election(db_session, "missing") == {}
@@ -0,0 +1,95 @@
+from recommender.data.rcv.election_status import ElectionStatus
+from recommender.rcv.election_event_log import (
+    EMPTY_LOG_EVENT_ID,
+    ElectionEventLog,
+    FrameFilter,
+)
+from recommender.rcv.election_update_stream import (
+    ElectionResultDeltaEvent,
+    StatusChangedEvent,
+)
+
+ELECTION_ID = "election"
+CHANNEL = f"election:{ELECTION_ID}"
+
+
+def test_appended_events_are_published_with_their_log_id(redis_connection):
+    event_log = ElectionEventLog(redis_connection)
+    subscription = redis_connection.pubsub(ignore_subscribe_messages=True)
+    subscription.subscribe(CHANNEL)
+    subscription.get_message()
+
+    event_id = event_log.append(
+        ELECTION_ID, CHANNEL, StatusChangedEvent(ElectionStatus.VOTING)
+    )
+
+    message = subscription.get_message(timeout=1)
+    assert message["data"].startswith(f"id: {event_id}\nevent: STATUS_CHANGED".encode())
+    assert event_log.get_last_event_id(ELECTION_ID) == event_id
+
+
+def test_replays_the_events_after_the_last_received_event(redis_connection):
+    event_log = ElectionEventLog(redis_connection)
+    event_ids = [
+        event_log.append(ELECTION_ID, CHANNEL, StatusChangedEvent(status))
+        for status in ElectionStatus
+    ]
+
+    frames = event_log.get_frames_after(ELECTION_ID, event_ids[0])
+
+    assert [frame.split(b"\n")[0] for frame in frames] == [
+        f"id: {event_id}".encode() for event_id in event_ids[1:]
+    ]
+    assert event_log.get_frames_after(ELECTION_ID, event_ids[-1]) == []
+    assert len(event_log.get_frames_after(ELECTION_ID, EMPTY_LOG_EVENT_ID)) == len(
+        event_ids
+    )
+
+
+def test_cannot_replay_trimmed_or_unknown_events(redis_connection):
+    event_log = ElectionEventLog(redis_connection, max_length=2)
+    first_event_id = event_log.append(
+        ELECTION_ID, CHANNEL, StatusChangedEvent(ElectionStatus.IN_CREATION)
+    )
+    for _ in range(10):
+        event_log.append(
+            ELECTION_ID, CHANNEL, StatusChangedEvent(ElectionStatus.VOTING)
+        )
+
+    assert event_log.get_frames_after(ELECTION_ID, first_event_id) is None
+    assert event_log.get_frames_after(ELECTION_ID, "not-an-id") is None
+    assert event_log.get_last_event_id("empty") == EMPTY_LOG_EVENT_ID
+
+
+def test_only_events_that_change_the_election_advance_its_version(redis_connection):
+    event_log = ElectionEventLog(redis_connection)
+    assert event_log.get_version(ELECTION_ID) == EMPTY_LOG_EVENT_ID
+
+    event_id = event_log.append(
+        ELECTION_ID, CHANNEL, StatusChangedEvent(ElectionStatus.VOTING)
+    )
+    result_event_id = event_log.append(
+        ELECTION_ID,
+        CHANNEL,
+        ElectionResultDeltaEvent(None, {"calculatedAt": 1, "rounds": []}),
+        changes_election=False,
+    )
+
+    assert event_log.get_version(ELECTION_ID) == event_id
+    assert event_log.get_last_event_id(ELECTION_ID) == result_event_id
+
+
+def test_frame_filter_drops_replayed_frames_and_excluded_events():
+    frame_filter = FrameFilter(excluded_event_types=["RESULTS_DELTA"])
+
+    assert [
+        frame_filter.is_included(frame)
+        for frame in [
+            b"id: 5-0\nevent: VOTE_CAST\n",
+            b": heartbeat\n\n",
+            b"id: 4-9\nevent: VOTE_CAST\n",
+            b"id: 5-0\nevent: VOTE_CAST\n",
+            b"id: 5-1\nevent: RESULTS_DELTA\n",
+            b"id: 5-2\nevent: RESULTS_UPDATED\n",
+        ]
+    ] == [True, True, False, False, False, True]
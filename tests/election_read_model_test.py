@@ -0,0 +1,84 @@
+import json
+
+import fakeredis
+import pytest
+
+from recommender.data.auth.displayable_user import DisplayableUser
+from recommender.data.rcv.displayable_election import (
+    DisplayableCandidate,
+    DisplayableElection,
+)
+from recommender.data.rcv.election_status import ElectionStatus
+from recommender.rcv.election_read_model import ElectionReadModel, SerializedElection
+from recommender.utilities.json_encode_utilities import json_encode
+
+ELECTION_ID = "election"
+CANDIDATE = DisplayableCandidate(
+    business_id="business-1", name="Business 1", nominator_nickname="User 1"
+)
+VOTER = DisplayableUser(id="user-1", nickname="User 1")
+
+
+def encode_election(status=ElectionStatus.IN_CREATION, candidates=(), voters=()) -> str:
+    return json_encode(
+        DisplayableElection(
+            id=ELECTION_ID,
+            active_id="abcdef",
+            election_status=status,
+            candidates=list(candidates),
+            voters=list(voters),
+        )
+    )
+
+
+@pytest.fixture
+def read_model():
+    return ElectionReadModel(fakeredis.FakeRedis())
+
+
+def test_updates_match_the_rebuilt_election(read_model):
+    read_model.store(ELECTION_ID, SerializedElection("1-0", encode_election()))
+
+    read_model.add_candidate(ELECTION_ID, "2-0", CANDIDATE)
+    read_model.set_status(ELECTION_ID, "3-0", ElectionStatus.VOTING)
+    read_model.add_voter(ELECTION_ID, "4-0", VOTER)
+
+    serialized_election = read_model.get(ELECTION_ID)
+    assert serialized_election.version == "4-0"
+    assert json.loads(serialized_election.encoded_election) == json.loads(
+        encode_election(ElectionStatus.VOTING, [CANDIDATE], [VOTER])
+    )
+
+
+def test_updates_are_idempotent_and_skip_older_versions(read_model):
+    # rebuilt after the candidate was added, but before its update was applied
+    read_model.store(
+        ELECTION_ID, SerializedElection("1-0", encode_election(candidates=[CANDIDATE]))
+    )
+
+    read_model.add_candidate(ELECTION_ID, "2-0", CANDIDATE)
+    read_model.add_voter(ELECTION_ID, "3-0", VOTER)
+    read_model.add_voter(ELECTION_ID, "3-0", VOTER)
+    read_model.set_status(ELECTION_ID, "2-5", ElectionStatus.COMPLETE)
+
+    serialized_election = read_model.get(ELECTION_ID)
+    assert serialized_election.version == "3-0"
+    assert json.loads(serialized_election.encoded_election) == json.loads(
+        encode_election(candidates=[CANDIDATE], voters=[VOTER])
+    )
+
+
+def test_a_rebuild_does_not_replace_a_newer_version(read_model):
+    read_model.store(
+        ELECTION_ID, SerializedElection("5-0", encode_election(ElectionStatus.VOTING))
+    )
+
+    read_model.store(ELECTION_ID, SerializedElection("4-0", encode_election()))
+
+    assert read_model.get(ELECTION_ID).version == "5-0"
+
+
+def test_updates_skip_missing_read_models(read_model):
+    read_model.add_voter(ELECTION_ID, "1-0", VOTER)
+
+    assert read_model.get(ELECTION_ID) is None
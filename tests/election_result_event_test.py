@@ -0,0 +1,131 @@
+import json
+from datetime import datetime
+
+import fakeredis
+
+from recommender.data.rcv.election_result import (
+    CandidateRoundResult,
+    DisplayableElectionResult,
+    ElectionResult,
+)
+from recommender.data.rcv.round_action import RoundAction
+from recommender.rcv.election_event_log import (
+    EMPTY_LOG_EVENT_ID,
+    ElectionEventLog,
+    get_frame_event_type,
+)
+from recommender.rcv.election_update_stream import (
+    ElectionResultDeltaEvent,
+    ElectionResultEvent,
+    ElectionUpdateStream,
+)
+from recommender.rcv.latest_election_result_store import LatestElectionResultStore
+from recommender.utilities.json_encode_utilities import json_encode
+
+
+def create_result(
+    rounds, calculated_at=datetime(2021, 5, 1, 12, 30)
+) -> DisplayableElectionResult:
+    return DisplayableElectionResult.from_election_result(
+        ElectionResult(
+            rounds=[
+                {
+                    business_id: CandidateRoundResult(votes, round_action)
+                    for business_id, (votes, round_action) in round.items()
+                }
+                for round in rounds
+            ],
+            calculated_at=calculated_at,
+        )
+    )
+
+
+FIRST_ROUND = {"Ab_c-1": (3, None), "xYz": (1, RoundAction.ELIMINATED)}
+SECOND_ROUND = {"Ab_c-1": (4, RoundAction.WON)}
+
+
+def test_result_event_encodes_like_json_encode():
+    for calculated_at in [datetime(2021, 5, 1, 12, 30), 1619872200.5]:
+        result = create_result([FIRST_ROUND, SECOND_ROUND], calculated_at)
+
+        assert json.loads(ElectionResultEvent(result).encoded_data) == json.loads(
+            json_encode(result)
+        )
+
+
+def test_delta_only_carries_the_changed_rounds_and_candidates():
+    previous = ElectionResultEvent(create_result([FIRST_ROUND, SECOND_ROUND])).data
+    result = ElectionResultEvent(
+        create_result(
+            [
+                FIRST_ROUND,
+                {"Ab_c-1": (4, None), "xYz": (1, RoundAction.ELIMINATED)},
+                SECOND_ROUND,
+            ],
+            calculated_at=datetime(2021, 5, 1, 12, 31),
+        )
+    ).data
+
+    delta = ElectionResultDeltaEvent(previous, result).data
+
+    assert delta["previousCalculatedAt"] == previous["calculatedAt"]
+    assert delta["numberOfRounds"] == 3
+    assert delta["changedRounds"] == [
+        {
+            "index": 1,
+            "candidates": {
+                "Ab_c-1": {"numberOfRankOneVotes": 4, "roundAction": None},
+                "xYz": {"numberOfRankOneVotes": 1, "roundAction": "ELIMINATED"},
+            },
+            "removedCandidates": [],
+        },
+        {
+            "index": 2,
+            "candidates": {"Ab_c-1": {"numberOfRankOneVotes": 4, "roundAction": "WON"}},
+            "removedCandidates": [],
+        },
+    ]
+
+
+def test_delta_removes_the_candidates_missing_from_a_round():
+    previous = ElectionResultEvent(create_result([FIRST_ROUND])).data
+    result = ElectionResultEvent(create_result([{"Ab_c-1": (3, None)}])).data
+
+    delta = ElectionResultDeltaEvent(previous, result).data
+
+    assert delta["changedRounds"] == [
+        {"index": 0, "candidates": {}, "removedCandidates": ["xYz"]}
+    ]
+
+
+def test_first_delta_carries_every_round():
+    result = ElectionResultEvent(create_result([FIRST_ROUND, SECOND_ROUND])).data
+
+    delta = ElectionResultDeltaEvent(None, result).data
+
+    assert delta["previousCalculatedAt"] is None
+    assert [
+        changed_round["candidates"] for changed_round in delta["changedRounds"]
+    ] == result["rounds"]
+
+
+def test_published_results_are_sent_as_deltas():
+    redis_connection = fakeredis.FakeRedis()
+    event_log = ElectionEventLog(redis_connection)
+    update_stream = ElectionUpdateStream(
+        "election", event_log, LatestElectionResultStore(redis_connection)
+    )
+    result = create_result([FIRST_ROUND, SECOND_ROUND])
+
+    update_stream.publish_result(create_result([FIRST_ROUND]))
+    update_stream.publish_result(result)
+
+    assert [
+        get_frame_event_type(frame)
+        for frame in event_log.get_frames_after("election", EMPTY_LOG_EVENT_ID)
+    ] == ["RESULTS_DELTA", "RESULTS_DELTA"]
+    # the full result is kept for the snapshots
+    assert (
+        update_stream.get_latest_encoded_result()
+        == ElectionResultEvent(result).encoded_data
+    )
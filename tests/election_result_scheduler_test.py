@@ -0,0 +1,178 @@
+import pytest
+from rq.job import Job, JobStatus
+
+from recommender.rcv.election_result_scheduler import ElectionResultScheduler
+from recommender.rcv.rcv_queue_config import get_rcv_vote_queue
+from tests.conftest import FakeClock
+
+ELECTION_ID = "election"
+QUIET_WINDOW_IN_SECONDS = 1.0
+MAX_STALENESS_IN_SECONDS = 5.0
+
+
+class RecordingResultUpdateConsumer:
+    """
+    records the recounts. on_live_result runs during a live recount, e.g. to request another update
+    """
+
+    def __init__(self, clock: FakeClock):
+        self.__clock = clock
+        self.live_results_published_at = []
+        self.final_results_published_at = []
+        self.on_live_result = None
+
+    def publish_live_result(self, election_id: str):
+        self.live_results_published_at.append(self.__clock.now)
+        if self.on_live_result is not None:
+            on_live_result, self.on_live_result = self.on_live_result, None
+            on_live_result()
+
+    def consume(self, election_id: str):
+        self.final_results_published_at.append(self.__clock.now)
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock(now=1_600_000_000.0)
+
+
+@pytest.fixture
+def consumer(clock) -> RecordingResultUpdateConsumer:
+    return RecordingResultUpdateConsumer(clock)
+
+
+def create_scheduler(
+    primary_redis_conn, consumer, clock, **kwargs
+) -> ElectionResultScheduler:
+    return ElectionResultScheduler(
+        redis_connection=primary_redis_conn,
+        quiet_window_in_seconds=QUIET_WINDOW_IN_SECONDS,
+        max_staleness_in_seconds=MAX_STALENESS_IN_SECONDS,
+        election_result_update_consumer=consumer,
+        clock=clock,
+        **kwargs,
+    )
+
+
+@pytest.fixture
+def scheduler(primary_redis_conn, consumer, clock) -> ElectionResultScheduler:
+    return create_scheduler(primary_redis_conn, consumer, clock)
+
+
+def get_jobs(primary_redis_conn) -> [Job]:
+    """
+    :return: the queued and scheduled update jobs of the election
+    """
+    queue = get_rcv_vote_queue(ELECTION_ID)
+    return [
+        Job.fetch(job_id, connection=primary_redis_conn)
+        for job_id in queue.get_job_ids() + queue.scheduled_job_registry.get_job_ids()
+    ]
+
+
+def take_jobs(primary_redis_conn) -> [Job]:
+    """
+    removes the update jobs of the election, like a worker picking them up
+    """
+    queue = get_rcv_vote_queue(ELECTION_ID)
+    jobs = get_jobs(primary_redis_conn)
+    for job in jobs:
+        queue.remove(job)
+        queue.scheduled_job_registry.remove(job)
+    return jobs
+
+
+def run(scheduler: ElectionResultScheduler, job: Job):
+    job.set_status(JobStatus.STARTED)
+    scheduler.run(*job.args)
+    job.set_status(JobStatus.FINISHED)
+
+
+def run_jobs(scheduler: ElectionResultScheduler, primary_redis_conn):
+    for job in take_jobs(primary_redis_conn):
+        run(scheduler, job)
+
+
+def test_a_burst_of_requests_is_one_recount(
+    scheduler, consumer, clock, primary_redis_conn
+):
+    for _ in range(10):
+        scheduler.request_live_update(ELECTION_ID)
+        clock.now += 0.1
+    assert len(get_jobs(primary_redis_conn)) == 1
+
+    clock.now += QUIET_WINDOW_IN_SECONDS
+    run_jobs(scheduler, primary_redis_conn)
+
+    assert len(consumer.live_results_published_at) == 1
+    assert get_jobs(primary_redis_conn) == []
+
+
+def test_steady_traffic_is_recounted_within_the_max_staleness(
+    scheduler, consumer, clock, primary_redis_conn
+):
+    first_request_at = clock.now
+    # never quiet for the quiet window
+    while (
+        len(consumer.live_results_published_at) == 0
+        and clock.now < first_request_at + 10
+    ):
+        scheduler.request_live_update(ELECTION_ID)
+        clock.now += QUIET_WINDOW_IN_SECONDS / 2
+        run_jobs(scheduler, primary_redis_conn)
+
+    assert (
+        consumer.live_results_published_at[0]
+        <= first_request_at + MAX_STALENESS_IN_SECONDS
+    )
+
+
+def test_a_stalled_pending_job_is_replaced(primary_redis_conn, consumer, clock):
+    # every job is stalled as soon as it is created
+    scheduler = create_scheduler(
+        primary_redis_conn, consumer, clock, stalled_after_in_seconds=0
+    )
+    scheduler.request_live_update(ELECTION_ID)
+    [stalled_job] = take_jobs(primary_redis_conn)
+
+    scheduler.request_live_update(ELECTION_ID)
+    [replacement_job] = take_jobs(primary_redis_conn)
+    clock.now += QUIET_WINDOW_IN_SECONDS
+    run(scheduler, stalled_job)
+    assert consumer.live_results_published_at == []
+    run(scheduler, replacement_job)
+
+    assert len(consumer.live_results_published_at) == 1
+
+
+def test_a_final_update_supersedes_the_live_update(
+    scheduler, consumer, clock, primary_redis_conn
+):
+    scheduler.request_live_update(ELECTION_ID)
+    [live_job] = take_jobs(primary_redis_conn)
+    scheduler.request_final_update(ELECTION_ID)
+    [final_job] = take_jobs(primary_redis_conn)
+
+    clock.now += QUIET_WINDOW_IN_SECONDS
+    run(scheduler, live_job)
+    run(scheduler, final_job)
+
+    assert consumer.live_results_published_at == []
+    assert len(consumer.final_results_published_at) == 1
+    assert get_jobs(primary_redis_conn) == []
+
+
+def test_requests_during_a_recount_get_another_recount(
+    scheduler, consumer, clock, primary_redis_conn
+):
+    consumer.on_live_result = lambda: scheduler.request_live_update(ELECTION_ID)
+    scheduler.request_live_update(ELECTION_ID)
+    clock.now += QUIET_WINDOW_IN_SECONDS
+    run_jobs(scheduler, primary_redis_conn)
+    assert len(consumer.live_results_published_at) == 1
+
+    clock.now += QUIET_WINDOW_IN_SECONDS
+    run_jobs(scheduler, primary_redis_conn)
+
+    assert len(consumer.live_results_published_at) == 2
+    assert get_jobs(primary_redis_conn) == []
@@ -0,0 +1,127 @@
+import random
+from collections import Counter
+from typing import List
+
+import pytest
+
+from recommender.data.rcv.election_result import CandidateRoundResult
+from recommender.data.rcv.round_action import RoundAction
+from recommender.rcv.instant_runoff import (
+    GroupedBallotTally,
+    group_ballots,
+    run_instant_runoff,
+)
+
+
+def run_reference_election(
+    candidate_ids: [str], rankings: List[List[str]], rng: random.Random
+):
+    """
+    the previous recursive tabulation, which removes eliminated candidates from every ballot
+    """
+    if len(rankings) == 0:
+        winner = candidate_ids[rng.randrange(0, len(candidate_ids))]
+        return [
+            {
+                candidate_id: CandidateRoundResult(
+                    0, RoundAction.WON if candidate_id == winner else None
+                )
+                for candidate_id in candidate_ids
+            }
+        ]
+
+    def round_results(counts, affected_candidate, action):
+        return {
+            candidate_id: CandidateRoundResult(
+                count, action if candidate_id == affected_candidate else None
+            )
+            for candidate_id, count in counts.items()
+        }
+
+    first_vote_counts = Counter({candidate: 0 for candidate in rankings[0]})
+    for ranking in rankings:
+        first_vote_counts[ranking[0]] += 1
+    most_voted, most_votes = max(first_vote_counts.items(), key=lambda x: x[1])
+    if most_votes > len(rankings) / 2:
+        return [round_results(first_vote_counts, most_voted, RoundAction.WON)]
+    elif most_votes == len(rankings) / 2 and len(first_vote_counts) == 2:
+        return [
+            round_results(
+                first_vote_counts,
+                list(first_vote_counts.keys())[rng.randrange(0, 2)],
+                RoundAction.WON_VIA_TIEBREAKER,
+            )
+        ]
+    least_voted, _ = min(first_vote_counts.items(), key=lambda x: x[1])
+    for ranking in rankings:
+        ranking.remove(least_voted)
+    return [
+        round_results(first_vote_counts, least_voted, RoundAction.ELIMINATED)
+    ] + run_reference_election(candidate_ids, rankings, rng)
+
+
+def generate_rankings(
+    rng: random.Random, candidate_ids: [str], number_of_voters: int
+) -> List[List[str]]:
+    # a few popular orderings so identical ballots are grouped
+    popular_rankings = [rng.sample(candidate_ids, len(candidate_ids)) for _ in range(3)]
+    return [
+        list(rng.choice(popular_rankings))
+        if rng.random() < 0.5
+        else rng.sample(candidate_ids, len(candidate_ids))
+        for _ in range(number_of_voters)
+    ]
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_matches_reference_tabulation(seed):
+    rng = random.Random(seed)
+    candidate_ids = [f"business-{index}" for index in range(rng.randint(1, 8))]
+    rankings = generate_rankings(rng, candidate_ids, rng.randint(0, 40))
+
+    expected = run_reference_election(
+        candidate_ids, [list(ranking) for ranking in rankings], random.Random(seed)
+    )
+    actual = run_instant_runoff(
+        GroupedBallotTally(group_ballots(rankings)), candidate_ids, random.Random(seed)
+    )
+
+    assert actual == expected
+    # round results keep the candidate order of the first ballot
+    assert [list(election_round.keys()) for election_round in actual] == [
+        list(election_round.keys()) for election_round in expected
+    ]
+
+
+def test_transfers_votes_of_eliminated_candidates():
+    rankings = [["a", "b", "c"]] * 4 + [["b", "c", "a"]] * 3 + [["c", "b", "a"]] * 2
+
+    rounds = run_instant_runoff(
+        GroupedBallotTally(group_ballots(rankings)), ["a", "b", "c"]
+    )
+
+    assert rounds == [
+        {
+            "a": CandidateRoundResult(4, None),
+            "b": CandidateRoundResult(3, None),
+            "c": CandidateRoundResult(2, RoundAction.ELIMINATED),
+        },
+        {
+            "a": CandidateRoundResult(4, None),
+            "b": CandidateRoundResult(5, RoundAction.WON),
+        },
+    ]
+
+
+def test_exhausted_ballots_stop_counting():
+    rankings = [["a"]] * 3 + [["b"]] * 2 + [["c"]]
+
+    rounds = run_instant_runoff(
+        GroupedBallotTally(group_ballots(rankings)), ["a", "b", "c"]
+    )
+
+    # 3 of the 5 continuing ballots is a majority
+    assert rounds[-1] == {
+        "a": CandidateRoundResult(3, RoundAction.WON),
+        "b": CandidateRoundResult(2, None),
+    }
@@ -0,0 +1,76 @@
+import fakeredis
+
+from recommender.data.auth.user import BasicUser
+from recommender.data.rcv.candidate import Candidate
+from recommender.data.rcv.election import Election
+from recommender.data.rcv.election_status import ElectionStatus
+from recommender.data.rcv.ranking import Ranking
+from recommender.rcv.live_tally import LiveTally
+
+ELECTION_ID = "election"
+CANDIDATE_IDS = ["business-1", "business-2"]
+
+
+def create_election(db_session):
+    db_session.add_all(
+        BasicUser(id=user_id, nickname=user_id, type="BasicUser")
+        for user_id in ["user-1", "user-2"]
+    )
+    db_session.add(
+        Election(
+            id=ELECTION_ID,
+            active_id="abcdef",
+            election_status=ElectionStatus.VOTING,
+            election_creator_id="user-1",
+        )
+    )
+    db_session.add_all(
+        Candidate(election_id=ELECTION_ID, business_id=business_id, distance=0)
+        for business_id in CANDIDATE_IDS
+    )
+    db_session.commit()
+
+
+def cast_ballot(db_session, user_id: str, ranking: [str]):
+    db_session.add_all(
+        Ranking(
+            election_id=ELECTION_ID, user_id=user_id, business_id=business_id, rank=rank
+        )
+        for rank, business_id in enumerate(ranking)
+    )
+    db_session.commit()
+
+
+def test_a_ballot_applied_while_the_tally_rebuilds_is_kept(db_session, monkeypatch):
+    create_election(db_session)
+    cast_ballot(db_session, "user-1", CANDIDATE_IDS)
+    redis_server = fakeredis.FakeServer()
+    live_tally = LiveTally(fakeredis.FakeRedis(server=redis_server))
+    other_process_live_tally = LiveTally(fakeredis.FakeRedis(server=redis_server))
+    live_tally.rebuild(db_session, ELECTION_ID)
+
+    get_rankings_by_user_for_election = Election.get_rankings_by_user_for_election
+    number_of_loads = 0
+
+    def load_then_vote(db_session, election_id):
+        nonlocal number_of_loads
+        number_of_loads += 1
+        rankings_by_voter = get_rankings_by_user_for_election(db_session, election_id)
+        if number_of_loads == 1:
+            # another process commits and applies a ballot after the snapshot was read
+            cast_ballot(db_session, "user-2", list(reversed(CANDIDATE_IDS)))
+            other_process_live_tally.apply_ballot(
+                db_session, ELECTION_ID, "user-2", list(reversed(CANDIDATE_IDS))
+            )
+        return rankings_by_voter
+
+    monkeypatch.setattr(
+        Election, "get_rankings_by_user_for_election", staticmethod(load_then_vote)
+    )
+    live_tally.rebuild(db_session, ELECTION_ID)
+
+    assert number_of_loads == 2
+    assert live_tally.get_ballot_weights(ELECTION_ID) == {
+        tuple(CANDIDATE_IDS): 1,
+        tuple(reversed(CANDIDATE_IDS)): 1,
+    }
@@ -0,0 +1,69 @@
+import pytest
+
+from recommender.utilities.lru_ttl_cache import LruTtlCache
+
+TTL_IN_SECONDS = 10
+
+
+@pytest.fixture
+def cache(clock) -> LruTtlCache[str, int]:
+    return LruTtlCache(max_size=3, ttl_in_seconds=TTL_IN_SECONDS, clock=clock)
+
+
+def test_evicts_the_least_recently_used_entry(cache):
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("c", 3)
+    # a is now more recently used than b
+    cache.get("a")
+
+    cache.set("d", 4)
+
+    assert cache.get_many(["a", "b", "c", "d"]) == {"a": 1, "c": 3, "d": 4}
+    assert cache.stats.evictions == 1
+
+
+def test_setting_an_entry_again_makes_it_the_most_recently_used(cache):
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("c", 3)
+    cache.set("a", 5)
+
+    cache.set("d", 4)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 5
+
+
+def test_entries_expire_after_their_ttl(cache, clock):
+    cache.set("a", 1)
+    clock.now = TTL_IN_SECONDS - 1
+    cache.set("b", 2)
+
+    assert cache.get("a") == 1
+    clock.now = TTL_IN_SECONDS
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    assert cache.stats.expirations == 1
+    assert cache.stats.size == 1
+
+
+def test_stats_count_hits_misses_and_invalidations(cache):
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.get_many(["a", "b", "c"])
+    cache.invalidate("a")
+    cache.invalidate("missing")
+    cache.clear()
+
+    stats = cache.stats
+    assert (stats.hits, stats.misses) == (3, 1)
+    assert stats.hit_ratio == 0.75
+    assert stats.invalidations == 2
+    assert (stats.size, stats.max_size) == (0, 3)
+
+
+def test_a_cache_must_hold_an_entry():
+    with pytest.raises(ValueError):
+        LruTtlCache(max_size=0, ttl_in_seconds=TTL_IN_SECONDS)
@@ -0,0 +1,355 @@
+import json
+import os
+
+import pytest
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import (
+    Column,
+    MetaData,
+    PickleType,
+    String,
+    Table,
+    create_engine,
+    inspect,
+    select,
+    text,
+)
+from sqlalchemy.orm import Session
+
+from recommender.data.auth.user import BasicUser
+from recommender.data.rcv.candidate import Candidate
+from recommender.data.rcv.election import Election
+from recommender.data.rcv.election_result import CandidateRoundResult, ElectionResult
+from recommender.data.rcv.ranking import Ranking
+from recommender.data.rcv.round_action import RoundAction
+from recommender.data.recommendation.filterable_business import RecommendableBusiness
+from recommender.data.recommendation.price import PriceCategory
+from recommender.data.recommendation.recommendation import Recommendation
+from recommender.data.recommendation.recommendation_action import RecommendationAction
+from recommender.data.recommendation.search_session import (
+    SearchSession,
+    with_search_request_and_recommendations,
+)
+from recommender.db_config import DbBase
+from recommender.migrations import create_alembic_config, upgrade_database
+
+
+@pytest.fixture
+def migrated_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{os.path.join(tmp_path, 'test.db')}")
+    upgrade_database(engine)
+    yield engine
+    engine.dispose()
+
+
+def get_head_revision() -> str:
+    return ScriptDirectory.from_config(create_alembic_config()).get_current_head()
+
+
+def get_current_revision(engine) -> str:
+    with engine.connect() as connection:
+        return MigrationContext.configure(connection).get_current_revision()
+
+
+def test_migrations_create_the_schema_of_the_models(migrated_engine):
+    assert get_current_revision(migrated_engine) == get_head_revision()
+    with migrated_engine.connect() as connection:
+        assert (
+            compare_metadata(MigrationContext.configure(connection), DbBase.metadata)
+            == []
+        )
+
+
+def test_databases_created_before_migrations_are_stamped_then_upgraded(tmp_path):
+    engine = create_engine(f"sqlite:///{os.path.join(tmp_path, 'test.db')}")
+    DbBase.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(text("DROP INDEX recommendation_session_status"))
+
+    upgrade_database(engine)
+    # a second boot has nothing to do
+    upgrade_database(engine)
+
+    assert get_current_revision(engine) == get_head_revision()
+    index_names = [
+        index["name"] for index in inspect(engine).get_indexes("recommendation")
+    ]
+    assert "recommendation_session_status" in index_names
+    engine.dispose()
+
+
+def get_query_plan(engine, statement) -> str:
+    compiled_statement = statement.compile(
+        engine, compile_kwargs={"literal_binds": True}
+    )
+    with engine.connect() as connection:
+        rows = connection.execute(
+            text(f"EXPLAIN QUERY PLAN {compiled_statement}")
+        ).all()
+    return "\n".join(row[-1] for row in rows)
+
+
+@pytest.mark.parametrize(
+    "statement, index_name",
+    [
+        (
+            select(Recommendation).where(
+                Recommendation.session_id == "session",
+                Recommendation.status == RecommendationAction.MAYBE,
+            ),
+            "recommendation_session_status",
+        ),
+        (
+            select(SearchSession).where(SearchSession.dinner_party_id == "election"),
+            "search_session_dinner_party",
+        ),
+        (
+            select(Candidate).where(Candidate.election_id == "election"),
+            "sqlite_autoindex_candidate_1",
+        ),
+        (
+            select(Ranking.user_id, Ranking.business_id)
+            .where(Ranking.election_id == "election")
+            .order_by(Ranking.user_id, Ranking.rank),
+            "ranking_election_ballots",
+        ),
+        (
+            select(BasicUser).where(
+                Ranking.election_id == "election",
+                Ranking.rank == 0,
+                BasicUser.id == Ranking.user_id,
+            ),
+            "ranking_election_ballots",
+        ),
+    ],
+    ids=[
+        "recommendations by status",
+        "dinner party sessions",
+        "candidates",
+        "ballots",
+        "voters",
+    ],
+)
+def test_hot_queries_use_indexes(migrated_engine, statement, index_name):
+    query_plan = get_query_plan(migrated_engine, statement)
+
+    assert f"INDEX {index_name}" in query_plan, query_plan
+    # no full scan of a table, and no sort outside of the index
+    assert "SCAN" not in query_plan, query_plan
+    assert "TEMP B-TREE" not in query_plan, query_plan
+
+
+def test_the_ballot_loader_reads_the_migrated_database(migrated_engine):
+    db_session = Session(migrated_engine)
+    db_session.add(BasicUser(id="user", nickname="User", type="BasicUser"))
+    db_session.add(
+        Election(id="election", active_id="abcdef", election_creator_id="user")
+    )
+    db_session.add(
+        Candidate(election_id="election", business_id="business", distance=0)
+    )
+    db_session.add(
+        Ranking(election_id="election", user_id="user", business_id="business", rank=0)
+    )
+    db_session.commit()
+
+    assert Election.get_rankings_by_user_for_election(db_session, "election") == {
+        "user": ["business"]
+    }
+    db_session.close()
+
+
+def test_pickled_columns_are_converted_to_json(tmp_path):
+    engine = create_engine(f"sqlite:///{os.path.join(tmp_path, 'test.db')}")
+    with engine.begin() as connection:
+        command.upgrade(create_alembic_config(connection), "0002")
+    election_result = ElectionResult(
+        rounds=[
+            {
+                "business-1": CandidateRoundResult(2, None),
+                "business-2": CandidateRoundResult(1, RoundAction.ELIMINATED),
+            },
+            {"business-1": CandidateRoundResult(3, RoundAction.WON)},
+        ]
+    )
+    business = RecommendableBusiness(
+        id="business-1",
+        name="Business 1",
+        url="https://www.yelp.com/biz/business-1",
+        rating=4.5,
+        price_category=PriceCategory.MID_LOW,
+        distance=100.0,
+    )
+    pickled_tables = MetaData()
+    pickled_election = Table(
+        "election",
+        pickled_tables,
+        Column("id", String),
+        Column("election_status", String),
+        Column("election_creator_id", String),
+        Column("election_result", PickleType),
+    )
+    pickled_recommendation = Table(
+        "recommendation",
+        pickled_tables,
+        Column("session_id", String),
+        Column("business_id", String),
+        Column("business_data_for_recommendation", PickleType),
+    )
+    pickled_search_request = Table(
+        "search_request",
+        pickled_tables,
+        Column("session_id", String),
+        Column("price_categories", PickleType),
+        Column("categories", PickleType),
+        Column("attributes", PickleType),
+    )
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                "INSERT INTO user (id, nickname, type) VALUES ('user', 'User', 'BasicUser')"
+            )
+        )
+        connection.execute(
+            text(
+                "INSERT INTO search_session (id, session_status) VALUES ('session', 'IN_PROGRESS')"
+            )
+        )
+        connection.execute(
+            pickled_election.insert(),
+            [
+                {
+                    "id": "election",
+                    "election_status": "COMPLETE",
+                    "election_creator_id": "user",
+                    "election_result": election_result,
+                }
+            ],
+        )
+        connection.execute(
+            pickled_recommendation.insert(),
+            [
+                {
+                    "session_id": "session",
+                    "business_id": business.id,
+                    "business_data_for_recommendation": business,
+                }
+            ],
+        )
+        connection.execute(
+            pickled_search_request.insert(),
+            [
+                {
+                    "session_id": "session",
+                    "price_categories": [PriceCategory.FREE, PriceCategory.HIGH],
+                    "categories": ["pizza"],
+                    "attributes": None,
+                }
+            ],
+        )
+
+    upgrade_database(engine)
+
+    db_session = Session(engine)
+    assert (
+        Election.get_election_by_id(db_session, "election").election_result
+        == election_result
+    )
+    search_session = SearchSession.get_session_by_id(
+        db_session, "session", with_search_request_and_recommendations
+    )
+    assert (
+        search_session.recommendations[0].business_data_for_recommendation == business
+    )
+    assert search_session.search_request.price_categories == [
+        PriceCategory.FREE,
+        PriceCategory.HIGH,
+    ]
+    assert search_session.search_request.categories == ["pizza"]
+    assert search_session.search_request.attributes is None
+    db_session.close()
+    with engine.connect() as connection:
+        assert (
+            compare_metadata(MigrationContext.configure(connection), DbBase.metadata)
+            == []
+        )
+        stored_result = connection.execute(
+            text("SELECT election_result FROM election")
+        ).scalar()
+    assert json.loads(stored_result)["rounds"] == [
+        [[2, None], [1, "ELIMINATED"]],
+        [[3, "WON"], None],
+    ]
+    engine.dispose()
+
+
+def test_pickled_columns_are_converted_in_pages(tmp_path):
+    rows_per_update = (
+        ScriptDirectory.from_config(create_alembic_config())
+        .get_revision("0003")
+        .module.ROWS_PER_UPDATE
+    )
+    engine = create_engine(f"sqlite:///{os.path.join(tmp_path, 'test.db')}")
+    with engine.begin() as connection:
+        command.upgrade(create_alembic_config(connection), "0002")
+    businesses = [
+        RecommendableBusiness(
+            id=f"business-{index}",
+            name=f"Business {index}",
+            url=f"https://www.yelp.com/biz/business-{index}",
+            rating=4.0,
+            price_category=PriceCategory.LOW,
+            distance=float(index),
+        )
+        # with two sessions, the rows span more than two pages
+        for index in range(rows_per_update + 1)
+    ]
+    pickled_recommendation = Table(
+        "recommendation",
+        MetaData(),
+        Column("session_id", String),
+        Column("business_id", String),
+        Column("business_data_for_recommendation", PickleType),
+    )
+    with engine.begin() as connection:
+        for session_id in ["session-1", "session-2"]:
+            connection.execute(
+                text(
+                    "INSERT INTO search_session (id, session_status) VALUES (:id, 'IN_PROGRESS')"
+                ),
+                {"id": session_id},
+            )
+            connection.execute(
+                pickled_recommendation.insert(),
+                [
+                    {
+                        "session_id": session_id,
+                        "business_id": business.id,
+                        "business_data_for_recommendation": business,
+                    }
+                    for business in businesses
+                ],
+            )
+
+    upgrade_database(engine)
+
+    with engine.connect() as connection:
+        stored_businesses = connection.execute(
+            text("SELECT business_data_for_recommendation FROM recommendation")
+        ).scalars()
+        assert sorted(
+            json.loads(business)["id"] for business in stored_businesses
+        ) == sorted([business.id for business in businesses] * 2)
+    with engine.begin() as connection:
+        command.downgrade(create_alembic_config(connection), "0002")
+    with engine.connect() as connection:
+        assert sorted(
+            connection.execute(
+                select(pickled_recommendation.c.business_data_for_recommendation)
+            ).scalars(),
+            key=lambda business: business.id,
+        ) == sorted(businesses * 2, key=lambda business: business.id)
+    engine.dispose()
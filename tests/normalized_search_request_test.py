@@ -0,0 +1,94 @@
+import pytest
+
+from recommender.business.normalized_search_request import NormalizedSearchRequest
+from recommender.business.page import Page
+from recommender.data.recommendation.business_search_request import (
+    BusinessSearchRequest,
+)
+from recommender.data.recommendation.location import Location
+from recommender.data.recommendation.price import PriceCategory
+from tests.conftest import create_search_request
+
+PAGE = Page(limit=20, offset=0)
+
+
+def get_cache_key(search_request: BusinessSearchRequest, page: Page = PAGE) -> str:
+    return NormalizedSearchRequest.from_search_request(
+        search_request, page
+    ).to_cache_key()
+
+
+@pytest.mark.parametrize(
+    "equivalent_search_request",
+    [
+        create_search_request(search_term="  pizza "),
+        create_search_request(search_term="PIZZA"),
+        create_search_request(lat=40.71284, long=-74.00621),
+        create_search_request(radius=501),
+        create_search_request(
+            price_categories=(PriceCategory.MID_LOW, PriceCategory.LOW)
+        ),
+        create_search_request(categories=("italian", "pizza")),
+    ],
+    ids=[
+        "whitespace",
+        "case",
+        "coordinates",
+        "radius",
+        "price order",
+        "category order",
+    ],
+)
+def test_equivalent_searches_share_a_cache_key(equivalent_search_request):
+    assert get_cache_key(equivalent_search_request) == get_cache_key(
+        create_search_request()
+    )
+
+
+@pytest.mark.parametrize(
+    "different_search_request",
+    [
+        create_search_request(search_term="pizza place"),
+        create_search_request(lat=40.7138),
+        create_search_request(long=-74.007),
+        create_search_request(radius=1001),
+        create_search_request(price_categories=(PriceCategory.LOW,)),
+        create_search_request(categories=("pizza",)),
+        create_search_request(attributes=("hot_and_new",)),
+    ],
+    ids=[
+        "search term",
+        "latitude",
+        "longitude",
+        "radius",
+        "price",
+        "categories",
+        "attributes",
+    ],
+)
+def test_different_searches_have_different_cache_keys(different_search_request):
+    assert get_cache_key(different_search_request) != get_cache_key(
+        create_search_request()
+    )
+
+
+def test_pages_have_different_cache_keys():
+    assert get_cache_key(create_search_request(), PAGE.next_page()) != get_cache_key(
+        create_search_request()
+    )
+
+
+def test_the_upstream_search_is_the_normalized_search():
+    normalized_search_request = NormalizedSearchRequest.from_search_request(
+        create_search_request(search_term=" Pizza ", lat=40.71284, radius=1100), PAGE
+    )
+
+    search_request = normalized_search_request.to_search_request()
+
+    assert search_request.search_term == "pizza"
+    assert search_request.location == Location(lat=40.713, long=-74.006)
+    assert search_request.radius == 1500
+    assert search_request.price_categories == [PriceCategory.LOW, PriceCategory.MID_LOW]
+    assert search_request.categories == ["italian", "pizza"]
+    assert normalized_search_request.to_page() == PAGE
+    assert get_cache_key(search_request) == normalized_search_request.to_cache_key()
@@ -0,0 +1,160 @@
+import asyncio
+
+import fakeredis.aioredis
+import pytest
+
+from recommender.utilities.async_pubsub_multiplexer import AsyncPubSubMultiplexer
+from recommender.utilities.pubsub_multiplexer import PubSubMultiplexer
+
+CHANNEL = "election:1"
+OTHER_CHANNEL = "election:2"
+HEARTBEAT = b"heartbeat"
+READY = b"ready"
+
+
+@pytest.fixture
+def multiplexer(redis_connection) -> PubSubMultiplexer:
+    return PubSubMultiplexer(
+        "election:*", redis_connection, heartbeat_interval_in_seconds=0.05
+    )
+
+
+def subscribe(multiplexer: PubSubMultiplexer, channel: str):
+    """
+    :return: the subscription, once it receives the published messages
+    """
+    subscription = multiplexer.subscribe(
+        channel, heartbeat_message=HEARTBEAT, initial_messages=lambda: [READY]
+    )
+    assert next(subscription) == READY
+    return subscription
+
+
+def test_messages_are_fanned_out_to_the_subscribers_of_the_channel(
+    multiplexer, redis_connection
+):
+    subscriptions = [subscribe(multiplexer, CHANNEL) for _ in range(2)]
+    other_subscription = subscribe(multiplexer, OTHER_CHANNEL)
+
+    redis_connection.publish(CHANNEL, "message")
+
+    assert [next(subscription) for subscription in subscriptions] == [
+        b"message",
+        b"message",
+    ]
+    assert next(other_subscription) == HEARTBEAT
+
+
+def test_closed_subscriptions_are_removed(multiplexer, redis_connection):
+    subscription = subscribe(multiplexer, CHANNEL)
+    other_subscription = subscribe(multiplexer, CHANNEL)
+
+    subscription.close()
+    assert multiplexer.number_of_subscribers == 1
+    other_subscription.close()
+    assert multiplexer.number_of_subscribers == 0
+
+
+def test_a_channel_can_be_subscribed_to_again_after_its_last_subscriber_left(
+    multiplexer, redis_connection
+):
+    subscribe(multiplexer, CHANNEL).close()
+
+    subscription = subscribe(multiplexer, CHANNEL)
+    redis_connection.publish(CHANNEL, "message")
+
+    assert next(subscription) == b"message"
+
+
+def test_messages_published_while_the_initial_messages_load_are_received(
+    multiplexer, redis_connection
+):
+    def load_backlog():
+        redis_connection.publish(CHANNEL, "message")
+        return [b"backlog"]
+
+    subscription = multiplexer.subscribe(CHANNEL, initial_messages=load_backlog)
+
+    assert [next(subscription), next(subscription)] == [b"backlog", b"message"]
+
+
+async def async_subscribe(multiplexer: AsyncPubSubMultiplexer, channel: str):
+    async def load_initial_messages():
+        return [READY]
+
+    subscription = multiplexer.subscribe(
+        channel, heartbeat_message=HEARTBEAT, initial_messages=load_initial_messages
+    )
+    assert await subscription.__anext__() == READY
+    return subscription
+
+
+def run_with_async_multiplexer(scenario):
+    async def run():
+        redis_connection = fakeredis.aioredis.FakeRedis()
+        multiplexer = AsyncPubSubMultiplexer(
+            "election:*", redis_connection, heartbeat_interval_in_seconds=0.05
+        )
+        try:
+            await asyncio.wait_for(scenario(multiplexer, redis_connection), timeout=5)
+        finally:
+            await multiplexer.close()
+
+    asyncio.run(run())
+
+
+def test_async_messages_are_fanned_out_to_the_subscribers_of_the_channel():
+    async def scenario(multiplexer, redis_connection):
+        subscriptions = [await async_subscribe(multiplexer, CHANNEL) for _ in range(2)]
+        other_subscription = await async_subscribe(multiplexer, OTHER_CHANNEL)
+
+        await redis_connection.publish(CHANNEL, "message")
+
+        assert [await subscription.__anext__() for subscription in subscriptions] == [
+            b"message",
+            b"message",
+        ]
+        assert await other_subscription.__anext__() == HEARTBEAT
+
+    run_with_async_multiplexer(scenario)
+
+
+def test_async_closed_subscriptions_are_removed():
+    async def scenario(multiplexer, redis_connection):
+        subscription = await async_subscribe(multiplexer, CHANNEL)
+        other_subscription = await async_subscribe(multiplexer, CHANNEL)
+
+        await subscription.aclose()
+        assert multiplexer.number_of_subscribers == 1
+        await other_subscription.aclose()
+        assert multiplexer.number_of_subscribers == 0
+
+    run_with_async_multiplexer(scenario)
+
+
+def test_async_channel_can_be_subscribed_to_again_after_its_last_subscriber_left():
+    async def scenario(multiplexer, redis_connection):
+        await (await async_subscribe(multiplexer, CHANNEL)).aclose()
+
+        subscription = await async_subscribe(multiplexer, CHANNEL)
+        await redis_connection.publish(CHANNEL, "message")
+
+        assert await subscription.__anext__() == b"message"
+
+    run_with_async_multiplexer(scenario)
+
+
+def test_async_messages_published_while_the_initial_messages_load_are_received():
+    async def scenario(multiplexer, redis_connection):
+        async def load_backlog():
+            await redis_connection.publish(CHANNEL, "message")
+            return [b"backlog"]
+
+        subscription = multiplexer.subscribe(CHANNEL, initial_messages=load_backlog)
+
+        assert [await subscription.__anext__(), await subscription.__anext__()] == [
+            b"backlog",
+            b"message",
+        ]
+
+    run_with_async_multiplexer(scenario)
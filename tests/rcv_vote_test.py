@@ -0,0 +1,247 @@
+import json
+import os
+import threading
+import time
+
+import pytest
+from sqlalchemy.orm import Session
+
+from recommender.api.utils.http_exception import HttpException
+from recommender.data.auth.user import BasicUser
+from recommender.data.rcv.candidate import Candidate
+from recommender.data.rcv.election import Election
+from recommender.data.rcv.election_result import (
+    DisplayableElectionResult,
+    ElectionResult,
+)
+from recommender.data.rcv.election_status import ElectionStatus
+from recommender.data.rcv import ranking
+from recommender.data.rcv.ranking import Ranking
+from recommender.db_config import DbBase, create_database_engine
+from recommender.rcv.election_read_model import ElectionReadModel
+from recommender.rcv.election_update_stream import (
+    ElectionResultDeltaEvent,
+    ElectionUpdateStream,
+)
+from recommender.rcv.rcv_manager import RCVManager
+from tests.conftest import UnscheduledElectionResults
+
+ELECTION_ID = "election"
+USER_ID = "user-1"
+CANDIDATE_IDS = ["business-1", "business-2", "business-3"]
+
+
+@pytest.fixture
+def read_model(redis_connection) -> ElectionReadModel:
+    return ElectionReadModel(redis_connection)
+
+
+@pytest.fixture
+def read_model_rcv_manager(named_business_manager, user_manager, read_model):
+    """
+    rcv manager whose read model is not shared with the other tests
+    """
+    return RCVManager(
+        business_manager=named_business_manager,
+        user_manager=user_manager,
+        election_result_scheduler=UnscheduledElectionResults(),
+        election_read_model=read_model,
+    )
+
+
+@pytest.fixture(autouse=True)
+def election(db_session):
+    add_election(db_session)
+
+
+def add_election(db_session):
+    db_session.add(BasicUser(id=USER_ID, nickname=USER_ID, type="BasicUser"))
+    db_session.add(
+        Election(
+            id=ELECTION_ID,
+            active_id="abcdef",
+            election_status=ElectionStatus.VOTING,
+            election_creator_id=USER_ID,
+        )
+    )
+    db_session.add_all(
+        Candidate(
+            election_id=ELECTION_ID,
+            business_id=business_id,
+            nominator_id=USER_ID,
+            distance=0,
+        )
+        for business_id in CANDIDATE_IDS
+    )
+    db_session.commit()
+
+
+def get_ranking(db_session) -> [str]:
+    return [
+        business_id
+        for business_id, in db_session.query(Ranking.business_id)
+        .filter_by(user_id=USER_ID, election_id=ELECTION_ID)
+        .order_by(Ranking.rank)
+    ]
+
+
+def test_a_changed_vote_replaces_the_ballot(db_session, rcv_manager, user_manager):
+    rcv_manager.vote(db_session, USER_ID, ELECTION_ID, CANDIDATE_IDS)
+    rcv_manager.vote(db_session, USER_ID, ELECTION_ID, list(reversed(CANDIDATE_IDS)))
+
+    assert get_ranking(db_session) == list(reversed(CANDIDATE_IDS))
+    assert [
+        rank for rank, in db_session.query(Ranking.rank).order_by(Ranking.rank)
+    ] == [0, 1, 2]
+    # only the first vote is announced
+    assert user_manager.number_of_lookups == 1
+
+
+def test_votes_write_the_ballot_without_loading_the_candidates_again(
+    db_session, rcv_manager, query_counter
+):
+    rcv_manager.vote(db_session, USER_ID, ELECTION_ID, CANDIDATE_IDS)
+    query_counter.reset()
+
+    rcv_manager.vote(db_session, USER_ID, ELECTION_ID, list(reversed(CANDIDATE_IDS)))
+
+    # the election status, parking the current ranks, and the upsert
+    assert query_counter.count == 3, query_counter.statements
+    assert not any(
+        "FROM candidate" in statement for statement in query_counter.statements
+    )
+
+
+def test_ballots_are_replaced_without_upserts(db_session, monkeypatch):
+    monkeypatch.setattr(ranking, "upsert", lambda db_session, table: None)
+
+    assert not Ranking.replace_users_rankings_for_election(
+        db_session, USER_ID, ELECTION_ID, CANDIDATE_IDS
+    )
+    assert Ranking.replace_users_rankings_for_election(
+        db_session, USER_ID, ELECTION_ID, list(reversed(CANDIDATE_IDS))
+    )
+    db_session.commit()
+
+    assert get_ranking(db_session) == list(reversed(CANDIDATE_IDS))
+
+
+def test_concurrent_first_ballots_of_a_user_are_serialized(tmp_path):
+    engine = create_database_engine(f"sqlite:///{os.path.join(tmp_path, 'test.db')}")
+    DbBase.metadata.create_all(engine)
+    first_db_session, second_db_session = Session(engine), Session(engine)
+    add_election(first_db_session)
+    already_voted = {}
+
+    def replace_second_ballot():
+        already_voted["second"] = Ranking.replace_users_rankings_for_election(
+            second_db_session, USER_ID, ELECTION_ID, list(reversed(CANDIDATE_IDS))
+        )
+        second_db_session.commit()
+
+    already_voted["first"] = Ranking.replace_users_rankings_for_election(
+        first_db_session, USER_ID, ELECTION_ID, CANDIDATE_IDS
+    )
+    second_ballot = threading.Thread(target=replace_second_ballot)
+    second_ballot.start()
+    # the second replacement waits for the first transaction
+    time.sleep(0.2)
+    assert "second" not in already_voted
+    first_db_session.commit()
+    second_ballot.join()
+
+    assert already_voted == {"first": False, "second": True}
+    assert get_ranking(first_db_session) == list(reversed(CANDIDATE_IDS))
+    first_db_session.close()
+    second_db_session.close()
+    engine.dispose()
+
+
+@pytest.mark.parametrize(
+    "votes",
+    [
+        CANDIDATE_IDS[:2],
+        CANDIDATE_IDS + ["business-4"],
+        CANDIDATE_IDS[:2] + CANDIDATE_IDS[:1],
+    ],
+    ids=["missing candidate", "unknown candidate", "duplicate candidate"],
+)
+def test_incomplete_ballots_are_rejected(db_session, rcv_manager, votes):
+    with pytest.raises(HttpException):
+        rcv_manager.vote(db_session, USER_ID, ELECTION_ID, votes)
+
+    assert get_ranking(db_session) == []
+
+
+def test_a_vote_cast_while_the_read_model_rebuilds_is_not_lost(
+    db_session, read_model_rcv_manager, read_model, monkeypatch
+):
+    rcv_manager = read_model_rcv_manager
+    get_displayable_election_by_id = rcv_manager.get_displayable_election_by_id
+
+    def load_then_vote(db_session, id: str, with_voters=False):
+        election = get_displayable_election_by_id(db_session, id, with_voters)
+        # its read model update is skipped, the read model is still missing
+        rcv_manager.vote(db_session, USER_ID, ELECTION_ID, CANDIDATE_IDS)
+        return election
+
+    monkeypatch.setattr(rcv_manager, "get_displayable_election_by_id", load_then_vote)
+    rcv_manager.get_serialized_election(db_session, ELECTION_ID)
+    monkeypatch.undo()
+
+    assert read_model.get(ELECTION_ID) is None
+    serialized_election = rcv_manager.get_serialized_election(db_session, ELECTION_ID)
+    assert [
+        voter["id"]
+        for voter in json.loads(serialized_election.encoded_election)["voters"]
+    ] == [USER_ID]
+    assert read_model.get(ELECTION_ID) == serialized_election
+
+
+def test_the_read_model_is_stored_when_results_are_published_while_it_rebuilds(
+    db_session, read_model_rcv_manager, read_model, primary_redis_conn, monkeypatch
+):
+    rcv_manager = read_model_rcv_manager
+    get_displayable_election_by_id = rcv_manager.get_displayable_election_by_id
+
+    def load_then_publish_result(db_session, id: str, with_voters=False):
+        election = get_displayable_election_by_id(db_session, id, with_voters)
+        ElectionUpdateStream.for_election(ELECTION_ID).publish_message(
+            ElectionResultDeltaEvent(None, {"calculatedAt": 1, "rounds": []})
+        )
+        return election
+
+    monkeypatch.setattr(
+        rcv_manager, "get_displayable_election_by_id", load_then_publish_result
+    )
+    serialized_election = rcv_manager.get_serialized_election(db_session, ELECTION_ID)
+
+    assert read_model.get(ELECTION_ID) == serialized_election
+
+
+def test_the_backlog_of_a_missing_election_is_not_found(
+    db_session, rcv_manager, primary_redis_conn
+):
+    with pytest.raises(HttpException) as error:
+        rcv_manager.get_election_update_backlog(db_session, "missing", None)
+
+    assert error.value.status_code == 404
+
+
+def test_the_backlog_of_a_new_subscriber_leaves_out_the_results_of_its_snapshot(
+    db_session, rcv_manager, primary_redis_conn
+):
+    update_stream = ElectionUpdateStream.for_election(ELECTION_ID)
+    rcv_manager.vote(db_session, USER_ID, ELECTION_ID, CANDIDATE_IDS)
+    for calculated_at in [1.0, 2.0]:
+        update_stream.publish_result(
+            DisplayableElectionResult.from_election_result(
+                ElectionResult(rounds=[], calculated_at=calculated_at)
+            )
+        )
+
+    backlog = rcv_manager.get_election_update_backlog(db_session, ELECTION_ID, None)
+
+    assert len(backlog) == 1
+    assert b"event: SNAPSHOT" in backlog[0]
+    assert update_stream.get_latest_encoded_result().encode("utf-8") in backlog[0]
@@ -0,0 +1,38 @@
+import pytest
+
+from recommender.business.page import Page
+from recommender.recommend.search_cursor import (
+    SEARCH_CURSOR_EXPIRATION_IN_SECONDS,
+    SearchCursor,
+)
+
+SESSION_ID = "session"
+LIMIT = 20
+
+
+@pytest.fixture
+def search_cursor(redis_connection) -> SearchCursor:
+    return SearchCursor(redis_connection)
+
+
+def test_a_new_session_starts_at_the_first_page(search_cursor):
+    assert search_cursor.get_page(SESSION_ID, LIMIT) == Page(limit=LIMIT, offset=0)
+
+
+def test_fetches_resume_from_the_saved_page(search_cursor, redis_connection):
+    search_cursor.save(SESSION_ID, Page(limit=LIMIT, offset=40))
+
+    assert search_cursor.get_page(SESSION_ID, LIMIT) == Page(limit=LIMIT, offset=40)
+    # with the limit of the fetch
+    assert search_cursor.get_page(SESSION_ID, 5) == Page(limit=5, offset=40)
+    assert (
+        0
+        < redis_connection.ttl(f"search-session:{SESSION_ID}:search-offset")
+        <= (SEARCH_CURSOR_EXPIRATION_IN_SECONDS)
+    )
+
+
+def test_sessions_have_their_own_cursor(search_cursor):
+    search_cursor.save(SESSION_ID, Page(limit=LIMIT, offset=40))
+
+    assert search_cursor.get_page("other-session", LIMIT) == Page(limit=LIMIT, offset=0)
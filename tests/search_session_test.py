@@ -0,0 +1,102 @@
+from recommender.data.recommendation.business_search_request import (
+    BusinessSearchRequest,
+)
+from recommender.data.recommendation.filterable_business import RecommendableBusiness
+from recommender.data.recommendation.location import Location
+from recommender.data.recommendation.price import PriceCategory
+from recommender.data.recommendation.recommendation import Recommendation
+from recommender.data.recommendation.recommendation_action import RecommendationAction
+from recommender.data.recommendation.search_session import (
+    SearchSession,
+    with_search_request_and_recommendations,
+)
+
+SESSION_ID = "session"
+STATUSES = [
+    RecommendationAction.REJECT,
+    RecommendationAction.MAYBE,
+    RecommendationAction.ACCEPT,
+]
+
+
+def create_session(db_session, recommendation_count: int):
+    search_session = SearchSession(
+        id=SESSION_ID,
+        search_request=BusinessSearchRequest(
+            search_term="",
+            location=Location(lat=37.77, long=-122.42),
+            price_categories=[],
+            categories=[],
+            attributes=[],
+            radius=1000,
+        ),
+    )
+    db_session.add(search_session)
+    for index in range(recommendation_count):
+        db_session.add(
+            Recommendation(
+                session_id=SESSION_ID,
+                business_id=f"business-{index}",
+                distance=float(index),
+                # the last recommendation is the current one
+                status=None
+                if index == recommendation_count - 1
+                else STATUSES[index % len(STATUSES)],
+                business_data_for_recommendation=RecommendableBusiness(
+                    id=f"business-{index}",
+                    name=f"Business {index}",
+                    url="https://www.yelp.com/biz/business",
+                    rating=4.5,
+                    price_category=PriceCategory.MID_LOW,
+                    distance=float(index),
+                ),
+            )
+        )
+    db_session.commit()
+    db_session.expunge_all()
+
+
+def load_and_read_session(db_session) -> SearchSession:
+    search_session = SearchSession.get_session_by_id(
+        db_session, SESSION_ID, with_search_request_and_recommendations
+    )
+    search_session.search_request.search_term
+    search_session.current_recommendation_id
+    search_session.accepted_recommendation_ids
+    search_session.maybe_recommendation_ids
+    search_session.rejected_recommendation_ids
+    return search_session
+
+
+def test_session_loads_in_two_queries_regardless_of_recommendation_count(
+    db_session, query_counter
+):
+    create_session(db_session, recommendation_count=31)
+    query_counter.reset()
+
+    load_and_read_session(db_session)
+
+    assert query_counter.count == 2, query_counter.statements
+
+
+def test_recommendations_are_partitioned_by_status(db_session):
+    create_session(db_session, recommendation_count=7)
+
+    search_session = load_and_read_session(db_session)
+
+    assert search_session.current_recommendation_id == "business-6"
+    assert search_session.rejected_recommendation_ids == ["business-0", "business-3"]
+    assert search_session.maybe_recommendation_ids == ["business-1", "business-4"]
+    assert search_session.accepted_recommendation_ids == ["business-2", "business-5"]
+
+
+def test_status_changes_are_reflected_without_reloading(db_session, query_counter):
+    create_session(db_session, recommendation_count=4)
+    search_session = load_and_read_session(db_session)
+    query_counter.reset()
+
+    search_session.current_recommendation.status = RecommendationAction.REJECT
+
+    assert search_session.current_recommendation is None
+    assert "business-3" in search_session.rejected_recommendation_ids
+    assert query_counter.count == 0
@@ -0,0 +1,116 @@
+import pytest
+
+from recommender.data.recommendation.filterable_business import RecommendableBusiness
+from recommender.data.recommendation.price import PriceCategory
+from recommender.data.recommendation.recommendation import Recommendation
+from recommender.data.recommendation.recommendation_action import RecommendationAction
+from recommender.data.recommendation.search_session import SearchSession
+from recommender.recommend.seen_business_index import (
+    INITIALIZED_FIELD,
+    SeenBusinessIndex,
+)
+
+SESSION_ID = "session"
+INDEX_KEY = f"search-session:{SESSION_ID}:seen-businesses"
+
+
+def create_recommendation(business_id: str, status) -> Recommendation:
+    return Recommendation(
+        session_id=SESSION_ID,
+        business_id=business_id,
+        distance=100.0,
+        status=status,
+        business_data_for_recommendation=RecommendableBusiness(
+            id=business_id,
+            name=f"Business {business_id.upper()}",
+            url=f"https://www.yelp.com/biz/{business_id}",
+            rating=4.5,
+            price_category=PriceCategory.LOW,
+            distance=100.0,
+        ),
+    )
+
+
+@pytest.fixture
+def seen_business_index(redis_connection) -> SeenBusinessIndex:
+    return SeenBusinessIndex(redis_connection)
+
+
+@pytest.fixture(autouse=True)
+def search_session(db_session):
+    db_session.add(SearchSession(id=SESSION_ID))
+    db_session.add_all(
+        [
+            create_recommendation("a", RecommendationAction.REJECT),
+            create_recommendation("b", RecommendationAction.MAYBE),
+            # the current recommendation has not been seen yet
+            create_recommendation("c", None),
+        ]
+    )
+    db_session.commit()
+
+
+def test_a_missing_index_is_rebuilt_from_the_acted_on_recommendations(
+    db_session, seen_business_index, redis_connection, query_counter
+):
+    assert seen_business_index.get(db_session, SESSION_ID) == {
+        "a": "business a",
+        "b": "business b",
+    }
+    assert query_counter.count == 1
+    assert redis_connection.hget(INDEX_KEY, INITIALIZED_FIELD) == b""
+
+
+def test_a_built_index_is_read_without_the_database(
+    db_session, seen_business_index, query_counter
+):
+    seen_business_index.get(db_session, SESSION_ID)
+    query_counter.reset()
+
+    assert seen_business_index.get(db_session, SESSION_ID) == {
+        "a": "business a",
+        "b": "business b",
+    }
+    assert query_counter.count == 0
+
+
+def test_recorded_recommendations_are_added_to_a_built_index(
+    db_session, seen_business_index, query_counter
+):
+    seen_business_index.get(db_session, SESSION_ID)
+    query_counter.reset()
+
+    seen_business_index.record(create_recommendation("d", RecommendationAction.ACCEPT))
+
+    assert seen_business_index.get(db_session, SESSION_ID)["d"] == "business d"
+    assert query_counter.count == 0
+
+
+def test_recording_does_not_start_a_partial_index(
+    db_session, seen_business_index, redis_connection
+):
+    seen_business_index.record(create_recommendation("d", RecommendationAction.ACCEPT))
+
+    assert not redis_connection.exists(INDEX_KEY)
+
+
+def test_an_index_without_the_initialized_marker_is_rebuilt(
+    db_session, seen_business_index, redis_connection
+):
+    # e.g. written by a record that raced with the index being cleared
+    redis_connection.hset(INDEX_KEY, "d", "business d")
+
+    assert seen_business_index.get(db_session, SESSION_ID) == {
+        "a": "business a",
+        "b": "business b",
+    }
+
+
+def test_a_cleared_index_is_rebuilt(db_session, seen_business_index):
+    seen_business_index.get(db_session, SESSION_ID)
+    db_session.add(create_recommendation("d", RecommendationAction.REJECT))
+    db_session.commit()
+
+    seen_business_index.clear(SESSION_ID)
+
+    assert "d" in seen_business_index.get(db_session, SESSION_ID)
@@ -0,0 +1,57 @@
+import pytest
+from sqlalchemy import event
+
+from recommender.data.recommendation.recommendation import Recommendation
+from recommender.data.recommendation.recommendation_action import RecommendationAction
+from recommender.session.session_manager import SessionManager
+from tests.conftest import add_search_session
+
+SESSION_ID = "session"
+
+
+@pytest.fixture
+def session_manager(recommendation_manager) -> SessionManager:
+    return SessionManager(recommendation_manager, rcv_manager=None)
+
+
+@pytest.fixture(autouse=True)
+def search_session(db_session):
+    add_search_session(db_session, SESSION_ID)
+
+
+@pytest.fixture
+def loaded_recommendations(db_session) -> [Recommendation]:
+    """
+    the recommendations loaded from the database by the session
+    """
+    loaded_recommendations = []
+
+    def record_loaded_object(db_session, loaded_object):
+        if isinstance(loaded_object, Recommendation):
+            loaded_recommendations.append(loaded_object)
+
+    event.listen(db_session, "loaded_as_persistent", record_loaded_object)
+    yield loaded_recommendations
+    event.remove(db_session, "loaded_as_persistent", record_loaded_object)
+
+
+def test_recommendations_are_generated_from_the_seen_business_index(
+    db_session, session_manager, loaded_recommendations
+):
+    seen_business_ids = []
+    for action in [RecommendationAction.REJECT, RecommendationAction.MAYBE] * 3:
+        recommendation = session_manager.get_next_recommendation_for_session(
+            db_session, SESSION_ID
+        )
+        seen_business_ids.append(recommendation.business.id)
+        session_manager.apply_recommendation_action_to_current(
+            db_session, SESSION_ID, recommendation.business.id, action
+        )
+    loaded_recommendations.clear()
+
+    recommendation = session_manager.get_next_recommendation_for_session(
+        db_session, SESSION_ID
+    )
+
+    assert recommendation.business.id not in seen_business_ids
+    assert loaded_recommendations == []
@@ -0,0 +1,94 @@
+from threading import Event, Thread
+
+from recommender.utilities.single_flight import SingleFlight
+
+NUMBER_OF_CALLERS = 5
+
+
+def call_concurrently(
+    single_flight: SingleFlight, key: str, function, results: list
+) -> [Thread]:
+    callers = [
+        Thread(target=lambda: results.append(single_flight.do(key, function)))
+        for _ in range(NUMBER_OF_CALLERS)
+    ]
+    for caller in callers:
+        caller.start()
+    return callers
+
+
+def test_concurrent_calls_with_the_same_key_share_one_call():
+    single_flight = SingleFlight()
+    call_allowed = Event()
+    number_of_calls = 0
+    results = []
+
+    def slow_call():
+        nonlocal number_of_calls
+        number_of_calls += 1
+        call_allowed.wait(timeout=5)
+        return ["business-1"]
+
+    callers = call_concurrently(single_flight, "key", slow_call, results)
+    # let every caller reach the call in flight
+    call_allowed.wait(timeout=0.2)
+    call_allowed.set()
+    for caller in callers:
+        caller.join()
+
+    assert number_of_calls == 1
+    assert results == [["business-1"]] * NUMBER_OF_CALLERS
+
+
+def test_calls_after_the_call_completed_call_again():
+    single_flight = SingleFlight()
+
+    assert single_flight.do("key", lambda: 1) == 1
+    assert single_flight.do("key", lambda: 2) == 2
+
+
+def test_calls_with_different_keys_are_not_shared():
+    single_flight = SingleFlight()
+    first_call_allowed = Event()
+    results = []
+
+    def first_call():
+        first_call_allowed.wait(timeout=5)
+        return 1
+
+    first_caller = Thread(
+        target=lambda: results.append(single_flight.do("first", first_call))
+    )
+    first_caller.start()
+
+    assert single_flight.do("second", lambda: 2) == 2
+    first_call_allowed.set()
+    first_caller.join()
+    assert results == [1]
+
+
+def test_the_error_of_the_call_is_raised_to_every_caller():
+    single_flight = SingleFlight()
+    call_allowed = Event()
+    errors = []
+
+    def failing_call():
+        call_allowed.wait(timeout=5)
+        raise ValueError("upstream error")
+
+    def call():
+        try:
+            single_flight.do("key", failing_call)
+        except ValueError as error:
+            errors.append(error)
+
+    callers = [Thread(target=call) for _ in range(NUMBER_OF_CALLERS)]
+    for caller in callers:
+        caller.start()
+    call_allowed.wait(timeout=0.2)
+    call_allowed.set()
+    for caller in callers:
+        caller.join()
+
+    assert len(errors) == NUMBER_OF_CALLERS
+    assert single_flight.do("key", lambda: 1) == 1